@@ -0,0 +1,93 @@
+"""
+Benchmark da leitura paralela das abas do dados_brutos.xlsx
+
+Mede o tempo de read_workbook (sem o snapshot em disco) com 1, 2, 4 e 8
+processos e confere que todos produzem os mesmos DataFrames da leitura serial.
+Confere também que a conversão de tipos da leitura em streaming dá as mesmas
+colunas do pd.read_excel nos casos difíceis (CASOS_TIPOS).
+
+Uso: python benchmark_leitura.py [repeticoes]
+"""
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+from config import ARQUIVO_DADOS
+from utils.workbook import read_sheet, read_workbook
+
+WORKERS_TESTADOS = [1, 2, 4, 8]
+
+# Colunas com conversões que o read_excel faz de forma particular (None = célula vazia)
+CASOS_TIPOS = {
+    'numeros_em_texto': ['12', ' 3', '4'],
+    'ausencias': ['NA', 'x', '#N/A'],
+    'numero_e_texto': [1, 'a', None],
+    'bool': [True, False, True],
+    'bool_com_vazia': [True, None, False],
+    'booltexto': ['True', 'false', 'TRUE'],
+    'booltexto_com_vazia': ['True', None, 'False'],
+    'boolmix': ['TRUE', True, None],
+}
+
+
+def medir(workers, repeticoes):
+    """Executa a leitura completa e retorna (melhor tempo, DataFrames da última execução)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        areas_data = read_workbook(ARQUIVO_DADOS, workers=workers)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), areas_data
+
+
+def conferir_tipos():
+    """Compara read_sheet com pd.read_excel numa aba com as colunas de CASOS_TIPOS"""
+    workbook = Workbook()
+    aba = workbook.active
+    aba.append(list(CASOS_TIPOS))
+    for linha in zip(*CASOS_TIPOS.values()):
+        aba.append(list(linha))
+    arquivo = io.BytesIO()
+    workbook.save(arquivo)
+
+    arquivo.seek(0)
+    esperado = pd.read_excel(arquivo)
+    arquivo.seek(0)
+    lido = read_sheet(load_workbook(arquivo, read_only=True, data_only=True).active)
+    pd.testing.assert_frame_equal(esperado, lido)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print("=" * 60)
+    print("BENCHMARK - LEITURA PARALELA DAS ABAS")
+    print("=" * 60)
+    print(f"Arquivo: {ARQUIVO_DADOS}")
+    print(f"Núcleos disponíveis: {os.cpu_count()}")
+    print(f"Repetições por configuração: {repeticoes} (melhor tempo)\n")
+
+    referencia = None
+    tempo_serial = None
+    print(f"{'Workers':>8} {'Tempo (s)':>10} {'Speedup':>8}")
+    for workers in WORKERS_TESTADOS:
+        tempo, areas_data = medir(workers, repeticoes)
+        if referencia is None:
+            referencia, tempo_serial = areas_data, tempo
+        else:
+            for nome, df in referencia.items():
+                pd.testing.assert_frame_equal(df, areas_data[nome])
+        print(f"{workers:>8} {tempo:>10.2f} {tempo_serial / tempo:>7.2f}x")
+
+    print("\n[OK] Todas as configurações produziram os mesmos DataFrames")
+
+    conferir_tipos()
+    print(f"[OK] Conversão de tipos igual à do pd.read_excel ({len(CASOS_TIPOS)} casos)")
+
+
+if __name__ == "__main__":
+    main()
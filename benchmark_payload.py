@@ -0,0 +1,78 @@
+"""
+Benchmark do tamanho das figuras enviadas ao navegador
+
+Roda cada página com o AppTest do Streamlit (abas e seções no estado
+inicial) e soma os bytes do JSON de cada st.plotly_chart, o mesmo texto
+que o servidor envia ao navegador, com FIGURAS_COMPACTAS desligado (antes)
+e ligado (depois). Cada modo roda num processo próprio, porque a opção é
+lida do ambiente (ALTERIDADE_FIGURAS_COMPACTAS) na importação do config.
+
+Uso: python benchmark_payload.py
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PASTA = Path(__file__).resolve().parent
+PAGINAS = ['dashboard_aa.py', *sorted(str(pagina.relative_to(PASTA)) for pagina in PASTA.glob('pages/*.py'))]
+
+
+def medir_paginas():
+    """Mede as páginas no processo atual: {página: [figuras, bytes]}"""
+    from streamlit.testing.v1 import AppTest
+
+    resultado = {}
+    for pagina in PAGINAS:
+        app = AppTest.from_file(str(PASTA / pagina), default_timeout=300).run()
+        specs = [grafico.proto.spec for grafico in app.get('plotly_chart')]
+        resultado[pagina] = [len(specs), sum(len(spec.encode('utf-8')) for spec in specs)]
+    return resultado
+
+
+def medir_modo(compactas):
+    """Mede as páginas num processo com FIGURAS_COMPACTAS ligado ou desligado"""
+    ambiente = dict(os.environ, ALTERIDADE_FIGURAS_COMPACTAS='1' if compactas else '0')
+    saida = subprocess.run(
+        [sys.executable, __file__, '--medir'],
+        cwd=PASTA, env=ambiente, capture_output=True, text=True, check=True
+    )
+    # O resultado é a última linha; as anteriores são mensagens da carga
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    if '--medir' in sys.argv:
+        print(json.dumps(medir_paginas()))
+        return
+
+    print("=" * 72)
+    print("BENCHMARK - BYTES DAS FIGURAS ENVIADAS AO NAVEGADOR")
+    print("=" * 72)
+    print("Abas e seções no estado inicial de cada página\n")
+
+    antes = medir_modo(compactas=False)
+    depois = medir_modo(compactas=True)
+
+    print(f"{'Página':<40} {'Figuras':>7} {'Antes (KB)':>11} {'Depois (KB)':>11} {'Redução':>8}")
+    total_antes = total_depois = 0
+    for pagina in PAGINAS:
+        figuras, bytes_antes = antes[pagina]
+        bytes_depois = depois[pagina][1]
+        if figuras == 0:
+            continue
+        total_antes += bytes_antes
+        total_depois += bytes_depois
+        print(
+            f"{Path(pagina).stem[:40]:<40} {figuras:>7} {bytes_antes / 1024:>11.1f} "
+            f"{bytes_depois / 1024:>11.1f} {1 - bytes_depois / bytes_antes:>7.0%}"
+        )
+    print(
+        f"{'Total':<40} {'':>7} {total_antes / 1024:>11.1f} "
+        f"{total_depois / 1024:>11.1f} {1 - total_depois / total_antes:>7.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,26 @@
 """
 Configurações globais do dashboard
 """
+import os
+
+# Arquivo de dados brutos e pasta do snapshot colunar (cache em disco)
+ARQUIVO_DADOS = 'dados_brutos.xlsx'
+PASTA_SNAPSHOT = '.snapshot_dados'
+
+# Modo de memória compartilhada para vários processos do servidor: o dataset
+# é mapeado de um arquivo Arrow em vez de copiado por worker (ALTERIDADE_MMAP=1)
+USAR_MMAP = os.environ.get('ALTERIDADE_MMAP', '').strip().lower() in ('1', 'true', 'sim')
+
+# Processos usados para ler as abas do Excel nos scripts de linha de comando
+# (0 = um por núcleo, 1 = leitura serial); o servidor do Streamlit lê sempre em série
+WORKERS_LEITURA = int(os.environ.get('ALTERIDADE_WORKERS', '0') or 0)
+
+# Limite de memória do cache LRU de seleções filtradas compartilhado pelas sessões (utils/cache.py)
+LIMITE_CACHE_MB = int(os.environ.get('ALTERIDADE_CACHE_MB', '256') or 256)
+
+# Figuras compactas no navegador (utils/charts.py): arrays numéricos em binário,
+# template enxuto e traços sem atributos padrão (ALTERIDADE_FIGURAS_COMPACTAS=0 desliga)
+FIGURAS_COMPACTAS = os.environ.get('ALTERIDADE_FIGURAS_COMPACTAS', '1').strip().lower() in ('1', 'true', 'sim')
 
 # Mapeamento de grupos sociais
 GRUPOS_SOCIAIS = {
@@ -15,9 +35,83 @@ GRUPOS_SOCIAIS = {
     'Outros': 'Outros grupos'
 }
 
+# Coluna calculada na ingestão: um bit por grupo de GRUPOS_SOCIAIS contemplado
+COLUNA_GRUPOS = 'Grupos AA (bits)'
+
+# Coluna calculada na carga: chave estável do programa (Área, IES, Nome do Programa)
+COLUNA_CHAVE = 'Chave do Programa'
+
+# Coluna calculada na ingestão: textos descartados das colunas de vagas (JSON {coluna: valor})
+COLUNA_VAGAS_INVALIDAS = 'Vagas não numéricas'
+
+# Colunas calculadas na ingestão (utils/normalization.py): 'Editais AA' como
+# boolean (NA quando vazio/inválido) e 'Tipo de IES' como classe da IES
+COLUNA_TEM_EDITAIS = 'Tem Editais AA'
+COLUNA_CLASSE_IES = 'Classe da IES'
+
+# Código de 'Tipo de IES' -> classe da IES (os demais valores são inválidos)
+CLASSES_IES = {'PUBLICA': 'Pública', 'PRIVADA': 'Privada'}
+CLASSE_IES_INVALIDA = 'Inválido'
+
+# Valores de 'Status AA', calculado na ingestão a partir de COLUNA_TEM_EDITAIS
+STATUS_AA = ['Com Editais AA', 'Sem Editais AA']
+
+# Colunas calculadas que não saem nas exportações
+COLUNAS_INTERNAS = [COLUNA_GRUPOS, COLUNA_CHAVE, COLUNA_VAGAS_INVALIDAS, COLUNA_TEM_EDITAIS, COLUNA_CLASSE_IES]
+
+# Colunas de vagas de cada grupo social (reserva agregada e por grupo/exclusiva)
+VAGAS_GRUPOS = {
+    'Pretos e Pardos': ['Vagas Pretos e Pardos Agregadas', 'Vagas Pretos e Pardos Por Grupo/Exclusivas'],
+    'PcD': ['Vagas PcD Agregadas', 'Vagas PcD Por Grupo/Exclusivas'],
+    'Indígenas': ['Vagas Indígena Agregadas', 'Vagas Indígena Por Grupo/Exclusivas'],
+    'Quilombolas': ['Vagas Quilombola Agregadas', 'Vagas Quilombola Por Grupo/Exclusivas'],
+    'Refugiados': ['Vagas Refugiados e Humanitários Agregadas', 'Vagas Refugiados e Humanitários Por Grupo/Exclusivas'],
+    'Trans': ['Vagas Trans. Agregadas', 'Vagas Trans. Por Grupo/Exclusivas'],
+    'Ciganos': ['Vagas Ciganos Agregadas', 'Vagas Ciganos Por Grupo/Exclusivas'],
+    'Pop. Ribeirinha': ['Vagas Pop. Ribeirinha Agregadas', 'Vagas Pop. Ribeirinha Por Grupo/Exclusivas'],
+    'Outros': []
+}
+
+# Colunas de dimensão carregadas como category (poucos valores repetidos)
+COLUNAS_CATEGORICAS = ['Área', 'UF', 'Região', 'NOTA', 'Tipo de IES', 'Modalidade de Ensino', 'Editais AA', 'Status AA']
+
+# Colunas SIM/NÃO carregadas como boolean (NA quando vazias ou inválidas)
+COLUNAS_SIM_NAO = [*GRUPOS_SOCIAIS.values(), 'AA Agregada', 'AA Por Grupo']
+
+# Grão do cubo pré-agregado (utils/cube.py)
+DIMENSOES_CUBO = ['Área', 'Região', 'UF', 'NOTA', 'Tipo de IES', 'Modalidade de Ensino', 'Status AA']
+
 # Ordem padrão das notas
 ORDEM_NOTAS = ['A', '3', '4', '5', '6', '7']
 
+# Geometria das UFs para o mapa coroplético (utils/geometry.py): um GeoJSON por
+# nível de precisão em PASTA_GEOMETRIA, gerados por gerar_geometria_ufs.py a
+# partir da malha de UFs do IBGE. Os arquivos ainda não estão versionados:
+# enquanto faltarem, o dashboard mostra só o mapa de bolhas e a exportação
+# pula o coroplético, com aviso nos dois casos.
+# tolerancia: simplificação em graus (0 = só arredonda); casas: casas decimais
+PASTA_GEOMETRIA = 'geometria'
+NIVEIS_GEOMETRIA = {
+    'baixa': {'tolerancia': 0.05, 'casas': 2},
+    'media': {'tolerancia': 0.01, 'casas': 3},
+    'alta': {'tolerancia': 0.0, 'casas': 5}
+}
+NIVEL_GEOMETRIA_DASHBOARD = 'baixa'
+NIVEL_GEOMETRIA_EXPORTACAO = 'alta'
+
+# Coordenadas dos Estados Brasileiros (Centro aproximado)
+COORDENADAS_UFS = {
+    'AC': (-8.77, -70.55), 'AL': (-9.62, -36.82), 'AM': (-3.47, -65.10),
+    'AP': (1.41, -51.77), 'BA': (-13.29, -41.71), 'CE': (-5.20, -39.53),
+    'DF': (-15.83, -47.86), 'ES': (-19.19, -40.34), 'GO': (-15.98, -49.86),
+    'MA': (-5.42, -45.44), 'MG': (-18.10, -44.38), 'MS': (-20.51, -54.54),
+    'MT': (-12.64, -55.42), 'PA': (-3.79, -52.48), 'PB': (-7.28, -36.72),
+    'PE': (-8.38, -37.86), 'PI': (-6.60, -42.28), 'PR': (-24.89, -51.55),
+    'RJ': (-22.25, -42.66), 'RN': (-5.81, -36.59), 'RO': (-10.83, -63.34),
+    'RR': (1.99, -61.33), 'RS': (-30.17, -53.50), 'SC': (-27.45, -50.95),
+    'SE': (-10.57, -37.45), 'SP': (-22.19, -48.79), 'TO': (-9.46, -48.26)
+}
+
 # Cores padrão para gráficos
 CORES = {
     'com_aa': '#2ecc71',
@@ -4,10 +4,10 @@ Página Principal / Home
 """
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from utils.data_loader import load_all_areas, get_data_for_area, get_summary_stats, prepare_dataframe
-from utils.filters import render_area_selector, render_global_filters
+from utils.data_loader import enable_copy_on_write, load_all_areas, load_filter_index, load_cube, get_area_frame, get_summary_stats, count_values
+from utils.filters import render_area_selector, render_global_filters, get_filter_spec
+from utils.cube import slice_cube
+from utils.charts import create_pie_chart, create_category_bar_chart
 
 # Configuração da página
 st.set_page_config(
@@ -18,6 +18,7 @@ st.set_page_config(
 )
 
 # Carregar dados (com cache)
+enable_copy_on_write()
 areas_data, df_todas_areas, lista_areas = load_all_areas()
 
 # ==================== SIDEBAR ====================
@@ -30,11 +31,11 @@ st.sidebar.markdown("---")
 area_selecionada = render_area_selector(lista_areas)
 
 # Obter dados da área selecionada
-df = get_data_for_area(area_selecionada, areas_data, df_todas_areas)
-df = prepare_dataframe(df)
+df = get_area_frame(area_selecionada)
 
 # Aplicar filtros globais
-df_filtrado, filtros_ativos = render_global_filters(df)
+df_filtrado, filtros_ativos = render_global_filters(df, load_filter_index(area_selecionada))
+cubo = slice_cube(load_cube(), get_filter_spec(area_selecionada).selection())
 
 # ==================== CONTEÚDO PRINCIPAL ====================
 
@@ -44,7 +45,7 @@ st.markdown("### Análise de Políticas de Ações Afirmativas em Programas de P
 st.markdown("---")
 
 # Calcular estatísticas
-stats = get_summary_stats(df_filtrado)
+stats = get_summary_stats(cubo)
 
 # Métricas Principais em Destaque
 st.markdown("## 📈 Visão Geral")
@@ -92,35 +93,23 @@ col_left, col_right = st.columns(2)
 
 with col_left:
     # Gráfico de pizza
-    fig_pie = px.pie(
+    fig_pie = create_pie_chart(
         values=[stats['com_aa'], stats['sem_aa']],
         names=['Com Editais AA', 'Sem Editais AA'],
         title='Presença de Editais de Ações Afirmativas',
-        color_discrete_sequence=['#2ecc71', '#e74c3c'],
-        hole=0.4
+        colors=['#2ecc71', '#e74c3c'],
+        layout=dict(height=400)
     )
-    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-    fig_pie.update_layout(height=400)
     st.plotly_chart(fig_pie, use_container_width=True)
 
 with col_right:
     # Gráfico de barras
-    status_counts = df_filtrado['Status AA'].value_counts()
-    fig_bar = go.Figure(data=[
-        go.Bar(
-            x=status_counts.index,
-            y=status_counts.values,
-            marker_color=['#2ecc71' if 'Com' in idx else '#e74c3c' for idx in status_counts.index],
-            text=status_counts.values,
-            textposition='auto'
-        )
-    ])
-    fig_bar.update_layout(
+    status_counts = count_values(df_filtrado['Status AA'])
+    fig_bar = create_category_bar_chart(
+        status_counts,
+        colors=['#2ecc71' if 'Com' in idx else '#e74c3c' for idx in status_counts.index],
         title='Quantidade de Programas por Status',
-        xaxis_title='Status',
-        yaxis_title='Quantidade',
-        showlegend=False,
-        height=400
+        layout=dict(xaxis_title='Status', yaxis_title='Quantidade', height=400)
     )
     st.plotly_chart(fig_bar, use_container_width=True)
 
@@ -175,7 +164,7 @@ if len(df_filtrado) > 0:
     with col1:
         # Região com mais AA
         if 'Região' in df_filtrado.columns:
-            regiao_top = df_filtrado[df_filtrado['Status AA'] == 'Com Editais AA']['Região'].value_counts()
+            regiao_top = count_values(df_filtrado[df_filtrado['Status AA'] == 'Com Editais AA']['Região'])
             if len(regiao_top) > 0:
                 st.info(f"""
                 **🗺️ Região Destaque**  
@@ -185,7 +174,7 @@ if len(df_filtrado) > 0:
     with col2:
         # Nota mais comum com AA
         if 'NOTA' in df_filtrado.columns:
-            nota_top = df_filtrado[df_filtrado['Status AA'] == 'Com Editais AA']['NOTA'].value_counts()
+            nota_top = count_values(df_filtrado[df_filtrado['Status AA'] == 'Com Editais AA']['NOTA'])
             if len(nota_top) > 0:
                 st.success(f"""
                 **⭐ Nota Destaque**  
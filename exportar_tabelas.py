@@ -7,10 +7,14 @@ Script para exportar todas as tabelas de dados que geram os gráficos das págin
 Para todas as áreas do conhecimento.
 As tabelas são exportadas em formato CSV e Excel.
 """
+import argparse
 import os
 import pandas as pd
 from pathlib import Path
-from config import GRUPOS_SOCIAIS, ORDEM_NOTAS
+from config import GRUPOS_SOCIAIS, VAGAS_GRUPOS, COLUNA_GRUPOS, ORDEM_NOTAS
+from utils.data_loader import enable_copy_on_write, load_dataset, get_group_vacancies
+from utils.filters import TODAS_AREAS, FilterSpec, apply_filter_spec
+from utils.social_groups import is_yes, programs_with_groups, group_count, group_labels, groups_by_area
 
 def criar_estrutura_pastas(pasta_base):
     """Cria a estrutura de pastas para armazenar as tabelas"""
@@ -41,11 +45,6 @@ def exportar_tabelas_analise_vagas(df, area_nome, pasta_destino):
     pasta_vagas = pasta_destino / "analise_vagas"
     pasta_vagas.mkdir(exist_ok=True, parents=True)
     
-    # Converter colunas de vagas para numérico
-    for col in ['Qnt Vagas Totais', 'Vagas Totais AA', 'Vagas Totais Agregadas', 'Vagas Totais Por Grupo/Exclusivas']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    
     # 1. Resumo Geral de Vagas
     total_vagas_gerais = df['Qnt Vagas Totais'].sum()
     total_vagas_aa = df['Vagas Totais AA'].sum()
@@ -97,8 +96,8 @@ def exportar_tabelas_analise_vagas(df, area_nome, pasta_destino):
         salvar_tabela(vagas_por_regiao, pasta_vagas, "distribuicao_regiao")
     
     # 4. Distribuição por Nota CAPES
-    if 'Nota' in df.columns:
-        vagas_por_nota = df.groupby('Nota').agg({
+    if 'NOTA' in df.columns:
+        vagas_por_nota = df.groupby('NOTA').agg({
             'Qnt Vagas Totais': 'sum',
             'Vagas Totais AA': 'sum',
             'Vagas Totais Agregadas': 'sum',
@@ -161,7 +160,7 @@ def exportar_tabelas_analise_vagas(df, area_nome, pasta_destino):
     if len(df_top_aa) > 0:
         # Selecionar apenas colunas que existem
         colunas_desejadas = ['Nome do Programa', 'Sigla da IES', 'UF', 'Região', 
-                            'Nota', 'Qnt Vagas Totais', 'Vagas Totais AA', 
+                            'NOTA', 'Qnt Vagas Totais', 'Vagas Totais AA', 
                             'Vagas Totais Agregadas', 'Vagas Totais Por Grupo/Exclusivas']
         colunas_existentes = [col for col in colunas_desejadas if col in df_top_aa.columns]
         
@@ -195,13 +194,9 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
     
     for nome_grupo, coluna in GRUPOS_SOCIAIS.items():
         if coluna in df.columns:
-            programas_com_grupo = (df[coluna].fillna('').str.strip().str.upper() == 'SIM').sum()
+            programas_com_grupo = is_yes(df[coluna]).sum()
             
-            coluna_vagas = f"Vagas {coluna.replace('AA ', '')}"
-            if coluna_vagas in df.columns:
-                total_vagas = pd.to_numeric(df[coluna_vagas], errors='coerce').fillna(0).sum()
-            else:
-                total_vagas = 0
+            total_vagas = get_group_vacancies(df, nome_grupo)
             
             grupos_stats.append({
                 'Grupo': nome_grupo,
@@ -214,27 +209,10 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
     salvar_tabela(df_grupos, pasta_grupos, "visao_geral_grupos")
     
     # 2. Múltiplos Grupos por Programa
-    grupos_por_programa = []
-    
-    for idx, row in df.iterrows():
-        grupos_contemplados = []
-        for nome_grupo, coluna in GRUPOS_SOCIAIS.items():
-            if coluna in df.columns:
-                if str(row[coluna]).strip().upper() == 'SIM':
-                    grupos_contemplados.append(nome_grupo)
-        
-        if len(grupos_contemplados) > 0:
-            grupos_por_programa.append({
-                'Programa': row.get('Nome do Programa', 'N/A'),
-                'IES': row.get('Sigla da IES', 'N/A'),
-                'UF': row.get('UF', 'N/A'),
-                'Região': row.get('Região', 'N/A'),
-                'Quantidade de Grupos': len(grupos_contemplados),
-                'Grupos': ', '.join(grupos_contemplados)
-            })
+    df_multiplos = programs_with_groups(df, ['Nome do Programa', 'Sigla da IES', 'UF', 'Região'])
+    df_multiplos = df_multiplos.rename(columns={'Nome do Programa': 'Programa', 'Sigla da IES': 'IES'})
     
-    if grupos_por_programa:
-        df_multiplos = pd.DataFrame(grupos_por_programa).sort_values('Quantidade de Grupos', ascending=False)
+    if len(df_multiplos) > 0:
         salvar_tabela(df_multiplos, pasta_grupos, "programas_multiplos_grupos")
         
         # Resumo de quantidade de grupos
@@ -256,7 +234,7 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
             
             for nome_grupo, col in GRUPOS_SOCIAIS.items():
                 if col in df_reg.columns:
-                    qtd = (df_reg[col].fillna('').str.strip().str.upper() == 'SIM').sum()
+                    qtd = is_yes(df_reg[col]).sum()
                     row_data[f'{nome_grupo} (Qtd)'] = qtd
                     row_data[f'{nome_grupo} (%)'] = round((qtd / total_reg * 100), 2) if total_reg > 0 else 0
             
@@ -267,31 +245,16 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
     
     # 4. Interseccionalidade por Área (apenas para "Todas as Áreas")
     if 'Área' in df.columns and area_nome == "Todas as Áreas":
-        data_area = []
-        
-        for idx, row in df.iterrows():
-            count_grupos = 0
-            grupos_lista = []
-            for nome_grupo, col in GRUPOS_SOCIAIS.items():
-                if col in df.columns:
-                    if str(row[col]).strip().upper() == 'SIM':
-                        count_grupos += 1
-                        grupos_lista.append(nome_grupo)
-            
-            data_area.append({
-                'Área': row['Área'],
-                'Programa': row.get('Nome do Programa', 'N/A'),
-                'Qtd Grupos': count_grupos,
-                'Grupos': ', '.join(grupos_lista) if grupos_lista else 'Nenhum'
+        if len(df) > 0:
+            df_area_groups = pd.DataFrame({
+                'Área': df['Área'],
+                'Programa': df['Nome do Programa'],
+                'Qtd Grupos': group_count(df[COLUNA_GRUPOS]),
+                'Grupos': group_labels(df[COLUNA_GRUPOS], vazio='Nenhum')
             })
-        
-        if data_area:
-            df_area_groups = pd.DataFrame(data_area)
             
             # Resumo por área
-            area_stats = df_area_groups.groupby('Área').agg({
-                'Qtd Grupos': ['mean', 'sum', 'count']
-            }).reset_index()
+            area_stats = groups_by_area(df).reset_index()
             area_stats.columns = ['Área', 'Média de Grupos por Programa', 'Total de Grupos', 'Qtd Programas']
             area_stats['Média de Grupos por Programa'] = area_stats['Média de Grupos por Programa'].round(2)
             area_stats = area_stats.sort_values('Média de Grupos por Programa', ascending=False)
@@ -307,7 +270,7 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
     
     for grupo in df_grupos['Grupo'].tolist():
         coluna_grupo = GRUPOS_SOCIAIS[grupo]
-        df_grupo = df[df[coluna_grupo].fillna('').str.strip().str.upper() == 'SIM'].copy()
+        df_grupo = df[is_yes(df[coluna_grupo])].copy()
         
         if len(df_grupo) > 0:
             grupo_normalizado = normalizar_nome_arquivo(grupo)
@@ -318,9 +281,9 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
                 'Total de Vagas (Geral)': df_grupo['Qnt Vagas Totais'].sum() if 'Qnt Vagas Totais' in df_grupo.columns else 0
             }
             
-            coluna_vagas_grupo = f"Vagas {coluna_grupo.replace('AA ', '')}"
-            if coluna_vagas_grupo in df_grupo.columns:
-                resumo_grupo['Vagas Específicas do Grupo'] = pd.to_numeric(df_grupo[coluna_vagas_grupo], errors='coerce').fillna(0).sum()
+            colunas_vagas_grupo = [col for col in VAGAS_GRUPOS[grupo] if col in df_grupo.columns]
+            if colunas_vagas_grupo:
+                resumo_grupo['Vagas Específicas do Grupo'] = get_group_vacancies(df_grupo, grupo)
             
             df_resumo = pd.DataFrame([resumo_grupo])
             salvar_tabela(df_resumo, pasta_por_grupo, f"{grupo_normalizado}_resumo")
@@ -332,8 +295,8 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
                 salvar_tabela(regiao_dist, pasta_por_grupo, f"{grupo_normalizado}_regiao")
             
             # Distribuição por Nota
-            if 'Nota' in df_grupo.columns:
-                nota_dist = df_grupo['Nota'].value_counts().reset_index()
+            if 'NOTA' in df_grupo.columns:
+                nota_dist = df_grupo['NOTA'].value_counts().reset_index()
                 nota_dist.columns = ['Nota', 'Quantidade de Programas']
                 salvar_tabela(nota_dist, pasta_por_grupo, f"{grupo_normalizado}_nota")
             
@@ -344,11 +307,10 @@ def exportar_tabelas_grupos_sociais(df, area_nome, pasta_destino):
                 salvar_tabela(uf_dist, pasta_por_grupo, f"{grupo_normalizado}_uf")
             
             # Lista completa de programas
-            colunas_programas_desejadas = ['Nome do Programa', 'Sigla da IES', 'UF', 'Região', 'Nota']
+            colunas_programas_desejadas = ['Nome do Programa', 'Sigla da IES', 'UF', 'Região', 'NOTA']
             colunas_programas = [col for col in colunas_programas_desejadas if col in df_grupo.columns]
             
-            if coluna_vagas_grupo in df_grupo.columns:
-                colunas_programas.append(coluna_vagas_grupo)
+            colunas_programas.extend(colunas_vagas_grupo)
             
             programas_grupo = df_grupo[colunas_programas].copy()
             salvar_tabela(programas_grupo, pasta_por_grupo, f"{grupo_normalizado}_programas")
@@ -387,7 +349,7 @@ def exportar_tabelas_distribuicao_geografica(df, area_nome, pasta_destino):
     
     # 2. Análise Regional
     if 'Região' in df.columns:
-        regiao_stats = df.groupby(['Região', 'Status AA']).size().unstack(fill_value=0).reset_index()
+        regiao_stats = df.groupby(['Região', 'Status AA'], observed=True).size().unstack(fill_value=0).reset_index()
         
         if 'Com Editais AA' in regiao_stats.columns and 'Sem Editais AA' in regiao_stats.columns:
             regiao_stats['Total'] = regiao_stats['Com Editais AA'] + regiao_stats['Sem Editais AA']
@@ -414,7 +376,7 @@ def exportar_tabelas_distribuicao_geografica(df, area_nome, pasta_destino):
                 row_data = {'Região': regiao, 'Total Programas': total_progs_reg}
                 for nome_grupo, col_db in GRUPOS_SOCIAIS.items():
                     if col_db in df_reg.columns:
-                        qtd = (df_reg[col_db].fillna('').str.strip().str.upper() == 'SIM').sum()
+                        qtd = is_yes(df_reg[col_db]).sum()
                         perc = (qtd / total_progs_reg) * 100
                         row_data[f'{nome_grupo} (Qtd)'] = qtd
                         row_data[f'{nome_grupo} (%)'] = round(perc, 2)
@@ -444,7 +406,7 @@ def exportar_tabelas_distribuicao_geografica(df, area_nome, pasta_destino):
     
     # 5. Programas por Estado (detalhado)
     colunas_base = ['Nome do Programa', 'Sigla da IES', 'UF', 'Região', 
-                    'Nota', 'Status AA', 'Tipo de IES']
+                    'NOTA', 'Status AA', 'Tipo de IES']
     colunas_detalhado = [col for col in colunas_base if col in df.columns]
     
     programas_detalhado = df[colunas_detalhado].copy()
@@ -463,8 +425,21 @@ def exportar_tabelas_distribuicao_geografica(df, area_nome, pasta_destino):
     
     print(f"    [OK] Tabelas de Distribuição Geográfica salvas em: {pasta_geo}")
 
-def main():
-    """Função principal"""
+def main(argv=None):
+    """
+    Função principal
+    
+    Aceita --filtros com a query string da URL do dashboard (FilterSpec):
+    com uma área, só ela é exportada; os demais filtros valem para todas.
+    """
+    parser = argparse.ArgumentParser(description="Exporta as tabelas (CSV e Excel) do dashboard")
+    parser.add_argument(
+        '--filtros', default='',
+        help="filtros no formato da URL do dashboard, ex.: 'area=Artes&regiao=Sudeste&status=Com+AA'"
+    )
+    spec = FilterSpec.from_query_string(parser.parse_args(argv).filtros)
+    incluir_todas = spec.area == TODAS_AREAS
+    
     print("=" * 80)
     print("EXPORTAÇÃO DE TABELAS - ANÁLISE DE VAGAS E GRUPOS SOCIAIS")
     print("=" * 80)
@@ -472,29 +447,41 @@ def main():
     
     # Carregar dados
     print("Carregando dados...")
-    excel_file = pd.ExcelFile('dados_brutos.xlsx')
-    areas_data = {}
+    # Usa o mesmo snapshot colunar do dashboard (o Excel só é lido se tiver mudado)
+    enable_copy_on_write()
+    areas_brutas, df_brutas, _ = load_dataset()
+    validas = []
     
-    for sheet_name in excel_file.sheet_names:
-        df_area = pd.read_excel(excel_file, sheet_name=sheet_name)
+    for sheet_name in areas_brutas:
+        if not incluir_todas and sheet_name != spec.area:
+            continue
         
         # Pular planilhas que não têm as colunas necessárias
-        if 'Editais AA' not in df_area.columns or 'Nome do Programa' not in df_area.columns:
+        colunas = areas_brutas.columns(sheet_name)
+        if 'Editais AA' not in colunas or 'Nome do Programa' not in colunas:
             print(f"  [SKIP] Pulando planilha '{sheet_name}' - colunas necessárias não encontradas")
             continue
-        
-        df_area['Área'] = sheet_name
-        if 'Nota' in df_area.columns:
-            df_area['Nota'] = df_area['Nota'].astype(str).str.strip()
-        # Adicionar Status AA
-        df_area['Status AA'] = df_area['Editais AA'].apply(
-            lambda x: 'Com Editais AA' if str(x).upper() == 'SIM' else 'Sem Editais AA'
-        )
-        areas_data[sheet_name] = df_area
+        validas.append(sheet_name)
+    
+    # Filtros num único passe sobre as linhas das áreas válidas ('Status AA'
+    # já vem da ingestão), contíguas no DataFrame; as áreas voltam a ser
+    # fatias do resultado
+    df_todas_areas = df_brutas.take(areas_brutas.rows(validas))
+    df_todas_areas = apply_filter_spec(df_todas_areas, spec)
+    areas_data = areas_brutas.realign(df_todas_areas, validas, vazias=False)
+    for sheet_name in validas:
+        if sheet_name not in areas_data:
+            print(f"  [SKIP] Pulando planilha '{sheet_name}' - nenhum programa com os filtros")
+    
+    if not areas_data:
+        print("Nenhum programa encontrado com os filtros informados.")
+        return
     
-    df_todas_areas = pd.concat(areas_data.values(), ignore_index=True)
+    df_todas_areas = areas_data.frame
     
     print(f"[OK] Dados carregados: {len(areas_data)} áreas encontradas")
+    if spec.active_filters or not incluir_todas:
+        print(f"[OK] Filtros: {spec.to_query_string()}")
     print()
     
     # Criar pasta base
@@ -503,14 +490,15 @@ def main():
     print()
     
     # Processar "Todas as Áreas"
-    print("Processando: Todas as Áreas")
-    pasta_todas = pasta_base / "Todas_as_Areas"
-    pasta_todas.mkdir(exist_ok=True, parents=True)
-    
-    exportar_tabelas_analise_vagas(df_todas_areas.copy(), "Todas as Áreas", pasta_todas)
-    exportar_tabelas_grupos_sociais(df_todas_areas.copy(), "Todas as Áreas", pasta_todas)
-    exportar_tabelas_distribuicao_geografica(df_todas_areas.copy(), "Todas as Áreas", pasta_todas)
-    print()
+    if incluir_todas:
+        print("Processando: Todas as Áreas")
+        pasta_todas = pasta_base / "Todas_as_Areas"
+        pasta_todas.mkdir(exist_ok=True, parents=True)
+    
+        exportar_tabelas_analise_vagas(df_todas_areas.copy(deep=False), "Todas as Áreas", pasta_todas)
+        exportar_tabelas_grupos_sociais(df_todas_areas.copy(deep=False), "Todas as Áreas", pasta_todas)
+        exportar_tabelas_distribuicao_geografica(df_todas_areas.copy(deep=False), "Todas as Áreas", pasta_todas)
+        print()
     
     # Processar cada área individual
     for area_nome, df_area in areas_data.items():
@@ -518,9 +506,9 @@ def main():
         pasta_area = pasta_base / normalizar_nome_arquivo(area_nome)
         pasta_area.mkdir(exist_ok=True, parents=True)
         
-        exportar_tabelas_analise_vagas(df_area.copy(), area_nome, pasta_area)
-        exportar_tabelas_grupos_sociais(df_area.copy(), area_nome, pasta_area)
-        exportar_tabelas_distribuicao_geografica(df_area.copy(), area_nome, pasta_area)
+        exportar_tabelas_analise_vagas(df_area.copy(deep=False), area_nome, pasta_area)
+        exportar_tabelas_grupos_sociais(df_area.copy(deep=False), area_nome, pasta_area)
+        exportar_tabelas_distribuicao_geografica(df_area.copy(deep=False), area_nome, pasta_area)
         print()
     
     # Resumo final
@@ -529,7 +517,7 @@ def main():
     print("=" * 80)
     print()
     print(f"📁 Pasta de destino: {pasta_base.absolute()}")
-    print(f"📊 Áreas processadas: {len(areas_data) + 1} (incluindo 'Todas as Áreas')")
+    print(f"📊 Áreas processadas: {len(areas_data) + incluir_todas} (incluindo 'Todas as Áreas')")
     print()
     print("Estrutura de pastas criada:")
     print(f"  └── tabelas_exportadas/")
@@ -2,6 +2,7 @@
 Script para exportar todas as tabelas em um único arquivo PDF organizado por áreas.
 Cada área terá suas próprias seções no PDF.
 """
+import argparse
 import os
 import pandas as pd
 from pathlib import Path
@@ -14,6 +15,9 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from config import GRUPOS_SOCIAIS, ORDEM_NOTAS
+from utils.data_loader import enable_copy_on_write, load_dataset
+from utils.filters import TODAS_AREAS, FilterSpec, apply_filter_spec
+from utils.social_groups import is_yes
 
 def normalizar_nome_arquivo(nome):
     """Normaliza nome para usar em arquivo"""
@@ -86,11 +90,6 @@ def gerar_tabelas_analise_vagas(df, area_nome, styles):
     elementos.append(Paragraph(f"ANÁLISE DE VAGAS - {area_nome}", styles['CustomHeading1']))
     elementos.append(Spacer(1, 12))
     
-    # Converter colunas de vagas para numérico
-    for col in ['Qnt Vagas Totais', 'Vagas Totais AA', 'Vagas Totais Agregadas', 'Vagas Totais Por Grupo/Exclusivas']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    
     # 1. Resumo Geral
     total_vagas_gerais = df['Qnt Vagas Totais'].sum()
     total_vagas_aa = df['Vagas Totais AA'].sum()
@@ -123,8 +122,8 @@ def gerar_tabelas_analise_vagas(df, area_nome, styles):
         elementos.extend(criar_tabela_pdf(vagas_por_regiao, "Distribuição por Região", styles))
     
     # 3. Distribuição por Nota CAPES
-    if 'Nota' in df.columns:
-        vagas_por_nota = df.groupby('Nota').agg({
+    if 'NOTA' in df.columns:
+        vagas_por_nota = df.groupby('NOTA').agg({
             'Qnt Vagas Totais': 'sum',
             'Vagas Totais AA': 'sum',
             'Nome do Programa': 'count'
@@ -156,7 +155,7 @@ def gerar_tabelas_grupos_sociais(df, area_nome, styles):
     grupos_stats = []
     for nome_grupo, coluna in GRUPOS_SOCIAIS.items():
         if coluna in df.columns:
-            programas_com_grupo = (df[coluna].fillna('').str.strip().str.upper() == 'SIM').sum()
+            programas_com_grupo = is_yes(df[coluna]).sum()
             grupos_stats.append({
                 'Grupo': nome_grupo,
                 'Programas': int(programas_com_grupo),
@@ -181,7 +180,7 @@ def gerar_tabelas_grupos_sociais(df, area_nome, styles):
             for grupo in df_grupos['Grupo'].head(5):
                 col = GRUPOS_SOCIAIS[grupo]
                 if col in df_reg.columns:
-                    qtd = (df_reg[col].fillna('').str.strip().str.upper() == 'SIM').sum()
+                    qtd = is_yes(df_reg[col]).sum()
                     row_data[grupo[:15]] = f"{qtd} ({round((qtd/total_reg*100), 1)}%)" if total_reg > 0 else "0"
             
             regional_data.append(row_data)
@@ -229,8 +228,21 @@ def gerar_tabelas_distribuicao_geografica(df, area_nome, styles):
     
     return elementos
 
-def main():
-    """Função principal"""
+def main(argv=None):
+    """
+    Função principal
+    
+    Aceita --filtros com a query string da URL do dashboard (FilterSpec):
+    com uma área, só ela é exportada; os demais filtros valem para todas.
+    """
+    parser = argparse.ArgumentParser(description="Exporta as tabelas em PDF do dashboard")
+    parser.add_argument(
+        '--filtros', default='',
+        help="filtros no formato da URL do dashboard, ex.: 'area=Artes&regiao=Sudeste&status=Com+AA'"
+    )
+    spec = FilterSpec.from_query_string(parser.parse_args(argv).filtros)
+    incluir_todas = spec.area == TODAS_AREAS
+    
     print("=" * 80)
     print("EXPORTAÇÃO DE TABELAS EM PDF - ANÁLISE DE VAGAS E GRUPOS SOCIAIS")
     print("=" * 80)
@@ -238,27 +250,40 @@ def main():
     
     # Carregar dados
     print("Carregando dados...")
-    excel_file = pd.ExcelFile('dados_brutos.xlsx')
-    areas_data = {}
+    # Usa o mesmo snapshot colunar do dashboard (o Excel só é lido se tiver mudado)
+    enable_copy_on_write()
+    areas_brutas, df_brutas, _ = load_dataset()
+    validas = []
     
-    for sheet_name in excel_file.sheet_names:
-        df_area = pd.read_excel(excel_file, sheet_name=sheet_name)
+    for sheet_name in areas_brutas:
+        if not incluir_todas and sheet_name != spec.area:
+            continue
         
-        if 'Editais AA' not in df_area.columns or 'Nome do Programa' not in df_area.columns:
+        colunas = areas_brutas.columns(sheet_name)
+        if 'Editais AA' not in colunas or 'Nome do Programa' not in colunas:
             print(f"  [SKIP] Pulando planilha '{sheet_name}' - colunas necessárias não encontradas")
             continue
-        
-        df_area['Área'] = sheet_name
-        if 'Nota' in df_area.columns:
-            df_area['Nota'] = df_area['Nota'].astype(str).str.strip()
-        df_area['Status AA'] = df_area['Editais AA'].apply(
-            lambda x: 'Com Editais AA' if str(x).upper() == 'SIM' else 'Sem Editais AA'
-        )
-        areas_data[sheet_name] = df_area
+        validas.append(sheet_name)
+    
+    # Filtros num único passe sobre as linhas das áreas válidas ('Status AA'
+    # já vem da ingestão), contíguas no DataFrame; as áreas voltam a ser
+    # fatias do resultado
+    df_todas_areas = df_brutas.take(areas_brutas.rows(validas))
+    df_todas_areas = apply_filter_spec(df_todas_areas, spec)
+    areas_data = areas_brutas.realign(df_todas_areas, validas, vazias=False)
+    for sheet_name in validas:
+        if sheet_name not in areas_data:
+            print(f"  [SKIP] Pulando planilha '{sheet_name}' - nenhum programa com os filtros")
+    
+    if not areas_data:
+        print("Nenhum programa encontrado com os filtros informados.")
+        return
     
-    df_todas_areas = pd.concat(areas_data.values(), ignore_index=True)
+    df_todas_areas = areas_data.frame
     
     print(f"[OK] Dados carregados: {len(areas_data)} áreas encontradas")
+    if spec.active_filters or not incluir_todas:
+        print(f"[OK] Filtros: {spec.to_query_string()}")
     print()
     
     # Criar PDF
@@ -312,22 +337,23 @@ def main():
     elementos.append(Paragraph("Ações Afirmativas em Programas de Pós-Graduação", styles['Heading2']))
     elementos.append(Spacer(1, 0.5*inch))
     elementos.append(Paragraph(f"Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
-    elementos.append(Paragraph(f"Total de Áreas: {len(areas_data) + 1} (incluindo 'Todas as Áreas')", styles['Normal']))
+    elementos.append(Paragraph(f"Total de Áreas: {len(areas_data) + incluir_todas} (incluindo 'Todas as Áreas')", styles['Normal']))
     elementos.append(PageBreak())
     
     # Processar "Todas as Áreas"
-    print("  Processando: Todas as Áreas")
-    elementos.extend(gerar_tabelas_analise_vagas(df_todas_areas.copy(), "Todas as Áreas", styles))
-    elementos.extend(gerar_tabelas_grupos_sociais(df_todas_areas.copy(), "Todas as Áreas", styles))
-    elementos.extend(gerar_tabelas_distribuicao_geografica(df_todas_areas.copy(), "Todas as Áreas", styles))
+    if incluir_todas:
+        print("  Processando: Todas as Áreas")
+        elementos.extend(gerar_tabelas_analise_vagas(df_todas_areas.copy(deep=False), "Todas as Áreas", styles))
+        elementos.extend(gerar_tabelas_grupos_sociais(df_todas_areas.copy(deep=False), "Todas as Áreas", styles))
+        elementos.extend(gerar_tabelas_distribuicao_geografica(df_todas_areas.copy(deep=False), "Todas as Áreas", styles))
     
     # Processar cada área individual
     for i, (area_nome, df_area) in enumerate(areas_data.items(), 1):
         print(f"  Processando: {area_nome} ({i}/{len(areas_data)})")
         elementos.append(PageBreak())
-        elementos.extend(gerar_tabelas_analise_vagas(df_area.copy(), area_nome, styles))
-        elementos.extend(gerar_tabelas_grupos_sociais(df_area.copy(), area_nome, styles))
-        elementos.extend(gerar_tabelas_distribuicao_geografica(df_area.copy(), area_nome, styles))
+        elementos.extend(gerar_tabelas_analise_vagas(df_area.copy(deep=False), area_nome, styles))
+        elementos.extend(gerar_tabelas_grupos_sociais(df_area.copy(deep=False), area_nome, styles))
+        elementos.extend(gerar_tabelas_distribuicao_geografica(df_area.copy(deep=False), area_nome, styles))
     
     # Gerar PDF
     print("\nGerando arquivo PDF...")
@@ -339,7 +365,7 @@ def main():
         print("=" * 80)
         print()
         print(f"📄 Arquivo PDF criado: {pdf_filename}")
-        print(f"📊 Áreas incluídas: {len(areas_data) + 1} (incluindo 'Todas as Áreas')")
+        print(f"📊 Áreas incluídas: {len(areas_data) + incluir_todas} (incluindo 'Todas as Áreas')")
         print()
         print("O PDF contém:")
         print("  ✓ Página de título")
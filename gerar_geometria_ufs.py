@@ -0,0 +1,111 @@
+"""
+Gera os GeoJSON simplificados das UFs usados pelo mapa coroplético
+
+Lê uma malha de UFs em GeoJSON (ex.: a malha de Unidades da Federação do
+IBGE convertida para GeoJSON, em WGS84/SIRGAS 2000) e grava em
+PASTA_GEOMETRIA um arquivo por nível de NIVEIS_GEOMETRIA, com a
+simplificação que preserva a topologia (utils/geometry.py). Cada feature
+sai com id e properties.UF iguais à sigla da UF. Rodar uma vez e versionar
+os arquivos: o dashboard e o exportar_graficos.py só leem os arquivos
+locais, sem acesso à rede, e sem eles o mapa coroplético fica desligado.
+
+A malha do IBGE (BR_UF_<ano>, em geoftp.ibge.gov.br) vem em shapefile;
+para converter: ogr2ogr -f GeoJSON -t_srs EPSG:4326 malha_ufs.geojson
+BR_UF_2022.shp (a sigla fica em SIGLA_UF, reconhecida sem --campo).
+
+Uso: python gerar_geometria_ufs.py malha_ufs.geojson [--campo SIGLA_UF]
+"""
+import argparse
+from pathlib import Path
+
+import geojson
+
+from config import COORDENADAS_UFS, NIVEIS_GEOMETRIA, PASTA_GEOMETRIA
+from utils.geometry import CODIGOS_IBGE_UFS, geometry_path, simplify_topology
+
+# Propriedades testadas, em ordem, quando --campo não é informado
+CAMPOS_UF = ['SIGLA_UF', 'sigla', 'SIGLA', 'UF', 'uf', 'CD_UF', 'codigo_ibg', 'cod_uf']
+
+
+def sigla_da_feature(feature, campo):
+    """
+    Sigla da UF de uma feature (a partir da sigla ou do código IBGE)
+
+    Args:
+        feature: feature da malha de origem
+        campo: propriedade com a sigla ou o código (None = CAMPOS_UF e o id)
+
+    Returns:
+        str ou None se a feature não identificar uma UF
+    """
+    propriedades = feature.get('properties') or {}
+    candidatos = [propriedades.get(campo)] if campo else [propriedades.get(nome) for nome in CAMPOS_UF]
+    if not campo:
+        candidatos.append(feature.get('id'))
+    for valor in candidatos:
+        if valor is None:
+            continue
+        texto = str(valor).strip().upper()
+        if texto in COORDENADAS_UFS:
+            return texto
+        if texto.isdigit() and int(texto) in CODIGOS_IBGE_UFS:
+            return CODIGOS_IBGE_UFS[int(texto)]
+    return None
+
+
+def main(argv=None):
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Gera os GeoJSON simplificados das UFs")
+    parser.add_argument('origem', help="malha de UFs em GeoJSON (longitude/latitude em graus)")
+    parser.add_argument('--campo', default=None, help="propriedade com a sigla ou o código IBGE da UF")
+    argumentos = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("GEOMETRIA DAS UFs - NÍVEIS DE PRECISÃO")
+    print("=" * 60)
+
+    with open(argumentos.origem, encoding='utf-8') as arquivo:
+        origem = geojson.load(arquivo)
+
+    features = []
+    for feature in origem['features']:
+        sigla = sigla_da_feature(feature, argumentos.campo)
+        if sigla is None:
+            print(f"  [SKIP] Feature sem UF reconhecida: {feature.get('properties')}")
+            continue
+        features.append(geojson.Feature(id=sigla, geometry=feature['geometry'], properties={'UF': sigla}))
+
+    faltantes = sorted(set(COORDENADAS_UFS) - {feature['id'] for feature in features})
+    if faltantes:
+        print(f"  [AVISO] UFs ausentes da malha: {', '.join(faltantes)}")
+    colecao = geojson.FeatureCollection(features)
+
+    Path(PASTA_GEOMETRIA).mkdir(exist_ok=True)
+    tamanho_origem = Path(argumentos.origem).stat().st_size
+    print(f"Origem: {argumentos.origem} ({len(features)} UFs, {tamanho_origem / 1024:,.0f} KB)\n")
+    print(f"{'Nível':<8} {'Tolerância':>10} {'Casas':>6} {'Vértices':>9} {'Tamanho (KB)':>13}")
+    for nivel, parametros in NIVEIS_GEOMETRIA.items():
+        simplificada = simplify_topology(colecao, parametros['tolerancia'], parametros['casas'])
+        if not simplificada.is_valid:
+            raise ValueError(f"GeoJSON inválido no nível '{nivel}': {simplificada.errors()}")
+        texto = geojson.dumps(simplificada, separators=(',', ':'))
+        geometry_path(nivel).write_text(texto, encoding='utf-8')
+        vertices = sum(
+            len(anel)
+            for feature in simplificada['features']
+            for poligono in (
+                [feature['geometry']['coordinates']] if feature['geometry']['type'] == 'Polygon'
+                else feature['geometry']['coordinates']
+            )
+            for anel in poligono
+        )
+        print(
+            f"{nivel:<8} {parametros['tolerancia']:>10} {parametros['casas']:>6} "
+            f"{vertices:>9,} {len(texto.encode('utf-8')) / 1024:>13,.1f}"
+        )
+
+    print(f"\n[OK] Arquivos gravados em: {Path(PASTA_GEOMETRIA).absolute()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,13 @@ Análise de correlações e cruzamentos entre diferentes variáveis
 """
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
-from utils.data_loader import load_all_areas, get_data_for_area, prepare_dataframe
-from utils.filters import render_area_selector, render_global_filters
+from utils.data_loader import enable_copy_on_write, load_all_areas, load_filter_index, load_cube, get_area_frame
+from utils.cache import memoize_function
+from utils.filters import render_area_selector, render_global_filters, get_filter_spec, filter_fingerprint
+from utils.sections import lazy_tabs
+from utils.cube import slice_cube, rollup, crosstab
+from utils.charts import create_bar_chart, create_bar_line_chart, create_scatter_plot, create_table_heatmap
 from config import CORES, ORDEM_NOTAS
 
 # Configuração da página
@@ -19,6 +21,7 @@ st.set_page_config(
 )
 
 # Carregar dados
+enable_copy_on_write()
 areas_data, df_todas_areas, lista_areas = load_all_areas()
 
 # Sidebar
@@ -30,22 +33,39 @@ st.sidebar.markdown("---")
 area_selecionada = render_area_selector(lista_areas)
 
 # Obter dados
-df = get_data_for_area(area_selecionada, areas_data, df_todas_areas)
-df = prepare_dataframe(df)
+df = get_area_frame(area_selecionada)
 
 # Filtros
-df_filtrado, filtros_ativos = render_global_filters(df)
+indice = load_filter_index(area_selecionada)
+df_filtrado, filtros_ativos = render_global_filters(df, indice)
+cubo = slice_cube(load_cube(), get_filter_spec(area_selecionada).selection())
+
+# Chave dos cálculos memorizados: versão do dataset + linhas selecionadas
+impressao = filter_fingerprint(get_filter_spec(area_selecionada), indice)
 
 # ==================== PREPARAÇÃO DOS DADOS ====================
 
-# Converter colunas numéricas
-colunas_numericas = ['Qnt. Vagas Totais', 'Vagas Totais AA', 'Vagas Totais Agregadas', 'Vagas Totais Por Grupo/Exclusivas']
-for col in colunas_numericas:
-    if col in df_filtrado.columns:
-        df_filtrado[col] = pd.to_numeric(df_filtrado[col], errors='coerce').fillna(0)
+# As colunas de vagas já chegam inteiras da carga (utils/vacancies.py)
 
-# Criar variável binária para AA
-df_filtrado['Tem_AA'] = (df_filtrado['Status AA'] == 'Com Editais AA').astype(int)
+# Variáveis da matriz de correlação (coluna -> rótulo)
+colunas_possiveis = {
+    'Qnt Vagas Totais': 'Vagas Totais',
+    'Vagas Totais AA': 'Vagas AA',
+    'Vagas Totais Agregadas': 'Vagas Agregadas',
+    'Vagas Totais Por Grupo/Exclusivas': 'Vagas Por Grupo',
+    'Tem_AA': 'Tem AA (0/1)'
+}
+
+
+@memoize_function
+def matriz_correlacao(_df, impressao):
+    # Correlação entre as colunas de vagas e a variável binária de AA;
+    # None quando há menos de duas variáveis disponíveis
+    df_corr = _df.assign(Tem_AA=(_df['Status AA'] == 'Com Editais AA').astype(int))
+    colunas_disponiveis = {col: nome for col, nome in colunas_possiveis.items() if col in df_corr.columns}
+    if len(colunas_disponiveis) < 2:
+        return None
+    return df_corr[list(colunas_disponiveis)].rename(columns=colunas_disponiveis).corr()
 
 # ==================== CONTEÚDO ====================
 
@@ -53,336 +73,270 @@ st.title("🔄 Análises Cruzadas")
 st.markdown("Explore correlações e relações entre diferentes dimensões dos dados")
 st.markdown("---")
 
-# Análise: Nota x Região
-st.markdown("## 🗺️ Cruzamento: Nota CAPES x Região")
-
-if 'NOTA' in df_filtrado.columns and 'Região' in df_filtrado.columns:
-    # Criar tabela cruzada
-    crosstab_nota_regiao = pd.crosstab(
-        df_filtrado['Região'],
-        df_filtrado['NOTA']
-    )
-    
-    # Ordenar colunas por ordem de notas
-    colunas_ordenadas = [n for n in ORDEM_NOTAS if n in crosstab_nota_regiao.columns]
-    crosstab_nota_regiao = crosstab_nota_regiao[colunas_ordenadas]
-    
-    col_heat1, col_table1 = st.columns([2, 1])
-    
-    with col_heat1:
-        # Heatmap
-        fig_heat_nota_regiao = go.Figure(data=go.Heatmap(
-            z=crosstab_nota_regiao.values,
-            x=crosstab_nota_regiao.columns,
-            y=crosstab_nota_regiao.index,
-            texttemplate='%{z}',
-            textfont={"size": 12},
-            colorscale='Viridis',
-            colorbar=dict(title="Programas")
-        ))
-        
-        fig_heat_nota_regiao.update_layout(
-            title='Distribuição de Programas: Nota x Região',
-            xaxis_title='Nota CAPES',
-            yaxis_title='Região',
-            height=400
-        )
-        st.plotly_chart(fig_heat_nota_regiao, use_container_width=True)
-    
-    with col_table1:
-        st.markdown("**Tabela de Frequência:**")
-        st.dataframe(crosstab_nota_regiao, use_container_width=True, height=400)
-    
-    # Percentual de AA por Nota e Região
-    st.markdown("### Percentual de Programas com AA (Nota x Região)")
-    
-    # Criar tabela de percentual
-    df_aa_nota_regiao = df_filtrado[df_filtrado['Status AA'] == 'Com Editais AA']
-    crosstab_aa = pd.crosstab(df_aa_nota_regiao['Região'], df_aa_nota_regiao['NOTA'])
-    crosstab_aa = crosstab_aa.reindex(columns=colunas_ordenadas, fill_value=0)
-    
-    # Calcular percentuais
-    perc_aa_nota_regiao = (crosstab_aa / crosstab_nota_regiao * 100).fillna(0).round(1)
-    
-    fig_heat_perc = go.Figure(data=go.Heatmap(
-        z=perc_aa_nota_regiao.values,
-        x=perc_aa_nota_regiao.columns,
-        y=perc_aa_nota_regiao.index,
-        texttemplate='%{z:.1f}%',
-        textfont={"size": 11},
-        colorscale='RdYlGn',
-        colorbar=dict(title="% com AA")
-    ))
-    
-    fig_heat_perc.update_layout(
-        title='Percentual de Programas com AA por Nota e Região',
-        xaxis_title='Nota CAPES',
-        yaxis_title='Região',
-        height=400
-    )
-    st.plotly_chart(fig_heat_perc, use_container_width=True)
-
-st.markdown("---")
-
-# Análise: Tipo IES x Modalidade
-st.markdown("## 🏛️ Cruzamento: Tipo de IES x Modalidade de Ensino")
-
-if 'Tipo de IES' in df_filtrado.columns and 'Modalidade de Ensino' in df_filtrado.columns:
-    crosstab_ies = pd.crosstab(
-        df_filtrado['Tipo de IES'],
-        df_filtrado['Modalidade de Ensino']
-    )
-    
-    col_heat2, col_table2 = st.columns([2, 1])
-    
-    with col_heat2:
-        fig_heat_ies = go.Figure(data=go.Heatmap(
-            z=crosstab_ies_mod.values,
-            x=crosstab_ies_mod.columns,
-            y=crosstab_ies_mod.index,
-            texttemplate='%{z}',
-            textfont={"size": 12},
-            colorscale='Blues',
-            colorbar=dict(title="Programas")
-        ))
-        
-        fig_heat_ies.update_layout(
-            title='Distribuição: Tipo de IES x Modalidade',
-            xaxis_title='Modalidade de Ensino',
-            yaxis_title='Tipo de IES',
-            height=400
-        )
-        st.plotly_chart(fig_heat_ies, use_container_width=True)
-    
-    with col_table2:
-        st.markdown("**Tabela de Frequência:**")
-        st.dataframe(crosstab_ies_mod, use_container_width=True, height=400)
-    
-    # Percentual com AA
-    st.markdown("### Percentual com AA (Tipo IES x Modalidade)")
-    
-    df_aa_ies = df_filtrado[df_filtrado['Status AA'] == 'Com Editais AA']
-    crosstab_aa_ies = pd.crosstab(df_aa_ies['Tipo de IES'], df_aa_ies['Modalidade de Ensino'])
-    perc_aa_ies = (crosstab_aa_ies / crosstab_ies_mod * 100).fillna(0).round(1)
-    
-    fig_heat_perc_ies = go.Figure(data=go.Heatmap(
-        z=perc_aa_ies.values,
-        x=perc_aa_ies.columns,
-        y=perc_aa_ies.index,
-        texttemplate='%{z:.1f}%',
-        textfont={"size": 11},
-        colorscale='RdYlGn',
-        colorbar=dict(title="% com AA")
-    ))
-    
-    fig_heat_perc_ies.update_layout(
-        title='Percentual com AA: Tipo de IES x Modalidade',
-        xaxis_title='Modalidade de Ensino',
-        yaxis_title='Tipo de IES',
-        height=400
-    )
-    st.plotly_chart(fig_heat_perc_ies, use_container_width=True)
+aba_nota_regiao, aba_ies_modalidade, aba_concentracao, aba_correlacao = lazy_tabs([
+    "🗺️ Nota x Região",
+    "🏛️ Tipo de IES x Modalidade",
+    "📍 Concentração",
+    "🔢 Correlação"
+], 'cruzadas_aba')
 
-st.markdown("---")
+with aba_nota_regiao:
+    if aba_nota_regiao.open:
+        # Análise: Nota x Região
+        st.markdown("## 🗺️ Cruzamento: Nota CAPES x Região")
 
-# Análise de Concentração
-st.markdown("## 📍 Análise de Concentração")
+        if 'NOTA' in df_filtrado.columns and 'Região' in df_filtrado.columns:
+            # Criar tabela cruzada
+            crosstab_nota_regiao = crosstab(cubo, 'Região', 'NOTA')
+            
+            # Ordenar colunas por ordem de notas
+            colunas_ordenadas = [n for n in ORDEM_NOTAS if n in crosstab_nota_regiao.columns]
+            crosstab_nota_regiao = crosstab_nota_regiao[colunas_ordenadas]
+            
+            col_heat1, col_table1 = st.columns([2, 1])
+            
+            with col_heat1:
+                # Heatmap
+                fig_heat_nota_regiao = create_table_heatmap(
+                    crosstab_nota_regiao,
+                    title='Distribuição de Programas: Nota x Região',
+                    colorscale='Viridis',
+                    texttemplate='%{z}',
+                    textfont_size=12,
+                    colorbar_title="Programas",
+                    layout=dict(xaxis_title='Nota CAPES', yaxis_title='Região', height=400)
+                )
+                st.plotly_chart(fig_heat_nota_regiao, use_container_width=True)
+            
+            with col_table1:
+                st.markdown("**Tabela de Frequência:**")
+                st.dataframe(crosstab_nota_regiao, use_container_width=True, height=400)
+            
+            # Percentual de AA por Nota e Região
+            st.markdown("### Percentual de Programas com AA (Nota x Região)")
+            
+            # Criar tabela de percentual
+            crosstab_aa = crosstab(cubo, 'Região', 'NOTA', medida='Com AA')
+            crosstab_aa = crosstab_aa.reindex(columns=colunas_ordenadas, fill_value=0)
+            
+            # Calcular percentuais
+            perc_aa_nota_regiao = (crosstab_aa / crosstab_nota_regiao * 100).fillna(0).round(1)
+            
+            fig_heat_perc = create_table_heatmap(
+                perc_aa_nota_regiao,
+                title='Percentual de Programas com AA por Nota e Região',
+                colorscale='RdYlGn',
+                texttemplate='%{z:.1f}%',
+                textfont_size=11,
+                colorbar_title="% com AA",
+                layout=dict(xaxis_title='Nota CAPES', yaxis_title='Região', height=400)
+            )
+            st.plotly_chart(fig_heat_perc, use_container_width=True)
 
-tab1, tab2, tab3 = st.tabs(["Por Região", "Por Nota", "Por Tipo de IES"])
 
-with tab1:
-    st.markdown("### Concentração de AA por Região")
-    
-    if 'Região' in df_filtrado.columns:
-        # Calcular estatísticas por região
-        stats_regiao = df_filtrado.groupby('Região').agg({
-            'Tem_AA': ['sum', 'count', 'mean'],
-            'Vagas Totais AA': 'sum'
-        }).reset_index()
-        
-        stats_regiao.columns = ['Região', 'Com_AA', 'Total', 'Perc_AA', 'Vagas_AA']
-        stats_regiao['Perc_AA'] = (stats_regiao['Perc_AA'] * 100).round(1)
-        stats_regiao = stats_regiao.sort_values('Com_AA', ascending=False)
-        
-        col_conc1, col_conc2 = st.columns(2)
-        
-        with col_conc1:
-            # Gráfico de bolhas
-            fig_bubble = px.scatter(
-                stats_regiao,
-                x='Total',
-                y='Com_AA',
-                size='Vagas_AA',
-                color='Perc_AA',
-                text='Região',
-                title='Concentração de AA por Região',
-                labels={
-                    'Total': 'Total de Programas',
-                    'Com_AA': 'Programas com AA',
-                    'Perc_AA': '% com AA',
-                    'Vagas_AA': 'Vagas AA'
-                },
-                color_continuous_scale='Viridis'
-            )
-            fig_bubble.update_traces(textposition='top center')
-            fig_bubble.update_layout(height=400)
-            st.plotly_chart(fig_bubble, use_container_width=True)
-        
-        with col_conc2:
-            st.markdown("**Dados de Concentração:**")
-            st.dataframe(
-                stats_regiao[['Região', 'Total', 'Com_AA', 'Perc_AA', 'Vagas_AA']],
-                use_container_width=True,
-                hide_index=True
-            )
+with aba_ies_modalidade:
+    if aba_ies_modalidade.open:
+        # Análise: Tipo IES x Modalidade
+        st.markdown("## 🏛️ Cruzamento: Tipo de IES x Modalidade de Ensino")
 
-with tab2:
-    st.markdown("### Concentração de AA por Nota CAPES")
-    
-    if 'NOTA' in df_filtrado.columns:
-        stats_nota = df_filtrado.groupby('NOTA').agg({
-            'Tem_AA': ['sum', 'count', 'mean'],
-            'Vagas Totais AA': 'sum'
-        }).reset_index()
-        
-        stats_nota.columns = ['Nota', 'Com_AA', 'Total', 'Perc_AA', 'Vagas_AA']
-        stats_nota['Perc_AA'] = (stats_nota['Perc_AA'] * 100).round(1)
-        
-        # Ordenar por ordem de notas
-        stats_nota['Nota'] = pd.Categorical(stats_nota['Nota'], categories=ORDEM_NOTAS, ordered=True)
-        stats_nota = stats_nota.sort_values('Nota')
-        
-        col_nota1, col_nota2 = st.columns(2)
-        
-        with col_nota1:
-            fig_nota_conc = go.Figure()
+        if 'Tipo de IES' in df_filtrado.columns and 'Modalidade de Ensino' in df_filtrado.columns:
+            crosstab_ies_mod = crosstab(cubo, 'Tipo de IES', 'Modalidade de Ensino')
             
-            fig_nota_conc.add_trace(go.Bar(
-                name='Total de Programas',
-                x=stats_nota['Nota'],
-                y=stats_nota['Total'],
-                marker_color=CORES['primaria'],
-                yaxis='y',
-                offsetgroup=1
-            ))
+            col_heat2, col_table2 = st.columns([2, 1])
             
-            fig_nota_conc.add_trace(go.Scatter(
-                name='% com AA',
-                x=stats_nota['Nota'],
-                y=stats_nota['Perc_AA'],
-                marker_color=CORES['com_aa'],
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(width=3)
-            ))
+            with col_heat2:
+                fig_heat_ies = create_table_heatmap(
+                    crosstab_ies_mod,
+                    title='Distribuição: Tipo de IES x Modalidade',
+                    colorscale='Blues',
+                    texttemplate='%{z}',
+                    textfont_size=12,
+                    colorbar_title="Programas",
+                    layout=dict(xaxis_title='Modalidade de Ensino', yaxis_title='Tipo de IES', height=400)
+                )
+                st.plotly_chart(fig_heat_ies, use_container_width=True)
             
-            fig_nota_conc.update_layout(
-                title='AA por Nota CAPES',
-                xaxis_title='Nota',
-                yaxis=dict(title='Total de Programas', side='left'),
-                yaxis2=dict(title='% com AA', overlaying='y', side='right'),
-                height=400,
-                hovermode='x unified'
-            )
-            st.plotly_chart(fig_nota_conc, use_container_width=True)
-        
-        with col_nota2:
-            st.markdown("**Dados por Nota:**")
-            st.dataframe(
-                stats_nota[['Nota', 'Total', 'Com_AA', 'Perc_AA', 'Vagas_AA']],
-                use_container_width=True,
-                hide_index=True
+            with col_table2:
+                st.markdown("**Tabela de Frequência:**")
+                st.dataframe(crosstab_ies_mod, use_container_width=True, height=400)
+            
+            # Percentual com AA
+            st.markdown("### Percentual com AA (Tipo IES x Modalidade)")
+            
+            crosstab_aa_ies = crosstab(cubo, 'Tipo de IES', 'Modalidade de Ensino', medida='Com AA')
+            perc_aa_ies = (crosstab_aa_ies / crosstab_ies_mod * 100).fillna(0).round(1)
+            
+            fig_heat_perc_ies = create_table_heatmap(
+                perc_aa_ies,
+                title='Percentual com AA: Tipo de IES x Modalidade',
+                colorscale='RdYlGn',
+                texttemplate='%{z:.1f}%',
+                textfont_size=11,
+                colorbar_title="% com AA",
+                layout=dict(xaxis_title='Modalidade de Ensino', yaxis_title='Tipo de IES', height=400)
             )
+            st.plotly_chart(fig_heat_perc_ies, use_container_width=True)
 
-with tab3:
-    st.markdown("### Concentração de AA por Tipo de IES")
-    
-    if 'Tipo de IES' in df_filtrado.columns:
-        stats_ies = df_filtrado.groupby('Tipo de IES').agg({
-            'Tem_AA': ['sum', 'count', 'mean'],
-            'Vagas Totais AA': 'sum'
-        }).reset_index()
-        
-        stats_ies.columns = ['Tipo_IES', 'Com_AA', 'Total', 'Perc_AA', 'Vagas_AA']
-        stats_ies['Perc_AA'] = (stats_ies['Perc_AA'] * 100).round(1)
-        stats_ies = stats_ies.sort_values('Perc_AA', ascending=False)
-        
-        col_ies1, col_ies2 = st.columns(2)
-        
-        with col_ies1:
-            fig_ies_conc = px.bar(
-                stats_ies,
-                x='Tipo_IES',
-                y=['Total', 'Com_AA'],
-                title='Programas por Tipo de IES',
-                labels={'value': 'Quantidade', 'Tipo_IES': 'Tipo de IES'},
-                barmode='group',
-                color_discrete_sequence=[CORES['primaria'], CORES['com_aa']]
-            )
-            fig_ies_conc.update_layout(height=400)
-            st.plotly_chart(fig_ies_conc, use_container_width=True)
-        
-        with col_ies2:
-            st.markdown("**Dados por Tipo IES:**")
-            st.dataframe(
-                stats_ies[['Tipo_IES', 'Total', 'Com_AA', 'Perc_AA', 'Vagas_AA']],
-                use_container_width=True,
-                hide_index=True
-            )
 
-st.markdown("---")
+with aba_concentracao:
+    if aba_concentracao.open:
+        # Análise de Concentração
+        st.markdown("## 📍 Análise de Concentração")
 
-# Matriz de Correlação
-st.markdown("## 🔢 Matriz de Correlação - Variáveis Numéricas")
+        tab1, tab2, tab3 = lazy_tabs(["Por Região", "Por Nota", "Por Tipo de IES"], 'cruzadas_concentracao')
 
-# Selecionar colunas numéricas disponíveis
-colunas_para_correlacao = []
-colunas_possiveis = {
-    'Qnt. Vagas Totais': 'Vagas Totais',
-    'Vagas Totais AA': 'Vagas AA',
-    'Vagas Totais Agregadas': 'Vagas Agregadas',
-    'Vagas Totais Por Grupo/Exclusivas': 'Vagas Por Grupo',
-    'Tem_AA': 'Tem AA (0/1)'
-}
+        with tab1:
+            if tab1.open:
+                st.markdown("### Concentração de AA por Região")
+                
+                if 'Região' in df_filtrado.columns:
+                    # Calcular estatísticas por região
+                    stats_regiao = rollup(cubo, 'Região')
+                    stats_regiao = pd.DataFrame({
+                        'Região': stats_regiao['Região'],
+                        'Com_AA': stats_regiao['Com AA'],
+                        'Total': stats_regiao['Programas'],
+                        'Perc_AA': (stats_regiao['Com AA'] / stats_regiao['Programas'] * 100).round(1),
+                        'Vagas_AA': stats_regiao['Vagas Totais AA']
+                    })
+                    stats_regiao = stats_regiao.sort_values('Com_AA', ascending=False)
+                    
+                    col_conc1, col_conc2 = st.columns(2)
+                    
+                    with col_conc1:
+                        # Gráfico de bolhas
+                        fig_bubble = create_scatter_plot(
+                            stats_regiao,
+                            x='Total',
+                            y='Com_AA',
+                            size='Vagas_AA',
+                            color='Perc_AA',
+                            text='Região',
+                            title='Concentração de AA por Região',
+                            labels={
+                                'Total': 'Total de Programas',
+                                'Com_AA': 'Programas com AA',
+                                'Perc_AA': '% com AA',
+                                'Vagas_AA': 'Vagas AA'
+                            },
+                            color_continuous_scale='Viridis',
+                            traces=dict(textposition='top center'),
+                            layout=dict(height=400)
+                        )
+                        st.plotly_chart(fig_bubble, use_container_width=True)
+                    
+                    with col_conc2:
+                        st.markdown("**Dados de Concentração:**")
+                        st.dataframe(
+                            stats_regiao[['Região', 'Total', 'Com_AA', 'Perc_AA', 'Vagas_AA']],
+                            use_container_width=True,
+                            hide_index=True
+                        )
 
-df_corr = df_filtrado.copy()
-colunas_disponiveis = {}
+        with tab2:
+            if tab2.open:
+                st.markdown("### Concentração de AA por Nota CAPES")
+                
+                if 'NOTA' in df_filtrado.columns:
+                    stats_nota = rollup(cubo, 'NOTA')
+                    stats_nota = pd.DataFrame({
+                        'Nota': stats_nota['NOTA'],
+                        'Com_AA': stats_nota['Com AA'],
+                        'Total': stats_nota['Programas'],
+                        'Perc_AA': (stats_nota['Com AA'] / stats_nota['Programas'] * 100).round(1),
+                        'Vagas_AA': stats_nota['Vagas Totais AA']
+                    })
+                    
+                    # Ordenar por ordem de notas
+                    stats_nota['Nota'] = pd.Categorical(stats_nota['Nota'], categories=ORDEM_NOTAS, ordered=True)
+                    stats_nota = stats_nota.sort_values('Nota')
+                    
+                    col_nota1, col_nota2 = st.columns(2)
+                    
+                    with col_nota1:
+                        fig_nota_conc = create_bar_line_chart(
+                            stats_nota[['Nota', 'Total', 'Perc_AA']].rename(columns={'Total': 'Total de Programas', 'Perc_AA': '% com AA'}),
+                            x='Nota',
+                            bar='Total de Programas',
+                            line='% com AA',
+                            title='AA por Nota CAPES',
+                            layout=dict(xaxis_title='Nota', height=400, hovermode='x unified')
+                        )
+                        st.plotly_chart(fig_nota_conc, use_container_width=True)
+                    
+                    with col_nota2:
+                        st.markdown("**Dados por Nota:**")
+                        st.dataframe(
+                            stats_nota[['Nota', 'Total', 'Com_AA', 'Perc_AA', 'Vagas_AA']],
+                            use_container_width=True,
+                            hide_index=True
+                        )
 
-for col_orig, col_nome in colunas_possiveis.items():
-    if col_orig in df_corr.columns:
-        colunas_disponiveis[col_nome] = col_orig
+        with tab3:
+            if tab3.open:
+                st.markdown("### Concentração de AA por Tipo de IES")
+                
+                if 'Tipo de IES' in df_filtrado.columns:
+                    stats_ies = rollup(cubo, 'Tipo de IES')
+                    stats_ies = pd.DataFrame({
+                        'Tipo_IES': stats_ies['Tipo de IES'],
+                        'Com_AA': stats_ies['Com AA'],
+                        'Total': stats_ies['Programas'],
+                        'Perc_AA': (stats_ies['Com AA'] / stats_ies['Programas'] * 100).round(1),
+                        'Vagas_AA': stats_ies['Vagas Totais AA']
+                    })
+                    stats_ies = stats_ies.sort_values('Perc_AA', ascending=False)
+                    
+                    col_ies1, col_ies2 = st.columns(2)
+                    
+                    with col_ies1:
+                        fig_ies_conc = create_bar_chart(
+                            stats_ies[['Tipo_IES', 'Total', 'Com_AA']],
+                            x='Tipo_IES',
+                            y=['Total', 'Com_AA'],
+                            title='Programas por Tipo de IES',
+                            labels={'value': 'Quantidade', 'Tipo_IES': 'Tipo de IES'},
+                            barmode='group',
+                            color_discrete_sequence=[CORES['primaria'], CORES['com_aa']],
+                            layout=dict(height=400)
+                        )
+                        st.plotly_chart(fig_ies_conc, use_container_width=True)
+                    
+                    with col_ies2:
+                        st.markdown("**Dados por Tipo IES:**")
+                        st.dataframe(
+                            stats_ies[['Tipo_IES', 'Total', 'Com_AA', 'Perc_AA', 'Vagas_AA']],
+                            use_container_width=True,
+                            hide_index=True
+                        )
 
-if len(colunas_disponiveis) >= 2:
-    # Criar DataFrame apenas com colunas numéricas
-    df_numeric = df_corr[[col for col in colunas_disponiveis.values()]].copy()
-    df_numeric.columns = list(colunas_disponiveis.keys())
-    
-    # Calcular correlação
-    corr_matrix = df_numeric.corr()
-    
-    # Heatmap de correlação
-    fig_corr = go.Figure(data=go.Heatmap(
-        z=corr_matrix.values,
-        x=corr_matrix.columns,
-        y=corr_matrix.columns,
-        texttemplate='%{z:.2f}',
-        textfont={"size": 11},
-        colorscale='RdBu',
-        zmid=0,
-        colorbar=dict(title="Correlação")
-    ))
-    
-    fig_corr.update_layout(
-        title='Matriz de Correlação entre Variáveis',
-        height=500
-    )
-    st.plotly_chart(fig_corr, use_container_width=True)
-    
-    st.info("""
-    **Interpretação:**
-    - Valores próximos a **+1**: Correlação positiva forte
-    - Valores próximos a **0**: Sem correlação
-    - Valores próximos a **-1**: Correlação negativa forte
-    """)
-else:
-    st.warning("Dados insuficientes para análise de correlação.")
+
+with aba_correlacao:
+    if aba_correlacao.open:
+        # Matriz de Correlação
+        st.markdown("## 🔢 Matriz de Correlação - Variáveis Numéricas")
+
+        corr_matrix = matriz_correlacao(df_filtrado, impressao)
+
+        if corr_matrix is not None:
+            # Heatmap de correlação
+            fig_corr = create_table_heatmap(
+                corr_matrix,
+                title='Matriz de Correlação entre Variáveis',
+                colorscale='RdBu',
+                texttemplate='%{z:.2f}',
+                textfont_size=11,
+                colorbar_title="Correlação",
+                zmid=0,
+                layout=dict(height=500)
+            )
+            st.plotly_chart(fig_corr, use_container_width=True)
+            
+            st.info("""
+            **Interpretação:**
+            - Valores próximos a **+1**: Correlação positiva forte
+            - Valores próximos a **0**: Sem correlação
+            - Valores próximos a **-1**: Correlação negativa forte
+            """)
+        else:
+            st.warning("Dados insuficientes para análise de correlação.")
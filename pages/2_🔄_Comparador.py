@@ -4,12 +4,18 @@ Página para comparação lado a lado de programas de pós-graduação
 """
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from utils.data_loader import load_all_areas, get_data_for_area, prepare_dataframe
-from utils.filters import render_area_selector, render_global_filters
+from utils.data_loader import (
+    enable_copy_on_write, load_all_areas, load_filter_index, load_search_index, load_program_index, get_area_frame
+)
+from utils.filter_index import select_rows
+from utils.filters import (
+    TODAS_AREAS, FilterSpec, render_area_selector, render_cascade_filter, apply_filter_spec, sync_query_params
+)
 from utils.pdf_generator import gerar_pdf_comparacao
-from config import GRUPOS_SOCIAIS, CORES
+from utils.charts import create_bar_chart, create_radar_chart
+from utils.programs import lookup_programs, program_labels
+from utils.search import search
+from config import GRUPOS_SOCIAIS, COLUNA_CHAVE, COLUNAS_INTERNAS, CORES
 
 # Configuração da página
 st.set_page_config(
@@ -19,6 +25,7 @@ st.set_page_config(
 )
 
 # Carregar dados
+enable_copy_on_write()
 areas_data, df_todas_areas, lista_areas = load_all_areas()
 
 # Sidebar
@@ -30,8 +37,7 @@ st.sidebar.markdown("---")
 area_selecionada = render_area_selector(lista_areas)
 
 # Obter dados
-df = get_data_for_area(area_selecionada, areas_data, df_todas_areas)
-df = prepare_dataframe(df)
+df = get_area_frame(area_selecionada)
 
 # ==================== CONTEÚDO ====================
 
@@ -40,88 +46,111 @@ st.markdown("Utilize os filtros abaixo para encontrar e selecionar os programas
 st.markdown("---")
 
 # --- Filtros de Busca no Corpo da Página ---
+indice = load_filter_index(area_selecionada)
+
 with st.expander("🔍 Filtros de Busca", expanded=True):
     st.info("Selecione as características para filtrar a lista de programas disponíveis.")
     
     col_f1, col_f2, col_f3 = st.columns(3)
     col_f4, col_f5 = st.columns(2)
     
-    df_filtrado = df.copy()
+    # Cada filtro só oferece valores presentes nos programas que passam pelos anteriores
+    valores = {}
     
     # 1. Filtro de Área (se estiver vendo todas)
     with col_f1:
-        if 'Área' in df.columns and area_selecionada == 'Todas as Áreas':
-            areas_disp = sorted(df['Área'].unique().tolist())
-            sel_area = st.multiselect("Área do Conhecimento:", areas_disp)
-            if sel_area:
-                df_filtrado = df_filtrado[df_filtrado['Área'].isin(sel_area)]
+        if 'Área' in df.columns and area_selecionada == TODAS_AREAS:
+            render_cascade_filter("Área do Conhecimento:", indice, 'areas', valores)
         else:
             st.markdown(f"**Área:** {area_selecionada}")
             
     # 2. Filtro de Região
     with col_f2:
         if 'Região' in df.columns:
-            regioes = sorted(df_filtrado['Região'].dropna().unique().tolist())
-            sel_regiao = st.multiselect("Região:", regioes)
-            if sel_regiao:
-                df_filtrado = df_filtrado[df_filtrado['Região'].isin(sel_regiao)]
+            render_cascade_filter("Região:", indice, 'regioes', valores)
 
     # 3. Filtro de Estado (UF)
     with col_f3:
         if 'UF' in df.columns:
-            ufs_disponiveis = sorted(df_filtrado['UF'].dropna().unique().tolist())
-            sel_uf = st.multiselect("Estado (UF):", ufs_disponiveis)
-            if sel_uf:
-                df_filtrado = df_filtrado[df_filtrado['UF'].isin(sel_uf)]
+            render_cascade_filter("Estado (UF):", indice, 'ufs', valores)
 
     # 4. Filtro de IES
     with col_f4:
         if 'Sigla da IES' in df.columns:
-            ies_disponiveis = sorted(df_filtrado['Sigla da IES'].dropna().unique().tolist())
-            sel_ies = st.multiselect("Sigla da IES:", ies_disponiveis)
-            if sel_ies:
-                df_filtrado = df_filtrado[df_filtrado['Sigla da IES'].isin(sel_ies)]
+            render_cascade_filter("Sigla da IES:", indice, 'ies', valores)
 
     # 5. Filtro de Nota
     with col_f5:
         if 'NOTA' in df.columns:
-            notas_disponiveis = sorted(df_filtrado['NOTA'].dropna().unique().tolist())
-            sel_nota = st.multiselect("Nota CAPES:", notas_disponiveis)
-            if sel_nota:
-                df_filtrado = df_filtrado[df_filtrado['NOTA'].isin(sel_nota)]
+            render_cascade_filter("Nota CAPES:", indice, 'notas', valores)
+
+    spec = FilterSpec(area=area_selecionada, **valores)
+    sync_query_params(spec)
+    df_filtrado = apply_filter_spec(df, spec, indice)
 
     st.markdown(f"**Resultados encontrados:** {len(df_filtrado)} programas")
 
 st.markdown("---")
 
-# Inicializar estado da seleção se não existir
+# Programas identificados pela chave estável (utils/programs.py), com índice
+# chave -> linha do DataFrame da área
+indice_programas = load_program_index(area_selecionada)
+rotulos = program_labels(df)
+SEM_CANDIDATO = 'Selecione um programa...'
+
+def rotulo_programa(chave):
+    return chave if chave == SEM_CANDIDATO else rotulos.iat[indice_programas[chave]]
+
+# Inicializar estado da seleção se não existir (chaves de outra área saem)
 if 'comparador_programas' not in st.session_state:
     st.session_state.comparador_programas = []
+st.session_state.comparador_programas = [
+    chave for chave in st.session_state.comparador_programas if chave in indice_programas
+]
 
 # --- Área de Seleção de Programas ---
 st.markdown("### ➕ Adicionar Programas")
 
 col_add1, col_add2 = st.columns([3, 1])
 
-programas_filtrados = sorted(df_filtrado['Nome do Programa'].unique().tolist())
+with col_add1:
+    busca = st.text_input(
+        "Buscar por nome do programa, sigla da IES ou UF:",
+        placeholder="Ex.: antropologia ufsc",
+        key="comparador_busca"
+    )
+
+if busca.strip():
+    # Busca por trigramas, restrita aos programas que passam pelos filtros
+    posicoes, _ = search(load_search_index(area_selecionada), busca, linhas=select_rows(indice, spec.selection()))
+    encontrados = df.iloc[posicoes]
+    programas_filtrados = encontrados.loc[encontrados['Nome do Programa'].notna(), COLUNA_CHAVE].tolist()
+    rotulo_lista = f"Escolha um programa entre os mais parecidos com a busca ({len(programas_filtrados)} opções):"
+else:
+    programas_filtrados = sorted(
+        df_filtrado.loc[df_filtrado['Nome do Programa'].notna(), COLUNA_CHAVE],
+        key=rotulo_programa
+    )
+    rotulo_lista = f"Escolha um programa da lista filtrada ({len(programas_filtrados)} opções):"
 
 with col_add1:
     # Seletor de candidato (apenas um por vez, da lista filtrada)
     candidato_selecionado = st.selectbox(
-        f"Escolha um programa da lista filtrada ({len(programas_filtrados)} opções):",
-        options=['Selecione um programa...'] + programas_filtrados,
+        rotulo_lista,
+        options=[SEM_CANDIDATO] + programas_filtrados,
         index=0,
+        format_func=rotulo_programa,
         key="candidato_selecionado"
     )
 
 with col_add2:
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("➕ Adicionar", use_container_width=True):
-        if candidato_selecionado != 'Selecione um programa...':
+        if candidato_selecionado != SEM_CANDIDATO:
             if candidato_selecionado not in st.session_state.comparador_programas:
                 if len(st.session_state.comparador_programas) < 4:
                     st.session_state.comparador_programas.append(candidato_selecionado)
-                    st.success(f"Adicionado: {candidato_selecionado}")
+                    st.success(f"Adicionado: {rotulo_programa(candidato_selecionado)}")
                     st.rerun()
                 else:
                     st.warning("Máximo de 4 programas atingido.")
@@ -143,6 +172,7 @@ programas_selecionados = st.multiselect(
     "Gerencie sua lista de comparação (remova itens clicando no X):",
     options=st.session_state.comparador_programas,
     default=st.session_state.comparador_programas,
+    format_func=rotulo_programa,
     key="bucket_selecao",
     on_change=atualizar_selecao
 )
@@ -166,15 +196,16 @@ if len(programas_selecionados) < 2:
         if st.button("🎲 Carregar Exemplo Aleatório"):
             import random
             # Tentar pegar um com AA e um sem AA se possível
-            com_aa = df[df['Status AA'] == 'Com Editais AA']['Nome do Programa'].tolist()
-            sem_aa = df[df['Status AA'] == 'Sem Editais AA']['Nome do Programa'].tolist()
+            com_nome = df[df['Nome do Programa'].notna()]
+            com_aa = com_nome[com_nome['Status AA'] == 'Com Editais AA'][COLUNA_CHAVE].tolist()
+            sem_aa = com_nome[com_nome['Status AA'] == 'Sem Editais AA'][COLUNA_CHAVE].tolist()
             
             exemplo = []
             if com_aa: exemplo.append(random.choice(com_aa))
             if sem_aa: exemplo.append(random.choice(sem_aa))
             
             # Completar se faltar
-            todos_progs = df['Nome do Programa'].unique().tolist()
+            todos_progs = com_nome[COLUNA_CHAVE].tolist()
             while len(exemplo) < 2 and len(todos_progs) > len(exemplo):
                 prog = random.choice(todos_progs)
                 if prog not in exemplo:
@@ -185,12 +216,9 @@ if len(programas_selecionados) < 2:
             st.rerun()
 
 else:
-    # Filtrar dados para os programas selecionados
-    df_comp = df[df['Nome do Programa'].isin(programas_selecionados)].copy()
-    
-    # Ordenar conforme a seleção do usuário (para manter a ordem visual)
-    df_comp['Nome do Programa'] = pd.Categorical(df_comp['Nome do Programa'], categories=programas_selecionados, ordered=True)
-    df_comp = df_comp.sort_values('Nome do Programa')
+    # Linhas dos programas selecionados pelo índice de chaves, na ordem da seleção
+    df_comp = lookup_programs(df, indice_programas, programas_selecionados).drop(columns=COLUNAS_INTERNAS, errors='ignore')
+    nomes_comp = [rotulo_programa(chave) for chave in programas_selecionados]
     
     # --- Tabela Comparativa ---
     st.markdown("## 📋 Tabela Comparativa")
@@ -198,20 +226,13 @@ else:
     # Definir colunas para comparação
     cols_info = ['Sigla da IES', 'UF', 'Região', 'NOTA', 'Tipo de IES', 'Modalidade de Ensino']
     cols_aa = ['Status AA', 'AA Agregada', 'AA Por Grupo']
-    cols_vagas = ['Qnt. Vagas Totais', 'Vagas Totais AA']
+    cols_vagas = ['Qnt Vagas Totais', 'Vagas Totais AA']
     
     todas_cols = cols_info + cols_aa + cols_vagas
     
-    # Preparar dados garantindo alinhamento
-    comp_data = {col: [] for col in todas_cols if col in df_comp.columns}
-    
-    for prog in programas_selecionados:
-        # Pegar a primeira ocorrência do programa (caso haja duplicatas no nome)
-        row = df_comp[df_comp['Nome do Programa'] == prog].iloc[0]
-        for col in comp_data.keys():
-            comp_data[col].append(row[col])
-            
-    df_view = pd.DataFrame(comp_data, index=programas_selecionados).T
+    # Uma coluna por programa, na ordem da seleção
+    colunas_comp = [col for col in todas_cols if col in df_comp.columns]
+    df_view = df_comp[colunas_comp].set_axis(nomes_comp).T
     
     # Estilizar a tabela
     st.dataframe(df_view, use_container_width=True)
@@ -224,29 +245,29 @@ else:
     
     with col_graf1:
         # Gráfico de Vagas
-        if 'Qnt. Vagas Totais' in df_comp.columns and 'Vagas Totais AA' in df_comp.columns:
+        if 'Qnt Vagas Totais' in df_comp.columns and 'Vagas Totais AA' in df_comp.columns:
             # Preparar dados para plot
             vagas_data = []
-            for _, row in df_comp.iterrows():
-                total = pd.to_numeric(row['Qnt. Vagas Totais'], errors='coerce') or 0
-                aa = pd.to_numeric(row['Vagas Totais AA'], errors='coerce') or 0
+            for nome, (_, row) in zip(nomes_comp, df_comp.iterrows()):
+                total = row['Qnt Vagas Totais']
+                aa = row['Vagas Totais AA']
                 regular = total - aa
                 
-                vagas_data.append({'Programa': row['Nome do Programa'], 'Tipo': 'Vagas Regulares', 'Qtd': regular})
-                vagas_data.append({'Programa': row['Nome do Programa'], 'Tipo': 'Vagas AA', 'Qtd': aa})
+                vagas_data.append({'Programa': nome, 'Tipo': 'Vagas Regulares', 'Qtd': regular})
+                vagas_data.append({'Programa': nome, 'Tipo': 'Vagas AA', 'Qtd': aa})
             
             df_vagas = pd.DataFrame(vagas_data)
             
-            fig_vagas = px.bar(
+            fig_vagas = create_bar_chart(
                 df_vagas, 
                 x='Programa', 
                 y='Qtd', 
                 color='Tipo',
                 title='Distribuição de Vagas (Total vs AA)',
                 color_discrete_map={'Vagas AA': CORES['com_aa'], 'Vagas Regulares': CORES['neutra']},
-                barmode='stack'
+                barmode='stack',
+                layout=dict(legend=dict(orientation="h", y=1.1))
             )
-            fig_vagas.update_layout(legend=dict(orientation="h", y=1.1))
             st.plotly_chart(fig_vagas, use_container_width=True)
             
     with col_graf2:
@@ -256,50 +277,33 @@ else:
         radar_data = []
         categorias = ['Pretos/Pardos', 'Indígenas', 'PcD', 'Quilombolas', 'Trans']
         cols_map = {
-            'Pretos/Pardos': 'AA Pretos e Pardos',
-            'Indígenas': 'AA Indígena',
-            'PcD': 'AA PCd',
-            'Quilombolas': 'AA Quilombola',
-            'Trans': 'AA Trans.'
+            'Pretos/Pardos': GRUPOS_SOCIAIS['Pretos e Pardos'],
+            'Indígenas': GRUPOS_SOCIAIS['Indígenas'],
+            'PcD': GRUPOS_SOCIAIS['PcD'],
+            'Quilombolas': GRUPOS_SOCIAIS['Quilombolas'],
+            'Trans': GRUPOS_SOCIAIS['Trans']
         }
         
-        fig_radar = go.Figure()
-        
-        for prog in programas_selecionados:
-            row = df_comp[df_comp['Nome do Programa'] == prog].iloc[0]
+        valores_radar = {}
+        for nome, (_, row) in zip(nomes_comp, df_comp.iterrows()):
             valores = []
             
             for cat in categorias:
                 col = cols_map[cat]
                 if col in df_comp.columns:
-                    val = 1 if str(row[col]).strip().upper() == 'SIM' else 0
+                    val = 1 if pd.notna(row[col]) and row[col] else 0
                 else:
                     val = 0
                 valores.append(val)
+            valores_radar[nome] = valores
             
-            # Fechar o ciclo
-            valores_plot = valores + [valores[0]]
-            cats_plot = categorias + [categorias[0]]
-            
-            fig_radar.add_trace(go.Scatterpolar(
-                r=valores_plot,
-                theta=cats_plot,
-                fill='toself',
-                name=prog
-            ))
-            
-        fig_radar.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 1.1],
-                    tickvals=[0, 1],
-                    ticktext=['Não', 'Sim']
-                )
-            ),
+        fig_radar = create_radar_chart(
+            categorias,
+            valores_radar,
             title="Cobertura de Grupos Principais",
-            showlegend=True,
-            legend=dict(orientation="h", y=-0.1)
+            close=True,
+            radialaxis=dict(range=[0, 1.1], tickvals=[0, 1], ticktext=['Não', 'Sim']),
+            layout=dict(legend=dict(orientation="h", y=-0.1))
         )
         st.plotly_chart(fig_radar, use_container_width=True)
 
@@ -315,10 +319,9 @@ else:
         if col_db in df_comp.columns:
             colunas_grupos.append(nome_grupo)
             linha = {'Grupo': nome_grupo}
-            for prog in programas_selecionados:
-                row = df_comp[df_comp['Nome do Programa'] == prog].iloc[0]
-                val = str(row[col_db]).strip().upper()
-                linha[prog] = "✅ Sim" if val == 'SIM' else "❌ Não"
+            for nome, (_, row) in zip(nomes_comp, df_comp.iterrows()):
+                val = row[col_db]
+                linha[nome] = "✅ Sim" if pd.notna(val) and val else "❌ Não"
             grupos_matrix.append(linha)
             
     if grupos_matrix:
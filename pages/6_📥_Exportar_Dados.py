@@ -6,8 +6,10 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from io import BytesIO
-from utils.data_loader import load_all_areas, get_data_for_area, prepare_dataframe, get_summary_stats
-from utils.filters import render_area_selector, render_global_filters
+from utils.data_loader import enable_copy_on_write, load_all_areas, load_filter_index, load_cube, get_area_frame, get_summary_stats, get_group_vacancies, count_values
+from utils.filters import render_area_selector, render_global_filters, get_filter_spec
+from utils.cube import slice_cube
+from config import COLUNAS_INTERNAS
 
 # Configuração da página
 st.set_page_config(
@@ -17,6 +19,7 @@ st.set_page_config(
 )
 
 # Carregar dados
+enable_copy_on_write()
 areas_data, df_todas_areas, lista_areas = load_all_areas()
 
 # Sidebar
@@ -28,11 +31,11 @@ st.sidebar.markdown("---")
 area_selecionada = render_area_selector(lista_areas)
 
 # Obter dados
-df = get_data_for_area(area_selecionada, areas_data, df_todas_areas)
-df = prepare_dataframe(df)
+df = get_area_frame(area_selecionada)
 
 # Filtros
-df_filtrado, filtros_ativos = render_global_filters(df)
+df_filtrado, filtros_ativos = render_global_filters(df, load_filter_index(area_selecionada))
+cubo = slice_cube(load_cube(), get_filter_spec(area_selecionada).selection())
 
 # ==================== FUNÇÕES DE EXPORTAÇÃO ====================
 
@@ -43,9 +46,9 @@ def to_excel(df, sheet_name='Dados'):
         df.to_excel(writer, sheet_name=sheet_name, index=False)
     return output.getvalue()
 
-def gerar_relatorio_resumo(df):
+def gerar_relatorio_resumo(df, cubo):
     """Gera relatório resumo em texto"""
-    stats = get_summary_stats(df)
+    stats = get_summary_stats(cubo)
     
     relatorio = f"""
 RELATÓRIO RESUMO - DASHBOARD DE AÇÕES AFIRMATIVAS
@@ -70,14 +73,14 @@ UFs Únicas: {stats['ufs_unicas']}
 """
     
     if 'Região' in df.columns:
-        regiao_dist = df['Região'].value_counts()
+        regiao_dist = count_values(df['Região'])
         for regiao, count in regiao_dist.items():
             relatorio += f"\n{regiao}: {count} programas"
     
     relatorio += "\n\n==================== DISTRIBUIÇÃO POR NOTA ====================\n"
     
     if 'NOTA' in df.columns:
-        nota_dist = df['NOTA'].value_counts().sort_index()
+        nota_dist = count_values(df['NOTA']).sort_index()
         for nota, count in nota_dist.items():
             relatorio += f"\nNota {nota}: {count} programas"
     
@@ -126,7 +129,7 @@ with col1:
     """)
     
     # CSV com dados filtrados
-    csv_data = df_filtrado.to_csv(index=False, encoding='utf-8-sig')
+    csv_data = df_filtrado.drop(columns=COLUNAS_INTERNAS, errors='ignore').to_csv(index=False, encoding='utf-8-sig')
     st.download_button(
         label="📥 Download CSV - Dados Filtrados",
         data=csv_data,
@@ -144,7 +147,7 @@ with col2:
     """)
     
     # Excel com dados filtrados
-    excel_data = to_excel(df_filtrado, sheet_name='Dados AA')
+    excel_data = to_excel(df_filtrado.drop(columns=COLUNAS_INTERNAS, errors='ignore'), sheet_name='Dados AA')
     st.download_button(
         label="📥 Download Excel - Dados Filtrados",
         data=excel_data,
@@ -170,7 +173,7 @@ with col_pdf1:
     if st.button("📄 Gerar PDF Resumo", use_container_width=True):
         with st.spinner("Gerando PDF..."):
             try:
-                stats = get_summary_stats(df_filtrado)
+                stats = get_summary_stats(cubo)
                 pdf_resumo = gerar_pdf_resumo(df_filtrado, area_selecionada, stats)
                 
                 st.download_button(
@@ -197,12 +200,8 @@ with col_pdf2:
                 grupos_data = []
                 for nome_grupo, coluna in GRUPOS_SOCIAIS.items():
                     if coluna in df_filtrado.columns:
-                        count = (df_filtrado[coluna].fillna('').str.strip().str.upper() == 'SIM').sum()
-                        # Tentar pegar vagas
-                        col_vagas = f"Vagas {coluna.replace('AA ', '')}"
-                        vagas = 0
-                        if col_vagas in df_filtrado.columns:
-                            vagas = pd.to_numeric(df_filtrado[col_vagas], errors='coerce').fillna(0).sum()
+                        count = int(df_filtrado[coluna].sum())
+                        vagas = get_group_vacancies(df_filtrado, nome_grupo)
                             
                         grupos_data.append({
                             'Grupo': nome_grupo,
@@ -238,7 +237,7 @@ with tab1:
     st.markdown("### Relatório Resumo Executivo")
     st.markdown("Relatório em texto com estatísticas principais")
     
-    relatorio_texto = gerar_relatorio_resumo(df_filtrado)
+    relatorio_texto = gerar_relatorio_resumo(df_filtrado, cubo)
     
     st.text_area(
         "Prévia do Relatório",
@@ -268,7 +267,7 @@ with tab2:
         colunas_aa = [
             'Nome do Programa', 'Sigla da IES', 'UF', 'Região', 'NOTA',
             'Tipo de IES', 'Modalidade de Ensino', 'AA Agregada', 'AA Por Grupo',
-            'Qnt. Vagas Totais', 'Vagas Totais AA'
+            'Qnt Vagas Totais', 'Vagas Totais AA'
         ]
         colunas_disponiveis = [col for col in colunas_aa if col in df_com_aa.columns]
         
@@ -308,7 +307,7 @@ with tab3:
     grupos_data = []
     for nome_grupo, coluna in GRUPOS_SOCIAIS.items():
         if coluna in df_filtrado.columns:
-            count = (df_filtrado[coluna].fillna('').str.strip().str.upper() == 'SIM').sum()
+            count = int(df_filtrado[coluna].sum())
             grupos_data.append({
                 'Grupo': nome_grupo,
                 'Programas': count,
@@ -356,7 +355,7 @@ with st.expander("⚠️ Atenção - Exportação Completa"):
     col_complete_csv, col_complete_excel = st.columns(2)
     
     with col_complete_csv:
-        csv_completo = df_todas_areas.to_csv(index=False, encoding='utf-8-sig')
+        csv_completo = df_todas_areas.drop(columns=COLUNAS_INTERNAS, errors='ignore').to_csv(index=False, encoding='utf-8-sig')
         st.download_button(
             label="📥 CSV - Todos os Dados",
             data=csv_completo,
@@ -366,7 +365,7 @@ with st.expander("⚠️ Atenção - Exportação Completa"):
         )
     
     with col_complete_excel:
-        excel_completo = to_excel(df_todas_areas, sheet_name='Todos os Dados')
+        excel_completo = to_excel(df_todas_areas.drop(columns=COLUNAS_INTERNAS, errors='ignore'), sheet_name='Todos os Dados')
         st.download_button(
             label="📥 Excel - Todos os Dados",
             data=excel_completo,
@@ -4,9 +4,8 @@ Página de análise de universidades privadas e públicas com AA
 """
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from utils.data_loader import load_all_areas, prepare_dataframe
-from utils.charts import create_ies_type_aa_chart
+from utils.data_loader import enable_copy_on_write, load_all_areas, prepare_dataframe
+from utils.charts import create_ies_type_aa_chart, create_pie_chart
 from config import CORES
 
 # Configuração da página
@@ -17,10 +16,11 @@ st.set_page_config(
 )
 
 # Carregar dados (todas as áreas)
+enable_copy_on_write()
 areas_data, df_todas_areas, lista_areas = load_all_areas()
 
 # Preparar dados
-df = prepare_dataframe(df_todas_areas.copy())
+df = prepare_dataframe(df_todas_areas)
 
 # ==================== CONTEÚDO ====================
 
@@ -32,6 +32,12 @@ st.markdown("---")
 fig, crosstab_data, info = create_ies_type_aa_chart(df, include_invalid=True)
 
 # Criar 4 gráficos de pizza lado a lado
+TRACOS_PIZZA = dict(
+    textinfo='label+value+percent',
+    hovertemplate='<b>%{label}</b><br>%{value} PPGs<br>%{percent}<extra></extra>'
+)
+LAYOUT_PIZZA = dict(showlegend=True, height=400, margin=dict(t=10, b=10, l=10, r=10))
+
 st.markdown("## 🥧 Distribuição de Ações Afirmativas por Tipo de IES")
 
 col1, col2, col3, col4 = st.columns(4)
@@ -57,20 +63,12 @@ with col1:
                 else:
                     colors_pub.append(CORES['neutra'])
         
-        fig_pub = go.Figure(data=[go.Pie(
-            labels=labels_pub,
+        fig_pub = create_pie_chart(
             values=values_pub,
-            marker=dict(colors=colors_pub),
-            hole=0.4,
-            textposition='inside',
-            textinfo='label+value+percent',
-            hovertemplate='<b>%{label}</b><br>%{value} PPGs<br>%{percent}<extra></extra>'
-        )])
-        
-        fig_pub.update_layout(
-            showlegend=True,
-            height=400,
-            margin=dict(t=10, b=10, l=10, r=10)
+            names=labels_pub,
+            colors=colors_pub,
+            traces=TRACOS_PIZZA,
+            layout=LAYOUT_PIZZA
         )
         
         st.plotly_chart(fig_pub, use_container_width=True)
@@ -101,20 +99,12 @@ with col2:
                 else:
                     colors_priv.append(CORES['neutra'])
         
-        fig_priv = go.Figure(data=[go.Pie(
-            labels=labels_priv,
+        fig_priv = create_pie_chart(
             values=values_priv,
-            marker=dict(colors=colors_priv),
-            hole=0.4,
-            textposition='inside',
-            textinfo='label+value+percent',
-            hovertemplate='<b>%{label}</b><br>%{value} PPGs<br>%{percent}<extra></extra>'
-        )])
-        
-        fig_priv.update_layout(
-            showlegend=True,
-            height=400,
-            margin=dict(t=10, b=10, l=10, r=10)
+            names=labels_priv,
+            colors=colors_priv,
+            traces=TRACOS_PIZZA,
+            layout=LAYOUT_PIZZA
         )
         
         st.plotly_chart(fig_priv, use_container_width=True)
@@ -145,20 +135,12 @@ with col3:
                 else:
                     colors_falt.append(CORES['neutra'])
         
-        fig_falt = go.Figure(data=[go.Pie(
-            labels=labels_falt,
+        fig_falt = create_pie_chart(
             values=values_falt,
-            marker=dict(colors=colors_falt),
-            hole=0.4,
-            textposition='inside',
-            textinfo='label+value+percent',
-            hovertemplate='<b>%{label}</b><br>%{value} PPGs<br>%{percent}<extra></extra>'
-        )])
-        
-        fig_falt.update_layout(
-            showlegend=True,
-            height=400,
-            margin=dict(t=10, b=10, l=10, r=10)
+            names=labels_falt,
+            colors=colors_falt,
+            traces=TRACOS_PIZZA,
+            layout=LAYOUT_PIZZA
         )
         
         st.plotly_chart(fig_falt, use_container_width=True)
@@ -192,20 +174,12 @@ with col4:
             colors_com_aa.append(CORES['secundaria'])
     
     if valores_com_aa:
-        fig_composicao = go.Figure(data=[go.Pie(
-            labels=labels_com_aa,
+        fig_composicao = create_pie_chart(
             values=valores_com_aa,
-            marker=dict(colors=colors_com_aa),
-            hole=0.4,
-            textposition='inside',
-            textinfo='label+value+percent',
-            hovertemplate='<b>%{label}</b><br>%{value} PPGs<br>%{percent}<extra></extra>'
-        )])
-        
-        fig_composicao.update_layout(
-            showlegend=True,
-            height=400,
-            margin=dict(t=10, b=10, l=10, r=10)
+            names=labels_com_aa,
+            colors=colors_com_aa,
+            traces=TRACOS_PIZZA,
+            layout=LAYOUT_PIZZA
         )
         
         st.plotly_chart(fig_composicao, use_container_width=True)
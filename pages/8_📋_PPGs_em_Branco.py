@@ -4,17 +4,12 @@ Página para visualizar programas com informações incompletas
 """
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_all_areas
+from config import COLUNA_CLASSE_IES, COLUNA_TEM_EDITAIS
+from utils.data_loader import enable_copy_on_write, load_all_areas
+from utils.normalization import valid_mask
+from utils.vacancies import quality_report
 
 
-def find_column(df, pattern):
-    """Encontra coluna no DataFrame que corresponde ao padrão (case-insensitive, ignorando espaços)"""
-    pattern_normalized = pattern.upper().replace(' ', '')
-    for col in df.columns:
-        if col.upper().replace(' ', '') == pattern_normalized:
-            return col
-    return None
-
 # Configuração da página
 st.set_page_config(
     page_title="PPGs em Branco | Dashboard AA",
@@ -23,6 +18,7 @@ st.set_page_config(
 )
 
 # Carregar dados
+enable_copy_on_write()
 areas_data, df_todas_areas, lista_areas = load_all_areas()
 
 # ==================== CONTEÚDO ====================
@@ -32,24 +28,11 @@ st.markdown("Identificação de programas com informações incompletas")
 st.markdown("---")
 
 # Normalizar dados para análise
-df = df_todas_areas.copy()
-
-# Encontrar colunas com suporte a múltiplas variações
-tipo_ies_col = find_column(df, 'TIPODEIES')
-editais_col = find_column(df, 'EDITAISAA')
-
-if tipo_ies_col is None:
-    tipo_ies_col = 'Tipo de IES'  # fallback
-if editais_col is None:
-    editais_col = 'Editais AA'  # fallback
+df = df_todas_areas.copy(deep=False)
 
-# Tipo de IES
-df['Tipo_IES_Normalizado'] = df[tipo_ies_col].fillna('').astype(str).str.strip().str.upper()
-df['Tem_Tipo_IES_Válido'] = df['Tipo_IES_Normalizado'].isin(['PUBLICA', 'PRIVADA'])
-
-# Editais AA
-df['Editais_AA_Normalizado'] = df[editais_col].fillna('').astype(str).str.strip().str.upper()
-df['Tem_Editais_AA_Válido'] = df['Editais_AA_Normalizado'].isin(['SIM', 'NAO', 'NÃO'])
+# Máscaras de validade dos valores canônicos calculados na ingestão
+df['Tem_Tipo_IES_Válido'] = valid_mask(df, COLUNA_CLASSE_IES)
+df['Tem_Editais_AA_Válido'] = valid_mask(df, COLUNA_TEM_EDITAIS)
 
 # Criar categorias
 st.markdown("## 📊 Resumo de Dados Faltantes")
@@ -78,10 +61,11 @@ st.markdown("---")
 # Filtro por tipo de problema
 st.markdown("## 🔍 Filtragem de PPGs com Problemas")
 
-tab1, tab2, tab3 = st.tabs([
+tab1, tab2, tab3, tab4 = st.tabs([
     "❌ Sem Tipo de IES",
     "❌ Sem Editais AA", 
-    "❌ Com Ambos Faltantes"
+    "❌ Com Ambos Faltantes",
+    "⚠️ Vagas Não Numéricas"
 ])
 
 with tab1:
@@ -89,7 +73,7 @@ with tab1:
     st.subheader(f"PPGs sem Tipo de IES válido ({len(df_sem_tipo)} registros)")
     
     if len(df_sem_tipo) > 0:
-        cols_to_show = ['Nome do Programa', 'Área', tipo_ies_col, editais_col, 'NOTA']
+        cols_to_show = ['Nome do Programa', 'Área', 'Tipo de IES', 'Editais AA', 'NOTA']
         cols_to_show = [col for col in cols_to_show if col in df_sem_tipo.columns]
         st.dataframe(
             df_sem_tipo[cols_to_show].sort_values('Área'),
@@ -113,7 +97,7 @@ with tab2:
     st.subheader(f"PPGs sem Editais AA informado ({len(df_sem_aa)} registros)")
     
     if len(df_sem_aa) > 0:
-        cols_to_show = ['Nome do Programa', 'Área', tipo_ies_col, editais_col, 'NOTA']
+        cols_to_show = ['Nome do Programa', 'Área', 'Tipo de IES', 'Editais AA', 'NOTA']
         cols_to_show = [col for col in cols_to_show if col in df_sem_aa.columns]
         st.dataframe(
             df_sem_aa[cols_to_show].sort_values('Área'),
@@ -137,7 +121,7 @@ with tab3:
     st.subheader(f"PPGs com ambos os dados faltantes ({len(df_ambos)} registros)")
     
     if len(df_ambos) > 0:
-        cols_to_show = ['Nome do Programa', 'Área', tipo_ies_col, editais_col, 'NOTA']
+        cols_to_show = ['Nome do Programa', 'Área', 'Tipo de IES', 'Editais AA', 'NOTA']
         cols_to_show = [col for col in cols_to_show if col in df_ambos.columns]
         st.dataframe(
             df_ambos[cols_to_show].sort_values('Área'),
@@ -156,16 +140,40 @@ with tab3:
     else:
         st.success("✅ Todos os PPGs têm dados completos!")
 
+with tab4:
+    # Textos encontrados nas colunas de vagas, contados como zero na carga
+    df_vagas_invalidas = quality_report(df_todas_areas)
+    st.subheader(f"Valores de vagas não numéricos ({len(df_vagas_invalidas)} células)")
+    
+    if len(df_vagas_invalidas) > 0:
+        st.caption("Estes valores foram contados como 0 vagas nas análises.")
+        st.dataframe(
+            df_vagas_invalidas.sort_values(['Área', 'Coluna']),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Download
+        csv = df_vagas_invalidas.to_csv(index=False)
+        st.download_button(
+            label="📥 Baixar CSV",
+            data=csv,
+            file_name="ppgs_vagas_nao_numericas.csv",
+            mime="text/csv"
+        )
+    else:
+        st.success("✅ Todos os valores de vagas são numéricos!")
+
 st.markdown("---")
 
 # Análise por área
 st.markdown("## 📈 Análise por Área")
 
-resumo_area = pd.DataFrame({
-    'Total PPGs': df.groupby('Área').size(),
-    'Sem Tipo IES': df.groupby('Área')['Tem_Tipo_IES_Válido'].apply(lambda x: (~x).sum()),
-    'Sem Editais AA': df.groupby('Área')['Tem_Editais_AA_Válido'].apply(lambda x: (~x).sum()),
-})
+faltantes = pd.DataFrame({
+    'Sem Tipo IES': ~df['Tem_Tipo_IES_Válido'],
+    'Sem Editais AA': ~df['Tem_Editais_AA_Válido'],
+}).groupby(df['Área'], observed=True).sum()
+resumo_area = pd.concat([df.groupby('Área', observed=True).size().rename('Total PPGs'), faltantes], axis=1)
 
 resumo_area['% Tipo IES'] = (resumo_area['Total PPGs'] - resumo_area['Sem Tipo IES']) / resumo_area['Total PPGs'] * 100
 resumo_area['% Editais AA'] = (resumo_area['Total PPGs'] - resumo_area['Sem Editais AA']) / resumo_area['Total PPGs'] * 100
@@ -177,5 +185,6 @@ st.markdown("**Legenda:**")
 st.markdown("""
 - ✅ **Com Tipo IES**: Programas com valor 'Pública' ou 'Privada'
 - ✅ **Com Editais AA**: Programas com valor 'SIM' ou 'NÃO'
+- ⚠️ **Vagas não numéricas**: Textos nas colunas de vagas ('sem informações', '18+'...), contados como 0
 - ❌ **Sem dados**: Registros vazios, NULL ou valores inválidos
 """)
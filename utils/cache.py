@@ -0,0 +1,205 @@
+"""
+Cache LRU do processo para seleções e DataFrames derivados
+
+Compartilhado por todas as páginas e sessões do servidor. As chaves
+incluem a versão do dataset (dataset_version, gerada na ingestão), então
+uma nova versão simplesmente deixa de acertar as entradas antigas, que
+saem por LRU. O tamanho das entradas é estimado na inserção e o total fica abaixo
+de LIMITE_CACHE_MB; ao passar do limite, as menos usadas são descartadas.
+
+Os valores guardados são compartilhados: quem recebe um DataFrame do cache
+não deve alterá-lo no lugar (use copy(deep=False) antes de atribuir
+colunas).
+
+Cálculos de página usam memoize_function com uma impressão digital
+(fingerprint) da seleção no lugar do DataFrame: a chave tem poucos bytes,
+sem o custo de hashear o DataFrame inteiro a cada chamada, como faria o
+st.cache_data.
+"""
+import functools
+import hashlib
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import LIMITE_CACHE_MB
+
+_entradas = OrderedDict()  # chave -> (valor, bytes)
+_trava = threading.Lock()
+_contadores = {'acertos': 0, 'faltas': 0, 'descartes': 0, 'bytes': 0}
+
+
+def estimate_size(valor):
+    """
+    Estima a memória ocupada por um valor guardado no cache
+
+    Args:
+        valor: DataFrame, Series, ndarray ou tupla/lista deles
+
+    Returns:
+        int: bytes
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum() if isinstance(valor, pd.DataFrame) else uso)
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (tuple, list)):
+        return sum(estimate_size(item) for item in valor)
+    if isinstance(valor, dict):
+        return sum(estimate_size(item) for item in valor.values())
+    return sys.getsizeof(valor)
+
+
+def fingerprint(*partes):
+    """
+    Impressão digital curta de um conjunto de valores
+
+    Arrays, DataFrames, Series e bytes entram pelo conteúdo; os demais
+    valores pelo repr (use valores com repr determinístico: textos,
+    números, tuplas, FilterSpec).
+
+    Args:
+        *partes: valores a combinar (ex.: versão do dataset, área, bitmap)
+
+    Returns:
+        str: 16 dígitos hexadecimais
+    """
+    resumo = hashlib.blake2b(digest_size=8)
+    for parte in partes:
+        if isinstance(parte, (pd.DataFrame, pd.Series, pd.Index)):
+            # Valores e índice pelo hash do pandas; rótulos e tipos (que
+            # incluem as categorias e a ordem delas) pelo repr
+            if isinstance(parte, pd.DataFrame):
+                rotulos, tipos = list(parte.columns), list(parte.dtypes)
+            else:
+                rotulos, tipos = [parte.name], [parte.dtype]
+            com_indice = not isinstance(parte, pd.Index)
+            if com_indice:
+                rotulos.append(tuple(parte.index.names))
+                tipos.append(parte.index.dtype)
+            cabecalho = repr((type(parte).__name__, rotulos, [repr(tipo) for tipo in tipos]))
+            hashes = pd.util.hash_pandas_object(parte, index=com_indice).to_numpy()
+            dados = cabecalho.encode('utf-8') + hashes.tobytes()
+        elif isinstance(parte, np.ndarray) and parte.dtype == object:
+            dados = pd.util.hash_array(parte.ravel()).tobytes() + repr(parte.shape).encode('utf-8')
+        elif isinstance(parte, np.ndarray):
+            dados = np.ascontiguousarray(parte).tobytes()
+        elif isinstance(parte, bytes):
+            dados = parte
+        else:
+            dados = repr(parte).encode('utf-8')
+        # O tamanho separa as partes: ('ab', 'c') != ('a', 'bc')
+        resumo.update(len(dados).to_bytes(8, 'little'))
+        resumo.update(dados)
+    return resumo.hexdigest()
+
+
+def _evict(limite):
+    # Chamada com a trava: descarta as entradas menos usadas até caber no limite
+    while _entradas and _contadores['bytes'] > limite:
+        _, (_, tamanho) = _entradas.popitem(last=False)
+        _contadores['bytes'] -= tamanho
+        _contadores['descartes'] += 1
+
+
+def memoize(chave, calcular):
+    """
+    Retorna o valor da chave, calculando e guardando em caso de falta
+
+    O cálculo roda fora da trava; duas sessões que faltarem na mesma chave
+    ao mesmo tempo calculam o valor duas vezes, e fica a última versão.
+
+    Args:
+        chave: tupla hashable (inclua a versão do dataset)
+        calcular: função sem argumentos que produz o valor
+
+    Returns:
+        valor guardado para a chave
+    """
+    with _trava:
+        if chave in _entradas:
+            _entradas.move_to_end(chave)
+            _contadores['acertos'] += 1
+            return _entradas[chave][0]
+        _contadores['faltas'] += 1
+
+    valor = calcular()
+    tamanho = estimate_size(valor)
+    limite = LIMITE_CACHE_MB * 1024 * 1024
+    if tamanho > limite:
+        return valor
+
+    with _trava:
+        anterior = _entradas.pop(chave, None)
+        if anterior is not None:
+            _contadores['bytes'] -= anterior[1]
+        _entradas[chave] = (valor, tamanho)
+        _contadores['bytes'] += tamanho
+        _evict(limite)
+    return valor
+
+
+def memoize_function(funcao):
+    """
+    Decorador: memoriza os resultados da função no cache do processo
+
+    Como no st.cache_data, parâmetros cujo nome começa com '_' ficam fora
+    da chave. Passe o DataFrame como _df e a sua impressão digital (ex.:
+    filter_fingerprint, que já inclui a versão do dataset) num parâmetro
+    comum; os demais argumentos precisam ser hashable. DataFrames e Series
+    devolvidos são cópias rasas do valor guardado.
+
+    Args:
+        funcao: função a memorizar
+
+    Returns:
+        função com a mesma assinatura
+    """
+    assinatura = inspect.signature(funcao)
+    # O arquivo distingue funções homônimas de páginas diferentes (todas são __main__)
+    origem = (funcao.__code__.co_filename, funcao.__qualname__)
+
+    @functools.wraps(funcao)
+    def memorizada(*args, **kwargs):
+        argumentos = assinatura.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        chave = ('funcao', *origem, *(
+            (nome, valor) for nome, valor in argumentos.arguments.items() if not nome.startswith('_')
+        ))
+        valor = memoize(chave, lambda: funcao(*args, **kwargs))
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return valor.copy(deep=False)
+        return valor
+
+    return memorizada
+
+
+def cache_stats():
+    """
+    Contadores do cache
+
+    Returns:
+        dict: 'acertos', 'faltas', 'descartes', 'entradas' e 'mb' em uso
+    """
+    with _trava:
+        return {
+            'acertos': _contadores['acertos'],
+            'faltas': _contadores['faltas'],
+            'descartes': _contadores['descartes'],
+            'entradas': len(_entradas),
+            'mb': _contadores['bytes'] / (1024 * 1024)
+        }
+
+
+def clear_cache():
+    """
+    Esvazia o cache (os contadores de acertos e faltas são mantidos)
+    """
+    with _trava:
+        _entradas.clear()
+        _contadores['bytes'] = 0
@@ -1,42 +1,324 @@
 """
 Funções de visualização compartilhadas
+
+Os construtores de gráfico são memorizados (memoize_chart) no cache LRU do
+processo (utils/cache.py): a chave combina o tipo do gráfico, os
+parâmetros e a impressão digital dos dados recebidos, e o valor guardado é
+o JSON da figura. Um rerun com os mesmos dados e widgets só reconstrói a
+figura a partir do JSON, sem passar de novo pelo plotly.express. As
+páginas passam aos construtores as tabelas já agregadas (crosstab, rollup
+do cubo), de modo que a impressão digital custa o hash de poucas linhas.
+
+Com FIGURAS_COMPACTAS (config.py) o JSON guardado já vai enxuto para o
+navegador: arrays numéricos como typed arrays em base64, no menor tipo que
+comporta os valores, traços sem os atributos que repetem o padrão do
+plotly.js e o template padrão reduzido às cores e aos tipos de traço da
+figura (compact_template). A exportação em PNG volta ao template completo.
 """
+import base64
+import dataclasses
+import functools
+import inspect
+import json
+import math
+
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.colors import get_colorscale, sample_colorscale
+import numpy as np
 import pandas as pd
-from config import CORES, ORDEM_NOTAS
+from config import (
+    CORES, ORDEM_NOTAS, COLUNA_CLASSE_IES, COLUNA_TEM_EDITAIS, COLUNAS_VAGAS, COORDENADAS_UFS, GRUPOS_SOCIAIS,
+    FIGURAS_COMPACTAS, NIVEL_GEOMETRIA_DASHBOARD, NIVEL_GEOMETRIA_EXPORTACAO
+)
+from utils.cache import fingerprint, memoize
+from utils.cube import build_cube, crosstab, rollup, total
+from utils.data_loader import count_values, get_group_vacancies
+from utils.geometry import uf_outlines
+from utils.normalization import classify_ies, clean_code, editais_flag, valid_mask
+from utils.schema import column
+from utils.social_groups import group_count_distribution, groups_by_area
+
+# Séries das crosstabs por 'Status AA' (create_series_bar_chart)
+SERIES_STATUS_AA = (
+    ('Com Editais AA', 'Com Editais AA', CORES['com_aa']),
+    ('Sem Editais AA', 'Sem Editais AA', CORES['sem_aa'])
+)
+
+# Legenda horizontal acima da área do gráfico
+LEGENDA_HORIZONTAL = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+
+
+# Atributos de layout do template padrão mantidos no template compacto: as
+# cores (no template 'streamlit', marcadores que o navegador troca pelas
+# cores do tema) e os comportamentos que mudam a leitura dos eixos
+LAYOUT_TEMPLATE_COMPACTO = ['colorway', 'colorscale', 'coloraxis', 'autotypenumbers', 'hovermode']
+
+# Atributos de traço que o plotly.express repete com o valor padrão do plotly.js
+PADROES_TRACOS = {
+    ('xaxis',): 'x',
+    ('yaxis',): 'y',
+    ('geo',): 'geo',
+    ('legendgroup',): '',
+    ('offsetgroup',): '',
+    ('marker', 'pattern', 'shape'): '',
+    ('domain',): {'x': [0, 1], 'y': [0, 1]}
+}
+
+# Atributos de dados dos traços que podem ir como typed array
+ATRIBUTOS_NUMERICOS = [
+    ('x',), ('y',), ('z',), ('r',), ('lat',), ('lon',), ('values',), ('text',), ('customdata',),
+    ('marker', 'color'), ('marker', 'size')
+]
+
+# dtype do numpy -> tipo do typed array do plotly.js (inteiros do menor para o maior)
+TIPOS_TYPED_ARRAY = {
+    'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2', 'int32': 'i4', 'uint32': 'u4',
+    'float32': 'f4', 'float64': 'f8'
+}
+TIPOS_PLOTLYJS = {tipo: np.dtype(nome) for nome, tipo in TIPOS_TYPED_ARRAY.items()}
+
+
+def _numeric_array(valor):
+    # ndarray de um typed array ({'dtype', 'bdata'}) ou de uma lista numérica; None se não for
+    if isinstance(valor, dict) and 'bdata' in valor:
+        if valor.get('dtype') not in TIPOS_PLOTLYJS:
+            return None
+        array = np.frombuffer(base64.b64decode(valor['bdata']), dtype=TIPOS_PLOTLYJS[valor['dtype']])
+        if 'shape' in valor:
+            array = array.reshape([int(parte) for parte in str(valor['shape']).split(',')])
+        return array
+    if isinstance(valor, (list, tuple)) and valor:
+        try:
+            array = np.asarray(valor)
+        except ValueError:  # listas de tamanhos diferentes
+            return None
+        if array.dtype.kind in 'iuf':
+            return array
+    return None
 
 
-def find_column(df, pattern):
+def _typed_array(array):
+    # Typed array no menor tipo que representa os valores sem perda: floats
+    # inteiros viram inteiros (contagens somadas pelo plotly.express)
+    if array.dtype.kind == 'f' and np.isfinite(array).all() and (array == np.round(array)).all():
+        array = array.astype(np.int64)
+    if array.dtype.kind in 'iu':
+        minimo, maximo = (array.min(), array.max()) if array.size else (0, 0)
+        tipo = next(
+            (tipo for tipo in ['int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32']
+             if np.iinfo(tipo).min <= minimo and maximo <= np.iinfo(tipo).max),
+            'float64'
+        )
+    else:
+        tipo = 'float64'
+    array = np.ascontiguousarray(array, dtype=tipo)
+    typed = {'dtype': TIPOS_TYPED_ARRAY[tipo], 'bdata': base64.b64encode(array.tobytes()).decode('ascii')}
+    if array.ndim > 1:
+        typed['shape'] = ','.join(str(tamanho) for tamanho in array.shape)
+    return typed
+
+
+def _parent(traco, caminho):
+    # dicts de traco ao longo de caminho[:-1] (None se o caminho não existir)
+    pais = [traco]
+    for chave in caminho[:-1]:
+        filho = pais[-1].get(chave)
+        if not isinstance(filho, dict):
+            return None
+        pais.append(filho)
+    return pais
+
+
+def compact_traces(dados):
     """
-    Encontra coluna no DataFrame que corresponde ao padrão (case-insensitive, ignorando espaços)
+    Enxuga os traços de uma figura para o envio ao navegador
+    
+    Arrays numéricos viram typed arrays em base64 no menor tipo que comporta
+    os valores, e os atributos de PADROES_TRACOS iguais ao padrão são removidos.
     
     Args:
-        df: DataFrame
-        pattern: padrão a procurar (ex: 'TIPODEIES', 'EDITAISAA')
+        dados: lista de traços como dicts (to_plotly_json()['data']; alterada no lugar)
         
     Returns:
-        str: nome da coluna ou None se não encontrar
+        list: os mesmos traços
     """
-    pattern_normalized = pattern.upper().replace(' ', '')
-    for col in df.columns:
-        if col.upper().replace(' ', '') == pattern_normalized:
-            return col
-    return None
+    for traco in dados:
+        for caminho, padrao in PADROES_TRACOS.items():
+            pais = _parent(traco, caminho)
+            if pais is not None and caminho[-1] in pais[-1] and pais[-1][caminho[-1]] == padrao:
+                del pais[-1][caminho[-1]]
+                # Remove os dicts que ficaram vazios (ex.: marker.pattern)
+                for pai, chave in zip(reversed(pais[:-1]), reversed(caminho[:-1])):
+                    if pai[chave]:
+                        break
+                    del pai[chave]
+        for caminho in ATRIBUTOS_NUMERICOS:
+            pais = _parent(traco, caminho)
+            array = None if pais is None else _numeric_array(pais[-1].get(caminho[-1]))
+            if array is not None:
+                pais[-1][caminho[-1]] = _typed_array(array)
+    return dados
+
+
+@functools.lru_cache(maxsize=64)
+def compact_template(padrao, tipos):
+    """
+    Template compacto: o template padrão reduzido às cores e aos estilos dos
+    tipos de traço da figura
+    
+    O template padrão ('streamlit' quando o Streamlit está carregado) traz
+    estilos para todos os tipos de traço (contour, sankey, table...) e é
+    repetido no JSON de cada figura enviada ao navegador.
+    
+    Args:
+        padrao: nome do template padrão (pio.templates.default)
+        tipos: tuple com os tipos de traço da figura
+        
+    Returns:
+        dict: template com 'layout' e 'data'
+    """
+    template = pio.templates[padrao].to_plotly_json()
+    layout = template.get('layout', {})
+    dados = template.get('data', {})
+    return {
+        'layout': {chave: layout[chave] for chave in LAYOUT_TEMPLATE_COMPACTO if chave in layout},
+        'data': {tipo: dados[tipo] for tipo in tipos if tipo in dados}
+    }
+
+
+def compact_figure(fig):
+    """
+    Versão compacta de uma figura para o navegador (ver compact_traces e
+    compact_template)
+    
+    Args:
+        fig: plotly figure
+        
+    Returns:
+        plotly figure nova
+    """
+    return figure_from_json(figure_to_json(fig))
+
+
+def full_template(fig):
+    """
+    Devolve à figura o template padrão do plotly (ex.: para exportar em PNG,
+    sem o tema do Streamlit)
+    
+    Args:
+        fig: plotly figure (alterada no lugar)
+        
+    Returns:
+        a mesma figura
+    """
+    fig.layout.template = pio.templates[pio.templates.default]
+    return fig
+
 
+def figure_to_json(fig):
+    """
+    Serializa uma figura para o cache
+
+    O template padrão do plotly fica de fora: ele é reaplicado ao criar a
+    figura de volta, o que custa bem menos que validar o template inteiro
+    que viria no JSON. Com FIGURAS_COMPACTAS os traços são enxugados
+    (compact_traces).
+
+    Args:
+        fig: plotly figure
 
-def create_bar_chart(df, x, y, color=None, title="", orientation='v', barmode='group'):
+    Returns:
+        str: JSON com 'data' e 'layout'
+    """
+    figura = fig.to_plotly_json()
+    layout = {chave: valor for chave, valor in figura['layout'].items() if chave != 'template'}
+    dados = compact_traces(figura['data']) if FIGURAS_COMPACTAS else figura['data']
+    return pio.to_json({'data': dados, 'layout': layout}, validate=False)
+
+
+def figure_from_json(texto):
+    """
+    Cria uma figura nova a partir do JSON de figure_to_json
+
+    Com FIGURAS_COMPACTAS a figura recebe o template compacto
+    (compact_template); senão, o template padrão do plotly.
+
+    Args:
+        texto: JSON da figura
+
+    Returns:
+        plotly figure
+    """
+    figura = json.loads(texto)
+    if FIGURAS_COMPACTAS:
+        tipos = tuple(sorted({traco.get('type', 'scatter') for traco in figura['data']}))
+        figura['layout']['template'] = compact_template(pio.templates.default, tipos)
+    return go.Figure(figura)
+
+
+def memoize_chart(construtor):
+    """
+    Decorador: memoriza as figuras de um construtor de gráfico
+
+    A chave é o nome do construtor (tipo do gráfico) e a impressão digital
+    (fingerprint) de todos os argumentos: DataFrames, Series e arrays entram
+    pelo conteúdo, os demais pelo repr. O cache guarda o JSON da figura,
+    sujeito ao LRU e ao limite de LIMITE_CACHE_MB; cada chamada devolve uma
+    figura nova, que pode ser alterada sem afetar o cache.
+
+    Args:
+        construtor: função que devolve uma plotly figure
+
+    Returns:
+        função com a mesma assinatura
+    """
+    assinatura = inspect.signature(construtor)
+
+    @functools.wraps(construtor)
+    def memorizado(*args, **kwargs):
+        argumentos = assinatura.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        partes = [parte for item in argumentos.arguments.items() for parte in item]
+        chave = ('figura', construtor.__name__, fingerprint(*partes))
+        return figure_from_json(memoize(chave, lambda: figure_to_json(construtor(*args, **kwargs))))
+
+    return memorizado
+
+
+def _apply_options(fig, traces=None, layout=None):
+    # Ajustes comuns aos construtores: update_traces e update_layout
+    if traces:
+        fig.update_traces(**traces)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+@memoize_chart
+def create_bar_chart(df, x, y, color=None, title="", orientation='v', barmode='group', text=None, labels=None,
+                     color_continuous_scale=None, color_discrete_sequence=None, color_discrete_map=None,
+                     category_orders=None, traces=None, layout=None):
     """
     Cria gráfico de barras
     
     Args:
-        df: DataFrame
+        df: DataFrame (ou None, com x e y como listas de valores)
         x: coluna para eixo X
-        y: coluna para eixo Y  
+        y: coluna (ou lista de colunas) para eixo Y
         color: coluna para cores
         title: título do gráfico
         orientation: 'v' ou 'h' 
         barmode: 'group', 'stack', 'relative'
+        text: coluna com o texto das barras
+        labels: dict {coluna: rótulo} para eixos e legenda
+        color_continuous_scale: escala de cores para color numérica
+        color_discrete_sequence: cores para color categórica
+        color_discrete_map: dict {valor: cor} para color categórica
+        category_orders: dict {coluna: ordem dos valores}
+        traces: dict passado a update_traces
+        layout: dict passado a update_layout
         
     Returns:
         plotly figure
@@ -48,12 +330,154 @@ def create_bar_chart(df, x, y, color=None, title="", orientation='v', barmode='g
         color=color,
         title=title,
         orientation=orientation,
-        barmode=barmode
+        barmode=barmode,
+        text=text,
+        labels=labels,
+        color_continuous_scale=color_continuous_scale,
+        color_discrete_sequence=color_discrete_sequence,
+        color_discrete_map=color_discrete_map,
+        category_orders=category_orders
     )
-    return fig
+    return _apply_options(fig, traces, layout)
+
+
+@memoize_chart
+def create_series_bar_chart(tabela, series, title="", barmode='group', text=False, layout=None):
+    """
+    Cria gráfico de barras com uma série por coluna de uma tabela larga
+    
+    Args:
+        tabela: DataFrame indexado pelas categorias do eixo X (ex.: crosstab)
+        series: lista de (coluna, nome na legenda, cor); colunas ausentes
+            da tabela viram zeros
+        title: título do gráfico
+        barmode: 'group' ou 'stack'
+        text: se True, mostra o valor em cada barra
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    fig = go.Figure()
+    for coluna, nome, cor in series:
+        valores = tabela[coluna] if coluna in tabela.columns else pd.Series(0, index=tabela.index)
+        fig.add_trace(go.Bar(
+            name=nome,
+            x=tabela.index,
+            y=valores,
+            marker_color=cor,
+            text=valores if text else None,
+            textposition='auto' if text else None
+        ))
+    fig.update_layout(title=title, barmode=barmode)
+    return _apply_options(fig, layout=layout)
 
 
-def create_scatter_plot(df, x, y, color=None, size=None, title="", trendline=None):
+@memoize_chart
+def create_category_bar_chart(valores, colors, title="", textposition='auto', texttemplate=None, layout=None):
+    """
+    Cria gráfico de barras simples, uma cor por categoria
+    
+    Args:
+        valores: Series com o valor de cada categoria (índice = eixo X)
+        colors: lista de cores, na ordem das categorias
+        title: título do gráfico
+        textposition: posição do valor em cada barra
+        texttemplate: formato do valor (ex.: '%{text:.1f}')
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    fig = go.Figure(data=[go.Bar(
+        x=valores.index,
+        y=valores.values,
+        marker_color=list(colors),
+        text=valores.values,
+        textposition=textposition,
+        texttemplate=texttemplate
+    )])
+    fig.update_layout(title=title, showlegend=False)
+    return _apply_options(fig, layout=layout)
+
+
+@memoize_chart
+def create_bar_line_chart(tabela, x, bar, line, title="", bar_color=CORES['primaria'], line_color=CORES['com_aa'],
+                          line_range=None, layout=None):
+    """
+    Cria gráfico de barras com uma linha num segundo eixo Y
+    
+    Args:
+        tabela: DataFrame
+        x: coluna para eixo X
+        bar: coluna das barras (nome da série e título do eixo Y)
+        line: coluna da linha (nome da série e título do eixo Y à direita)
+        title: título do gráfico
+        bar_color: cor das barras
+        line_color: cor da linha
+        line_range: faixa [mín, máx] do eixo da linha (None = automática)
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name=bar,
+        x=tabela[x],
+        y=tabela[bar],
+        marker_color=bar_color,
+        yaxis='y'
+    ))
+    fig.add_trace(go.Scatter(
+        name=line,
+        x=tabela[x],
+        y=tabela[line],
+        mode='lines+markers',
+        marker=dict(color=line_color, size=8),
+        line=dict(width=3),
+        yaxis='y2'
+    ))
+    fig.update_layout(
+        title=title,
+        yaxis=dict(title=bar, side='left'),
+        yaxis2=dict(title=line, overlaying='y', side='right', range=line_range)
+    )
+    return _apply_options(fig, layout=layout)
+
+
+@memoize_chart
+def create_line_chart(tabela, x, series, title="", layout=None):
+    """
+    Cria gráfico de linhas com marcadores, uma linha por coluna
+    
+    Args:
+        tabela: DataFrame
+        x: coluna para eixo X
+        series: lista de (coluna, nome na legenda, cor)
+        title: título do gráfico
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    fig = go.Figure()
+    for coluna, nome, cor in series:
+        fig.add_trace(go.Scatter(
+            x=tabela[x],
+            y=tabela[coluna],
+            mode='lines+markers',
+            name=nome,
+            line=dict(color=cor, width=3),
+            marker=dict(size=10)
+        ))
+    fig.update_layout(title=title)
+    return _apply_options(fig, layout=layout)
+
+
+@memoize_chart
+def create_scatter_plot(df, x, y, color=None, size=None, title="", trendline=None, text=None, labels=None,
+                        color_continuous_scale=None, traces=None, layout=None):
     """
     Cria scatter plot
     
@@ -65,6 +489,11 @@ def create_scatter_plot(df, x, y, color=None, size=None, title="", trendline=Non
         size: coluna para tamanho dos pontos
         title: título do gráfico
         trendline: 'ols', 'lowess', None
+        text: coluna com o rótulo de cada ponto
+        labels: dict {coluna: rótulo} para eixos e legenda
+        color_continuous_scale: escala de cores para color numérica
+        traces: dict passado a update_traces
+        layout: dict passado a update_layout
         
     Returns:
         plotly figure
@@ -76,11 +505,15 @@ def create_scatter_plot(df, x, y, color=None, size=None, title="", trendline=Non
         color=color,
         size=size,
         title=title,
-        trendline=trendline
+        trendline=trendline,
+        text=text,
+        labels=labels,
+        color_continuous_scale=color_continuous_scale
     )
-    return fig
+    return _apply_options(fig, traces, layout)
 
 
+@memoize_chart
 def create_heatmap(data, x_labels=None, y_labels=None, title="", colorscale='RdYlGn'):
     """
     Cria heatmap
@@ -109,7 +542,41 @@ def create_heatmap(data, x_labels=None, y_labels=None, title="", colorscale='RdY
     return fig
 
 
-def create_pie_chart(values, names, title="", hole=0.4):
+@memoize_chart
+def create_table_heatmap(tabela, title="", colorscale='Viridis', texttemplate='%{z}', textfont_size=12,
+                         colorbar_title=None, zmid=None, layout=None):
+    """
+    Cria heatmap de uma tabela (linhas no eixo Y, colunas no eixo X)
+    
+    Args:
+        tabela: DataFrame (ex.: crosstab)
+        title: título do gráfico
+        colorscale: escala de cores
+        texttemplate: formato do valor em cada célula
+        textfont_size: tamanho da fonte dos valores
+        colorbar_title: título da barra de cores
+        zmid: valor central da escala (ex.: 0 para correlações)
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    fig = go.Figure(data=go.Heatmap(
+        z=tabela.values,
+        x=tabela.columns,
+        y=tabela.index,
+        texttemplate=texttemplate,
+        textfont={"size": textfont_size},
+        colorscale=colorscale,
+        zmid=zmid,
+        colorbar=dict(title=colorbar_title)
+    ))
+    fig.update_layout(title=title)
+    return _apply_options(fig, layout=layout)
+
+
+@memoize_chart
+def create_pie_chart(values, names, title="", hole=0.4, colors=None, traces=None, layout=None):
     """
     Cria gráfico de pizza/donut
     
@@ -118,6 +585,9 @@ def create_pie_chart(values, names, title="", hole=0.4):
         names: nomes das fatias
         title: título
         hole: tamanho do buraco (0-1), 0 = pizza, >0 = donut
+        colors: cores das fatias, na ordem dos nomes (None = paleta padrão)
+        traces: dict passado a update_traces (ex.: textinfo, hovertemplate)
+        layout: dict passado a update_layout
         
     Returns:
         plotly figure
@@ -126,12 +596,159 @@ def create_pie_chart(values, names, title="", hole=0.4):
         values=values,
         names=names,
         title=title,
-        hole=hole
+        hole=hole,
+        color_discrete_sequence=colors
     )
     fig.update_traces(textposition='inside', textinfo='percent+label')
-    return fig
+    return _apply_options(fig, traces, layout)
+
+
+@memoize_chart
+def create_treemap(df, path, values, color=None, title="", root=None, color_continuous_scale=None,
+                   color_discrete_sequence=None, layout=None):
+    """
+    Cria treemap
+    
+    Args:
+        df: DataFrame
+        path: colunas da hierarquia, da mais geral para a mais específica
+        values: coluna com o tamanho de cada folha
+        color: coluna para cores
+        title: título
+        root: rótulo de um nível raiz comum (ex.: 'Brasil'); None = sem raiz
+        color_continuous_scale: escala de cores para color numérica
+        color_discrete_sequence: cores para color categórica
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    caminho = [px.Constant(root), *path] if root is not None else list(path)
+    fig = px.treemap(
+        df,
+        path=caminho,
+        values=values,
+        color=color,
+        title=title,
+        color_continuous_scale=color_continuous_scale,
+        color_discrete_sequence=color_discrete_sequence
+    )
+    return _apply_options(fig, layout=layout)
+
+
+@memoize_chart
+def create_geo_scatter(df, lat, lon, size, color, hover_name=None, hover_data=None, title="",
+                       color_continuous_scale='Viridis', size_max=50, layout=None):
+    """
+    Cria mapa de bolhas sobre a América do Sul, ajustado às localizações
+    
+    Args:
+        df: DataFrame com uma linha por ponto
+        lat: coluna de latitude
+        lon: coluna de longitude
+        size: coluna para o tamanho das bolhas
+        color: coluna para a cor das bolhas
+        hover_name: coluna do título do hover
+        hover_data: colunas extras do hover
+        title: título
+        color_continuous_scale: escala de cores
+        size_max: tamanho máximo das bolhas
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    fig = px.scatter_geo(
+        df,
+        lat=lat,
+        lon=lon,
+        size=size,
+        color=color,
+        hover_name=hover_name,
+        hover_data=hover_data,
+        scope='south america',
+        title=title,
+        projection='mercator',
+        color_continuous_scale=color_continuous_scale,
+        size_max=size_max
+    )
+    fig.update_traces(marker=dict(line=dict(width=1, color='black')))
+    fig.update_geos(
+        visible=False, resolution=50,
+        showcountries=True, countrycolor="RebeccaPurple",
+        showcoastlines=True, coastlinecolor="RebeccaPurple",
+        showland=True, landcolor="#E5ECF6",
+        fitbounds="locations"
+    )
+    return _apply_options(fig, layout=layout)
+
+
+@memoize_chart
+def create_choropleth_map(df, locations, color, nivel, hover_data=None, title="",
+                          color_continuous_scale='Viridis', range_color=None, layout=None):
+    """
+    Cria mapa coroplético das UFs com a geometria local (utils/geometry.py)
+    
+    Cada UF é um polígono preenchido sobre eixos de longitude/latitude, sem
+    mapa-base: o plotly.js não precisa baixar o topojson da CDN, o que faria
+    qualquer mapa geo. UFs sem valor ficam em cinza.
+    
+    Args:
+        df: DataFrame com uma linha por UF
+        locations: coluna com a sigla da UF (id das features)
+        color: coluna numérica que define a cor
+        nivel: nível de precisão da geometria (NIVEIS_GEOMETRIA)
+        hover_data: colunas extras do hover
+        title: título
+        color_continuous_scale: escala de cores
+        range_color: [mínimo, máximo] da escala (None = dos dados)
+        layout: dict passado a update_layout
+        
+    Returns:
+        plotly figure
+    """
+    contornos = uf_outlines(nivel)
+    if contornos is None:
+        raise ValueError(f"Geometria das UFs não encontrada para o nível '{nivel}' (gerar_geometria_ufs.py)")
+    
+    valores = df.set_index(locations)
+    minimo, maximo = range_color or (valores[color].min(), valores[color].max())
+    escala = get_colorscale(color_continuous_scale)
+    
+    fig = go.Figure()
+    for uf, longitudes, latitudes in contornos:
+        if uf in valores.index and pd.notna(valores.at[uf, color]):
+            linha = valores.loc[uf]
+            posicao = 0.5 if maximo == minimo else (linha[color] - minimo) / (maximo - minimo)
+            preenchimento = sample_colorscale(escala, [min(max(posicao, 0), 1)])[0]
+            detalhes = ''.join(f'<br>{coluna}: {linha[coluna]}' for coluna in [color, *(hover_data or [])])
+        else:
+            preenchimento, detalhes = CORES['neutra'], '<br>Sem programas'
+        fig.add_trace(go.Scatter(
+            x=longitudes, y=latitudes,
+            mode='lines', fill='toself', fillcolor=preenchimento,
+            line=dict(color='white', width=0.6),
+            hoveron='fills', hoverinfo='text', text=f'<b>{uf}</b>{detalhes}',
+            name=uf, showlegend=False
+        ))
+    
+    # Barra de cores: um marcador invisível com a mesma escala
+    fig.add_trace(go.Scatter(
+        x=[None], y=[None], mode='markers', hoverinfo='skip', showlegend=False,
+        marker=dict(
+            color=[minimo, maximo], colorscale=escala, cmin=minimo, cmax=maximo,
+            showscale=True, colorbar=dict(title=color)
+        )
+    ))
+    
+    # Longitude encurtada pelo cosseno da latitude média (~15° S)
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False, scaleanchor='x', scaleratio=1 / math.cos(math.radians(15)))
+    fig.update_layout(title=title, plot_bgcolor='rgba(0,0,0,0)', hovermode='closest')
+    return _apply_options(fig, layout=layout)
 
 
+@memoize_chart
 def create_boxplot(df, x, y, color=None, title=""):
     """
     Cria boxplot
@@ -156,6 +773,7 @@ def create_boxplot(df, x, y, color=None, title=""):
     return fig
 
 
+@memoize_chart
 def create_correlation_matrix(df, columns):
     """
     Cria matriz de correlação
@@ -189,7 +807,8 @@ def create_correlation_matrix(df, columns):
     return fig
 
 
-def create_radar_chart(categories, values_dict, title=""):
+@memoize_chart
+def create_radar_chart(categories, values_dict, title="", close=False, radialaxis=None, layout=None):
     """
     Cria radar/spider chart
     
@@ -197,27 +816,34 @@ def create_radar_chart(categories, values_dict, title=""):
         categories: lista de categorias
         values_dict: dict com {nome: [valores]}
         title: título
+        close: se True, repete a primeira categoria no fim para fechar o polígono
+        radialaxis: dict com opções do eixo radial (range, tickvals...)
+        layout: dict passado a update_layout
         
     Returns:
         plotly figure
     """
     fig = go.Figure()
     
+    categorias = list(categories)
     for name, values in values_dict.items():
+        valores = list(values)
+        if close and categorias:
+            valores = valores + valores[:1]
         fig.add_trace(go.Scatterpolar(
-            r=values,
-            theta=categories,
+            r=valores,
+            theta=categorias + categorias[:1] if close else categorias,
             fill='toself',
             name=name
         ))
     
     fig.update_layout(
-        polar=dict(radialaxis=dict(visible=True)),
+        polar=dict(radialaxis=dict(visible=True, **(radialaxis or {}))),
         title=title,
         showlegend=True
     )
     
-    return fig
+    return _apply_options(fig, layout=layout)
 
 
 def create_ies_type_aa_chart(df, title="Universidades Públicas/Privadas com Ações Afirmativas", include_invalid=True):
@@ -232,27 +858,30 @@ def create_ies_type_aa_chart(df, title="Universidades Públicas/Privadas com Aç
     Returns:
         plotly figure, crosstab, info_dict
     """
-    # Encontrar colunas de Tipo de IES e Editais AA (com suporte a múltiplas variações)
-    df_clean = df.copy()
+    df_clean = df.copy(deep=False)
     
-    tipo_ies_col = find_column(df_clean, 'TIPODEIES')
-    editais_col = find_column(df_clean, 'EDITAISAA')
+    tipo_ies_col = column(df_clean, 'Tipo de IES')
+    editais_col = column(df_clean, 'Editais AA')
     
     if tipo_ies_col is None or editais_col is None:
         raise ValueError("Colunas 'Tipo de IES' ou 'Editais AA' não encontradas no DataFrame")
     
-    # Normalizar valores de Tipo de IES
-    df_clean['Tipo_IES_Limpo'] = df_clean[tipo_ies_col].fillna('').astype(str).str.strip().str.upper()
+    # Classe da IES e flag de editais vêm da ingestão (utils/normalization.py);
+    # só DataFrames que não passaram por ela são normalizados aqui
+    if COLUNA_CLASSE_IES not in df_clean.columns:
+        df_clean[COLUNA_CLASSE_IES] = classify_ies(clean_code(df_clean[tipo_ies_col]))
+    if COLUNA_TEM_EDITAIS not in df_clean.columns:
+        df_clean[COLUNA_TEM_EDITAIS] = editais_flag(df_clean[editais_col])
     
-    # Padronizar para 'Pública' e 'Privada'
-    df_clean['Tipo_Classificado'] = df_clean['Tipo_IES_Limpo'].apply(
-        lambda x: 'Pública' if x == 'PUBLICA' else ('Privada' if x == 'PRIVADA' else 'Dados Faltantes/Inválidos')
+    tipo_valido = valid_mask(df_clean, COLUNA_CLASSE_IES)
+    editais_valido = valid_mask(df_clean, COLUNA_TEM_EDITAIS)
+    df_clean['Tipo_Classificado'] = np.where(
+        tipo_valido, df_clean[COLUNA_CLASSE_IES].astype(object), 'Dados Faltantes/Inválidos'
     )
-    
-    # Normalizar valores de Editais AA
-    df_clean['Editais_AA_Limpo'] = df_clean[editais_col].fillna('').astype(str).str.strip().str.upper()
-    df_clean['Tem AA'] = df_clean['Editais_AA_Limpo'].apply(
-        lambda x: 'Com AA' if x == 'SIM' else ('Sem AA' if x in ['NAO', 'NÃO'] else 'Dados Faltantes/Inválidos')
+    df_clean['Tem AA'] = np.where(
+        editais_valido,
+        np.where(df_clean[COLUNA_TEM_EDITAIS].fillna(False).to_numpy(dtype=bool), 'Com AA', 'Sem AA'),
+        'Dados Faltantes/Inválidos'
     )
     
     if include_invalid:
@@ -260,8 +889,7 @@ def create_ies_type_aa_chart(df, title="Universidades Públicas/Privadas com Aç
         df_filtrado = df_clean.copy()
     else:
         # Remover registros com dados faltantes
-        df_filtrado = df_clean[(df_clean['Tipo_Classificado'] != 'Dados Faltantes/Inválidos') & 
-                               (df_clean['Tem AA'] != 'Dados Faltantes/Inválidos')]
+        df_filtrado = df_clean[tipo_valido & editais_valido]
     
     # Criar crosstab
     crosstab = pd.crosstab(df_filtrado['Tipo_Classificado'], df_filtrado['Tem AA'])
@@ -313,4 +941,772 @@ def create_ies_type_aa_chart(df, title="Universidades Públicas/Privadas com Aç
         'privada_sem_aa': crosstab.loc['Privada', 'Sem AA'] if ('Privada' in crosstab.index and 'Sem AA' in crosstab.columns) else 0,
     }
     
+    if FIGURAS_COMPACTAS:
+        fig = compact_figure(fig)
+    
     return fig, crosstab, info_dict
+
+
+# ==================== SPECS DE GRÁFICOS ====================
+#
+# Um spec (ChartSpec) junta uma agregação registrada em AGREGACOES e o modelo
+# da figura (uma função que recebe a tabela agregada e chama os construtores
+# memorizados acima). As páginas e o exportar_graficos.py desenham pelos
+# mesmos specs com render_chart: cada agregação é calculada uma vez por
+# visão (ChartData) e serve a todos os gráficos e tabelas que a usam.
+
+# Agregações: nome -> função(dados, *parametros) -> tabela (None = sem dados)
+AGREGACOES = {}
+
+# Specs registrados: nome -> ChartSpec
+GRAFICOS = {}
+
+
+@dataclasses.dataclass(frozen=True)
+class ChartSpec:
+    """
+    Gráfico declarativo: agregação + modelo da figura
+    
+    Attributes:
+        nome: identificador do gráfico (e nome do PNG exportado, exceto nos
+            gráficos por grupo)
+        pagina: pasta da exportação ('analise_vagas', 'grupos_sociais',
+            'distribuicao_geografica')
+        agregacao: nome da agregação em AGREGACOES
+        desenhar: função (tabela, titulo, tamanho) -> figura; tamanho é o
+            dict com height (e width, na exportação) para o layout
+        titulo: título da figura ('{0}' recebe o primeiro parâmetro)
+        altura: altura no dashboard (None = padrão do plotly)
+        exportacao: (largura, altura) do PNG exportado
+        por_grupo: um gráfico por grupo social (recebe o nome do grupo)
+        todas_areas: só é exportado em 'Todas as Áreas'
+        geometria: usa a geometria das UFs; desenhar recebe nivel (precisão
+            do dashboard ou da exportação) e o spec é pulado sem ela
+    """
+    nome: str
+    pagina: str
+    agregacao: str
+    desenhar: object
+    titulo: str
+    altura: int = 400
+    exportacao: tuple = (800, 400)
+    por_grupo: bool = False
+    todas_areas: bool = False
+    geometria: bool = False
+
+
+class ChartData:
+    """
+    Dados de uma visão (área + filtros) para os specs
+    
+    Cada agregação é calculada uma vez por objeto; com chave (ex.:
+    filter_fingerprint da página), fica também no cache LRU do processo e
+    é reaproveitada pelos reruns seguintes.
+    
+    Args:
+        df: DataFrame filtrado
+        cubo: fatia do cubo com a mesma seleção (None = montado de df quando
+            alguma agregação pedir)
+        chave: identificação da visão no cache do processo (None = sem cache)
+    """
+    
+    def __init__(self, df, cubo=None, chave=None):
+        self.df = df
+        self.chave = chave
+        self._cubo = cubo
+        self._tabelas = {}
+    
+    @property
+    def cube(self):
+        """Fatia do cubo da visão"""
+        if self._cubo is None:
+            self._cubo = build_cube(self.df)
+        return self._cubo
+    
+    def table(self, nome, *parametros):
+        """
+        Tabela de uma agregação registrada
+        
+        Args:
+            nome: nome em AGREGACOES
+            *parametros: parâmetros da agregação (ex.: grupo social)
+            
+        Returns:
+            tabela agregada (não altere no lugar) ou None se não houver dados
+        """
+        chave_local = (nome, *parametros)
+        if chave_local not in self._tabelas:
+            calcular = functools.partial(AGREGACOES[nome], self, *parametros)
+            if self.chave is None:
+                self._tabelas[chave_local] = calcular()
+            else:
+                self._tabelas[chave_local] = memoize(('grafico_dados', self.chave, *chave_local), calcular)
+        return self._tabelas[chave_local]
+
+
+def register_aggregation(nome):
+    """
+    Decorador: registra uma agregação em AGREGACOES
+    
+    Args:
+        nome: nome da agregação
+        
+    Returns:
+        decorador que devolve a função sem alterações
+    """
+    def registrar(funcao):
+        AGREGACOES[nome] = funcao
+        return funcao
+    return registrar
+
+
+def chart_spec(nome, pagina, agregacao, titulo, **opcoes):
+    """
+    Decorador: registra em GRAFICOS um spec com a função decorada como modelo
+    
+    Args:
+        nome, pagina, agregacao, titulo: campos do ChartSpec
+        **opcoes: demais campos (altura, exportacao, por_grupo, todas_areas)
+        
+    Returns:
+        decorador que devolve a função sem alterações
+    """
+    def registrar(desenhar):
+        GRAFICOS[nome] = ChartSpec(nome, pagina, agregacao, desenhar, titulo, **opcoes)
+        return desenhar
+    return registrar
+
+
+def charts_for_page(pagina, por_grupo=False):
+    """
+    Specs de uma página, na ordem de registro
+    
+    Args:
+        pagina: campo pagina dos specs
+        por_grupo: True para os specs desenhados por grupo social
+        
+    Returns:
+        list de ChartSpec
+    """
+    return [spec for spec in GRAFICOS.values() if spec.pagina == pagina and spec.por_grupo == por_grupo]
+
+
+def render_chart(nome, dados, *parametros, sufixo='', exportar=False):
+    """
+    Desenha um spec com os dados de uma visão
+    
+    Args:
+        nome: nome do spec em GRAFICOS
+        dados: ChartData da visão
+        *parametros: parâmetros da agregação e do título
+        sufixo: texto acrescentado ao título (ex.: ' - Artes')
+        exportar: usa o tamanho de exportação (largura e altura fixas) e o
+            template completo
+        
+    Returns:
+        plotly figure ou None se a agregação não tiver dados (ou, nos specs
+            com geometria, se ela não estiver disponível)
+    """
+    spec = GRAFICOS[nome]
+    tabela = dados.table(spec.agregacao, *parametros)
+    if tabela is None:
+        return None
+    if exportar:
+        tamanho = dict(width=spec.exportacao[0], height=spec.exportacao[1])
+    else:
+        tamanho = {} if spec.altura is None else dict(height=spec.altura)
+    opcoes = {}
+    if spec.geometria:
+        opcoes['nivel'] = NIVEL_GEOMETRIA_EXPORTACAO if exportar else NIVEL_GEOMETRIA_DASHBOARD
+        if uf_outlines(opcoes['nivel']) is None:
+            return None
+    fig = spec.desenhar(tabela, spec.titulo.format(*parametros) + sufixo, tamanho, **opcoes)
+    return full_template(fig) if exportar else fig
+
+
+# ----- Análise de Vagas -----
+
+@register_aggregation('totais_vagas')
+def _totais_vagas(dados):
+    return total(dados.cube)
+
+
+@register_aggregation('categorias_vagas')
+def _categorias_vagas(dados):
+    totais = dados.table('totais_vagas')
+    return pd.Series(
+        [totais[COLUNAS_VAGAS[chave]] for chave in ['total', 'aa_total', 'agregadas', 'por_grupo']],
+        index=['Vagas Totais', 'Vagas AA\n(Total)', 'Vagas\nAgregadas', 'Vagas Por\nGrupo']
+    )
+
+
+@register_aggregation('proporcao_vagas')
+def _proporcao_vagas(dados):
+    totais = dados.table('totais_vagas')
+    if totais['Qnt Vagas Totais'] <= 0:
+        return None
+    return pd.Series(
+        [totais['Vagas Totais AA'], totais['Qnt Vagas Totais'] - totais['Vagas Totais AA']],
+        index=['Vagas AA', 'Ampla Concorrência']
+    )
+
+
+@register_aggregation('vagas_por_regiao')
+def _vagas_por_regiao(dados):
+    if 'Região' not in dados.df.columns:
+        return None
+    vagas = rollup(dados.cube, 'Região')
+    vagas['% AA'] = (vagas['Vagas Totais AA'] / vagas['Qnt Vagas Totais'] * 100).round(1)
+    return vagas
+
+
+@register_aggregation('vagas_por_nota')
+def _vagas_por_nota(dados):
+    if 'NOTA' not in dados.df.columns:
+        return None
+    vagas = rollup(dados.cube, 'NOTA')[['NOTA', 'Qnt Vagas Totais', 'Vagas Totais AA']]
+    vagas['NOTA'] = pd.Categorical(vagas['NOTA'], categories=ORDEM_NOTAS, ordered=True)
+    vagas = vagas.sort_values('NOTA')
+    vagas['% AA'] = (vagas['Vagas Totais AA'] / vagas['Qnt Vagas Totais'] * 100).round(1)
+    return vagas
+
+
+@register_aggregation('media_por_status')
+def _media_por_status(dados):
+    # Vagas vazias contam como zero: média = soma / programas
+    por_status = rollup(dados.cube, 'Status AA').set_index('Status AA')
+    medias = [
+        por_status.loc[status, 'Qnt Vagas Totais'] / por_status.loc[status, 'Programas']
+        if status in por_status.index else 0
+        for status in ['Com Editais AA', 'Sem Editais AA']
+    ]
+    return pd.Series(medias, index=['Com AA', 'Sem AA'])
+
+
+def _media_vagas(dados, dimensao):
+    if dimensao not in dados.df.columns:
+        return None
+    agregado = rollup(dados.cube, dimensao).set_index(dimensao)
+    return (agregado['Qnt Vagas Totais'] / agregado['Programas']).sort_values(ascending=False)
+
+
+@register_aggregation('media_por_regiao')
+def _media_por_regiao(dados):
+    return _media_vagas(dados, 'Região')
+
+
+@register_aggregation('media_por_tipo_ies')
+def _media_por_tipo_ies(dados):
+    return _media_vagas(dados, 'Tipo de IES')
+
+
+@register_aggregation('top_vagas_aa')
+def _top_vagas_aa(dados):
+    colunas = ['Nome do Programa', 'Sigla da IES', 'UF', 'NOTA', 'Vagas Totais AA']
+    df = dados.df
+    top = df[df['Vagas Totais AA'] > 0].nlargest(10, 'Vagas Totais AA')
+    if len(top) == 0:
+        return None
+    return top[[coluna for coluna in colunas if coluna in top.columns]].reset_index(drop=True)
+
+
+@chart_spec('comparacao_categorias_barras', 'analise_vagas', 'categorias_vagas',
+            'Distribuição Total de Vagas por Categoria')
+def _grafico_categorias_vagas(tabela, titulo, tamanho):
+    return create_category_bar_chart(
+        tabela,
+        colors=[CORES['primaria'], CORES['com_aa'], CORES['secundaria'], CORES['terciaria']],
+        title=titulo,
+        textposition='outside',
+        texttemplate='%{text:,.0f}',
+        layout=dict(xaxis_title='Categoria de Vagas', yaxis_title='Quantidade de Vagas', **tamanho)
+    )
+
+
+@chart_spec('comparacao_categorias_pizza', 'analise_vagas', 'proporcao_vagas',
+            'Proporção de Vagas AA', altura=350, exportacao=(600, 400))
+def _grafico_proporcao_vagas(tabela, titulo, tamanho):
+    return create_pie_chart(
+        values=tabela.values,
+        names=tabela.index,
+        title=titulo,
+        colors=[CORES['com_aa'], CORES['neutra']],
+        hole=0.4,
+        layout=dict(showlegend=True, **tamanho)
+    )
+
+
+@chart_spec('distribuicao_regiao', 'analise_vagas', 'vagas_por_regiao',
+            'Vagas por Região (AA vs Ampla Concorrência)', exportacao=(900, 400))
+def _grafico_vagas_por_regiao(tabela, titulo, tamanho):
+    vagas = pd.DataFrame({
+        'Vagas AA': tabela['Vagas Totais AA'].to_numpy(),
+        'Ampla Concorrência': (tabela['Qnt Vagas Totais'] - tabela['Vagas Totais AA']).to_numpy()
+    }, index=tabela['Região'])
+    return create_series_bar_chart(
+        vagas,
+        (('Vagas AA', 'Vagas AA', CORES['com_aa']), ('Ampla Concorrência', 'Ampla Concorrência', CORES['neutra'])),
+        title=titulo,
+        barmode='stack',
+        layout=dict(xaxis_title='Região', yaxis_title='Quantidade de Vagas', **tamanho)
+    )
+
+
+@chart_spec('distribuicao_nota_linhas', 'analise_vagas', 'vagas_por_nota', 'Vagas por Nota CAPES')
+def _grafico_vagas_por_nota(tabela, titulo, tamanho):
+    return create_line_chart(
+        tabela,
+        x='NOTA',
+        series=(
+            ('Qnt Vagas Totais', 'Vagas Totais', CORES['primaria']),
+            ('Vagas Totais AA', 'Vagas AA', CORES['com_aa'])
+        ),
+        title=titulo,
+        layout=dict(xaxis_title='Nota', yaxis_title='Quantidade de Vagas', **tamanho)
+    )
+
+
+@chart_spec('distribuicao_nota_percentual', 'analise_vagas', 'vagas_por_nota',
+            'Percentual de Vagas AA por Nota', exportacao=(700, 400))
+def _grafico_percentual_por_nota(tabela, titulo, tamanho):
+    return create_bar_chart(
+        tabela[['NOTA', '% AA']],
+        x='NOTA',
+        y='% AA',
+        title=titulo,
+        text='% AA',
+        color='% AA',
+        color_continuous_scale='Viridis',
+        traces=dict(texttemplate='%{text:.1f}%', textposition='outside'),
+        layout=dict(showlegend=False, **tamanho)
+    )
+
+
+@chart_spec('media_status_aa', 'analise_vagas', 'media_por_status',
+            'Média de Vagas Totais', altura=300, exportacao=(600, 400))
+def _grafico_media_por_status(tabela, titulo, tamanho):
+    return create_category_bar_chart(
+        tabela,
+        colors=[CORES['com_aa'], CORES['sem_aa']],
+        title=titulo,
+        texttemplate='%{text:.1f}',
+        layout=dict(yaxis_title='Média de Vagas', **tamanho)
+    )
+
+
+def _grafico_media_vagas(tabela, titulo, tamanho, rotulo, cor):
+    return create_bar_chart(
+        None,
+        x=tabela.index,
+        y=tabela.values,
+        title=titulo,
+        labels={'x': rotulo, 'y': 'Média de Vagas'},
+        text=tabela.values,
+        traces=dict(texttemplate='%{text:.1f}', textposition='outside', marker_color=cor),
+        layout=dict(showlegend=False, **tamanho)
+    )
+
+
+@chart_spec('media_regiao', 'analise_vagas', 'media_por_regiao',
+            'Média de Vagas por Região', altura=300, exportacao=(700, 400))
+def _grafico_media_por_regiao(tabela, titulo, tamanho):
+    return _grafico_media_vagas(tabela, titulo, tamanho, 'Região', CORES['primaria'])
+
+
+@chart_spec('media_tipo_ies', 'analise_vagas', 'media_por_tipo_ies',
+            'Média de Vagas por Tipo IES', altura=300, exportacao=(700, 400))
+def _grafico_media_por_tipo_ies(tabela, titulo, tamanho):
+    return _grafico_media_vagas(tabela, titulo, tamanho, 'Tipo de IES', CORES['secundaria'])
+
+
+@chart_spec('top_10_programas', 'analise_vagas', 'top_vagas_aa',
+            'Top 10 Programas - Mais Vagas AA', altura=500, exportacao=(900, 600))
+def _grafico_top_vagas_aa(tabela, titulo, tamanho):
+    return create_bar_chart(
+        tabela[['Nome do Programa', 'Vagas Totais AA']],
+        y='Nome do Programa',
+        x='Vagas Totais AA',
+        orientation='h',
+        title=titulo,
+        text='Vagas Totais AA',
+        color='Vagas Totais AA',
+        color_continuous_scale='Viridis',
+        traces=dict(textposition='outside'),
+        layout=dict(yaxis={'categoryorder': 'total ascending'}, showlegend=False, **tamanho)
+    )
+
+
+# ----- Grupos Sociais -----
+
+@register_aggregation('estatisticas_grupos')
+def _estatisticas_grupos(dados):
+    # Programas, vagas e % de programas de cada grupo social
+    df = dados.df
+    grupos_stats = []
+    for nome_grupo, coluna in GRUPOS_SOCIAIS.items():
+        if coluna in df.columns:
+            programas_com_grupo = df[coluna].sum()
+            grupos_stats.append({
+                'Grupo': nome_grupo,
+                'Programas': int(programas_com_grupo),
+                'Vagas': int(get_group_vacancies(df, nome_grupo)),
+                '% Programas': round((programas_com_grupo / len(df) * 100), 1) if len(df) > 0 else 0
+            })
+    return pd.DataFrame(grupos_stats).sort_values('Programas', ascending=False)
+
+
+@register_aggregation('grupos_top5')
+def _grupos_top5(dados):
+    # Cinco grupos com mais programas e 'Outros' com a soma dos demais
+    df_grupos = dados.table('estatisticas_grupos')
+    outros_programas = df_grupos.iloc[5:]['Programas'].sum() if len(df_grupos) > 5 else 0
+    top5 = df_grupos.head(5)[['Grupo', 'Programas']]
+    if outros_programas > 0:
+        top5 = pd.concat([top5, pd.DataFrame([{'Grupo': 'Outros', 'Programas': outros_programas}])])
+    return top5
+
+
+@register_aggregation('grupos_com_vagas')
+def _grupos_com_vagas(dados):
+    df_grupos = dados.table('estatisticas_grupos')
+    com_vagas = df_grupos[df_grupos['Vagas'] > 0][['Grupo', 'Vagas']]
+    return None if com_vagas.empty else com_vagas
+
+
+@register_aggregation('cobertura_por_regiao')
+def _cobertura_por_regiao(dados):
+    # % de programas de cada região que contemplam cada grupo (regiões x grupos)
+    df = dados.df
+    if 'Região' not in df.columns:
+        return None
+    colunas = {nome: coluna for nome, coluna in GRUPOS_SOCIAIS.items() if coluna in df.columns}
+    contemplados = df[list(colunas.values())].fillna(False).astype(int).set_axis(list(colunas), axis=1)
+    cobertura = contemplados.groupby(df['Região'], observed=True).mean() * 100
+    cobertura.index = cobertura.index.astype(str)
+    return None if cobertura.empty else cobertura.sort_index()
+
+
+@register_aggregation('perfil_regional')
+def _perfil_regional(dados):
+    # Cobertura com os grupos na ordem de estatisticas_grupos (eixos do radar)
+    cobertura = dados.table('cobertura_por_regiao')
+    if cobertura is None:
+        return None
+    return cobertura[dados.table('estatisticas_grupos')['Grupo'].tolist()]
+
+
+@register_aggregation('quantidade_grupos')
+def _quantidade_grupos(dados):
+    distribuicao = group_count_distribution(dados.df)
+    return None if len(distribuicao) == 0 else distribuicao
+
+
+@register_aggregation('media_grupos_por_area')
+def _media_grupos_por_area(dados):
+    df = dados.df
+    if 'Área' not in df.columns or len(df) == 0:
+        return None
+    area_stats = groups_by_area(df)['mean'].reset_index()
+    area_stats['Área'] = area_stats['Área'].astype(str)
+    area_stats = area_stats.sort_values('mean', ascending=False)
+    area_stats.columns = ['Área', 'Média de Grupos por Programa']
+    return area_stats
+
+
+def _contagem_do_grupo(dados, grupo, dimensao):
+    df = dados.df
+    coluna = GRUPOS_SOCIAIS[grupo]
+    if dimensao not in df.columns or coluna not in df.columns:
+        return None
+    do_grupo = df[dimensao][df[coluna].fillna(False).to_numpy(dtype=bool)]
+    return None if len(do_grupo) == 0 else count_values(do_grupo)
+
+
+@register_aggregation('grupo_por_regiao')
+def _grupo_por_regiao(dados, grupo):
+    return _contagem_do_grupo(dados, grupo, 'Região')
+
+
+@register_aggregation('grupo_por_nota')
+def _grupo_por_nota(dados, grupo):
+    return _contagem_do_grupo(dados, grupo, 'NOTA')
+
+
+@chart_spec('visao_geral_grupos', 'grupos_sociais', 'estatisticas_grupos',
+            'Número de Programas que Contemplam Cada Grupo', exportacao=(1000, 500))
+def _grafico_programas_por_grupo(tabela, titulo, tamanho):
+    return create_bar_chart(
+        tabela[['Grupo', 'Programas']],
+        x='Grupo',
+        y='Programas',
+        title=titulo,
+        text='Programas',
+        color='Programas',
+        color_continuous_scale='Viridis',
+        traces=dict(textposition='outside'),
+        layout=dict(
+            xaxis_title='Grupo Social',
+            yaxis_title='Quantidade de Programas',
+            showlegend=False,
+            **tamanho
+        )
+    )
+
+
+@chart_spec('distribuicao_programas_pizza', 'grupos_sociais', 'grupos_top5',
+            'Distribuição de Programas por Grupo', altura=None, exportacao=(700, 500))
+def _grafico_grupos_top5(tabela, titulo, tamanho):
+    return create_pie_chart(
+        values=tabela['Programas'],
+        names=tabela['Grupo'],
+        title=titulo,
+        hole=0.4,
+        layout=tamanho
+    )
+
+
+@chart_spec('distribuicao_vagas_treemap', 'grupos_sociais', 'grupos_com_vagas',
+            'Distribuição de Vagas por Grupo (Treemap)', altura=None, exportacao=(800, 500))
+def _grafico_vagas_por_grupo(tabela, titulo, tamanho):
+    return create_treemap(
+        tabela,
+        path=['Grupo'],
+        values='Vagas',
+        title=titulo,
+        color='Vagas',
+        color_continuous_scale='Greens',
+        layout=tamanho
+    )
+
+
+@chart_spec('perfil_regional_radar', 'grupos_sociais', 'perfil_regional',
+            'Percentual de Programas por Região que Contemplam cada Grupo', altura=500, exportacao=(900, 600))
+def _grafico_perfil_regional(tabela, titulo, tamanho):
+    return create_radar_chart(
+        list(tabela.columns),
+        {regiao: tabela.loc[regiao].tolist() for regiao in tabela.index},
+        title=titulo,
+        close=True,
+        radialaxis=dict(range=[0, 100]),
+        layout=tamanho
+    )
+
+
+@chart_spec('multiplos_grupos', 'grupos_sociais', 'quantidade_grupos',
+            'Distribuição de Programas por Nº de Grupos', altura=None, exportacao=(700, 500))
+def _grafico_quantidade_grupos(tabela, titulo, tamanho):
+    return create_bar_chart(
+        None,
+        x=tabela.index,
+        y=tabela.values,
+        title=titulo,
+        labels={'x': 'Quantidade de Grupos', 'y': 'Quantidade de Programas'},
+        text=tabela.values,
+        traces=dict(textposition='outside', marker_color=CORES['terciaria']),
+        layout=dict(showlegend=False, **tamanho)
+    )
+
+
+@chart_spec('interseccionalidade_area', 'grupos_sociais', 'media_grupos_por_area',
+            'Média de Grupos Sociais Contemplados por Programa (por Área)', altura=500, exportacao=(1200, 600),
+            todas_areas=True)
+def _grafico_media_grupos_por_area(tabela, titulo, tamanho):
+    return create_bar_chart(
+        tabela,
+        x='Área',
+        y='Média de Grupos por Programa',
+        title=titulo,
+        text='Média de Grupos por Programa',
+        color='Média de Grupos por Programa',
+        color_continuous_scale='Blues',
+        traces=dict(texttemplate='%{text:.2f}', textposition='outside'),
+        layout=tamanho
+    )
+
+
+@chart_spec('grupo_regiao', 'grupos_sociais', 'grupo_por_regiao',
+            'Distribuição Geográfica - {0}', altura=350, exportacao=(700, 400), por_grupo=True)
+def _grafico_grupo_por_regiao(tabela, titulo, tamanho):
+    return create_bar_chart(
+        None,
+        x=tabela.index,
+        y=tabela.values,
+        title=titulo,
+        labels={'x': 'Região', 'y': 'Quantidade de Programas'},
+        text=tabela.values,
+        traces=dict(textposition='outside', marker_color=CORES['primaria']),
+        layout=dict(showlegend=False, **tamanho)
+    )
+
+
+@chart_spec('grupo_nota', 'grupos_sociais', 'grupo_por_nota',
+            'Distribuição por Nota CAPES - {0}', altura=350, exportacao=(700, 400), por_grupo=True)
+def _grafico_grupo_por_nota(tabela, titulo, tamanho):
+    return create_bar_chart(
+        None,
+        x=tabela.index,
+        y=tabela.values,
+        title=titulo,
+        labels={'x': 'Nota', 'y': 'Quantidade de Programas'},
+        text=tabela.values,
+        category_orders={'x': ORDEM_NOTAS},
+        traces=dict(textposition='outside', marker_color=CORES['secundaria']),
+        layout=dict(showlegend=False, **tamanho)
+    )
+
+
+# ----- Distribuição Geográfica -----
+
+@register_aggregation('estatisticas_uf')
+def _estatisticas_uf(dados):
+    # Programas e % com AA por UF, com coordenadas e região
+    if 'UF' not in dados.df.columns:
+        return None
+    cubo = dados.cube
+    uf_stats = rollup(cubo, 'UF')[['UF', 'Programas', 'Com AA']]
+    uf_stats.columns = ['UF', 'Total Programas', 'Com AA']
+    uf_stats['UF'] = uf_stats['UF'].astype(str)
+    uf_stats['% Com AA'] = (uf_stats['Com AA'] / uf_stats['Total Programas'] * 100).round(1)
+    uf_stats['lat'] = uf_stats['UF'].map(lambda x: COORDENADAS_UFS.get(x, (0, 0))[0])
+    uf_stats['lon'] = uf_stats['UF'].map(lambda x: COORDENADAS_UFS.get(x, (0, 0))[1])
+    # Uma região por UF para o mapeamento
+    uf_regiao = cubo[['UF', 'Região']].dropna().drop_duplicates(subset=['UF']).astype(str).set_index('UF')
+    uf_stats['Região'] = uf_stats['UF'].map(uf_regiao['Região'])
+    return uf_stats
+
+
+@register_aggregation('status_por_regiao')
+def _status_por_regiao(dados):
+    if 'Região' not in dados.df.columns:
+        return None
+    return crosstab(dados.cube, 'Região', 'Status AA')
+
+
+@register_aggregation('programas_por_regiao')
+def _programas_por_regiao(dados):
+    if 'Região' not in dados.df.columns:
+        return None
+    return rollup(dados.cube, 'Região').set_index('Região')['Programas'].sort_values(ascending=False)
+
+
+@register_aggregation('hierarquia_ies')
+def _hierarquia_ies(dados):
+    # Programas por Região > UF > IES
+    df = dados.df
+    if 'Sigla da IES' not in df.columns or 'Região' not in df.columns:
+        return None
+    hierarquia = df.groupby(['Região', 'UF', 'Sigla da IES'], observed=True).size().reset_index(name='Contagem')
+    return hierarquia.astype({'Região': str, 'UF': str})  # o treemap agrega o caminho com max
+
+
+@chart_spec('mapa_distribuicao', 'distribuicao_geografica', 'estatisticas_uf',
+            'Distribuição por Estado (Tamanho = Qtd. Programas | Cor = % com AA)', altura=600,
+            exportacao=(1000, 600))
+def _grafico_mapa_uf(tabela, titulo, tamanho):
+    return create_geo_scatter(
+        tabela[['UF', 'lat', 'lon', 'Total Programas', 'Com AA', '% Com AA', 'Região']],
+        lat='lat',
+        lon='lon',
+        size='Total Programas',
+        color='% Com AA',
+        hover_name='UF',
+        hover_data=['Total Programas', 'Com AA', '% Com AA', 'Região'],
+        title=titulo,
+        color_continuous_scale='Viridis',
+        size_max=50,
+        layout=dict(margin={"r": 0, "t": 30, "l": 0, "b": 0}, **tamanho)
+    )
+
+
+@chart_spec('mapa_coropletico', 'distribuicao_geografica', 'estatisticas_uf',
+            'Percentual de Programas com AA por Estado', altura=600, exportacao=(1000, 700), geometria=True)
+def _grafico_mapa_coropletico(tabela, titulo, tamanho, nivel):
+    return create_choropleth_map(
+        tabela[['UF', '% Com AA', 'Total Programas', 'Com AA', 'Região']],
+        locations='UF',
+        color='% Com AA',
+        nivel=nivel,
+        hover_data=['Total Programas', 'Com AA', 'Região'],
+        title=titulo,
+        color_continuous_scale='Viridis',
+        range_color=[0, 100],
+        layout=dict(margin={"r": 0, "t": 30, "l": 0, "b": 0}, **tamanho)
+    )
+
+
+@chart_spec('analise_regional_barras', 'distribuicao_geografica', 'status_por_regiao',
+            'Programas por Região (Com vs Sem AA)', altura=None, exportacao=(900, 500))
+def _grafico_status_por_regiao(tabela, titulo, tamanho):
+    return create_series_bar_chart(
+        tabela,
+        (('Com Editais AA', 'Com AA', CORES['com_aa']), ('Sem Editais AA', 'Sem AA', CORES['sem_aa'])),
+        title=titulo,
+        barmode='group',
+        text=True,
+        layout=dict(
+            xaxis_title='Região',
+            yaxis_title='Quantidade',
+            legend=dict(orientation="h", y=1.1),
+            **tamanho
+        )
+    )
+
+
+@chart_spec('analise_regional_pizza', 'distribuicao_geografica', 'programas_por_regiao',
+            'Distribuição Total de Programas por Região', altura=None, exportacao=(700, 500))
+def _grafico_programas_por_regiao(tabela, titulo, tamanho):
+    return create_pie_chart(
+        values=tabela.values,
+        names=tabela.index,
+        title=titulo,
+        hole=0.4,
+        layout=tamanho
+    )
+
+
+@chart_spec('detalhamento_uf', 'distribuicao_geografica', 'estatisticas_uf',
+            'Total de Programas e Percentual de Ações Afirmativas por UF', altura=500, exportacao=(1200, 500))
+def _grafico_detalhamento_uf(tabela, titulo, tamanho):
+    ordenado = tabela.sort_values('Total Programas', ascending=False)
+    return create_bar_line_chart(
+        ordenado[['UF', 'Total Programas', '% Com AA']].rename(columns={'Total Programas': 'Total de Programas'}),
+        x='UF',
+        bar='Total de Programas',
+        line='% Com AA',
+        title=titulo,
+        line_color=CORES['secundaria'],
+        line_range=[0, 100],
+        layout=dict(xaxis_title='Estado (UF)', legend=dict(orientation="h", y=1.1), **tamanho)
+    )
+
+
+@chart_spec('heatmap_grupos_regiao', 'distribuicao_geografica', 'cobertura_por_regiao',
+            'Percentual de Programas que Contemplam cada Grupo (por Região)', exportacao=(1000, 500))
+def _grafico_cobertura_por_regiao(tabela, titulo, tamanho):
+    return create_table_heatmap(
+        tabela,
+        title=titulo,
+        colorscale='Blues',
+        texttemplate='%{z:.1f}',
+        colorbar_title="% de Adesão",
+        layout=dict(
+            xaxis_title="Grupo Social",
+            yaxis=dict(title="Região", autorange='reversed'),
+            **tamanho
+        )
+    )
+
+
+@chart_spec('treemap_hierarquico', 'distribuicao_geografica', 'hierarquia_ies',
+            'Hierarquia de Programas (Tamanho = Qtd. Programas)', altura=600, exportacao=(1200, 700))
+def _grafico_hierarquia_ies(tabela, titulo, tamanho):
+    return create_treemap(
+        tabela,
+        path=['Região', 'UF', 'Sigla da IES'],
+        values='Contagem',
+        color='Região',
+        title=titulo,
+        root="Brasil",
+        color_discrete_sequence=px.colors.qualitative.Prism,
+        layout=tamanho
+    )
@@ -0,0 +1,143 @@
+"""
+Cubo pré-agregado dos programas pelas dimensões do dashboard
+
+O cubo é montado uma vez por versão do dataset, no grão DIMENSOES_CUBO
+(Área, Região, UF, NOTA, Tipo de IES, Modalidade de Ensino, Status AA),
+só com medidas aditivas: contagens de programas e somas de vagas. Totais,
+crosstabs e agregações por dimensão saem do cubo somando células, em
+tempo proporcional ao número de células e não ao número de programas.
+"""
+import pandas as pd
+
+from config import DIMENSOES_CUBO, COLUNAS_VAGAS
+
+# Medidas do cubo (todas aditivas)
+MEDIDAS = [
+    'Programas',
+    'Com AA',
+    *COLUNAS_VAGAS.values(),
+    *[f'Programas com {coluna}' for coluna in COLUNAS_VAGAS.values()]
+]
+
+
+def build_cube(df):
+    """
+    Agrega os programas no grão do cubo
+
+    Dimensões ausentes do DataFrame entram vazias (NaN); colunas de vagas
+    ausentes contam como zero (as presentes já são inteiras desde a ingestão).
+
+    Args:
+        df: DataFrame preparado (com 'Status AA')
+
+    Returns:
+        DataFrame com uma linha por combinação observada das dimensões e
+            as colunas de MEDIDAS
+    """
+    medidas = pd.DataFrame(index=df.index)
+    medidas['Programas'] = 1
+    medidas['Com AA'] = (df['Status AA'] == 'Com Editais AA').astype(int)
+    for coluna in COLUNAS_VAGAS.values():
+        if coluna in df.columns:
+            vagas = df[coluna]
+        else:
+            vagas = pd.Series(0, index=df.index)
+        medidas[coluna] = vagas
+        medidas[f'Programas com {coluna}'] = (vagas > 0).astype(int)
+
+    chaves = [df[dim] if dim in df.columns else pd.Series(pd.NA, index=df.index, name=dim) for dim in DIMENSOES_CUBO]
+    cubo = medidas.groupby(chaves, observed=True, dropna=False, sort=False).sum()
+    return cubo.reset_index()
+
+
+def slice_cube(cubo, selecao=None):
+    """
+    Restringe o cubo aos valores selecionados de cada dimensão
+
+    Só as dimensões do cubo (DIMENSOES_CUBO) podem ser restringidas; uma
+    seleção com valores em outra dimensão (ex.: 'Sigla da IES') precisa do
+    filtro por linhas (select_rows) e de build_cube sobre o resultado.
+
+    Args:
+        cubo: DataFrame do cubo (ou de uma fatia dele)
+        selecao: dict {dimensão: lista de valores}; listas vazias ou None
+            não restringem a dimensão
+
+    Returns:
+        DataFrame com as células selecionadas
+
+    Raises:
+        ValueError: se a seleção restringir dimensões que o cubo não tem
+    """
+    if not selecao:
+        return cubo
+    fora = [dimensao for dimensao, valores in selecao.items() if valores and dimensao not in cubo.columns]
+    if fora:
+        raise ValueError(f"Dimensões fora do cubo: {', '.join(fora)} (filtrar as linhas e usar build_cube)")
+    manter = pd.Series(True, index=cubo.index)
+    for dimensao, valores in selecao.items():
+        if valores:
+            manter &= cubo[dimensao].isin(valores)
+    return cubo[manter]
+
+
+def rollup(cubo, dimensoes, selecao=None):
+    """
+    Soma as medidas por uma ou mais dimensões
+
+    Equivale a um groupby(...).sum() sobre os programas: só aparecem as
+    combinações com programas, e valores vazios da dimensão são ignorados.
+
+    Args:
+        cubo: DataFrame do cubo
+        dimensoes: nome da dimensão ou lista de dimensões
+        selecao: dict opcional para slice_cube
+
+    Returns:
+        DataFrame com as dimensões e as medidas somadas
+    """
+    if isinstance(dimensoes, str):
+        dimensoes = [dimensoes]
+    fatia = slice_cube(cubo, selecao)
+    agregado = fatia.groupby(dimensoes, observed=True)[MEDIDAS].sum().reset_index()
+    for dimensao in dimensoes:
+        if isinstance(agregado[dimensao].dtype, pd.CategoricalDtype):
+            agregado[dimensao] = agregado[dimensao].astype(object)
+    return agregado
+
+
+def crosstab(cubo, linhas, colunas, medida='Programas', selecao=None):
+    """
+    Tabela cruzada de uma medida entre duas dimensões
+
+    Com medida='Programas' o resultado é o mesmo de
+    pd.crosstab(df[linhas], df[colunas]).
+
+    Args:
+        cubo: DataFrame do cubo
+        linhas: dimensão das linhas
+        colunas: dimensão das colunas
+        medida: medida a somar em cada célula
+        selecao: dict opcional para slice_cube
+
+    Returns:
+        DataFrame linhas x colunas, com zero nas combinações sem programas
+    """
+    agregado = rollup(cubo, [linhas, colunas], selecao)
+    tabela = agregado.pivot(index=linhas, columns=colunas, values=medida).fillna(0)
+    tabela = tabela.astype(agregado[medida].dtype).sort_index().sort_index(axis=1)
+    return tabela
+
+
+def total(cubo, selecao=None):
+    """
+    Soma todas as medidas da seleção
+
+    Args:
+        cubo: DataFrame do cubo
+        selecao: dict opcional para slice_cube
+
+    Returns:
+        Series indexada pelas MEDIDAS
+    """
+    return slice_cube(cubo, selecao)[MEDIDAS].sum()
@@ -1,75 +1,303 @@
 """
 Módulo de carregamento de dados para o Dashboard de Ações Afirmativas
 """
+import functools
+
 import pandas as pd
 import streamlit as st
+from config import (
+    ARQUIVO_DADOS, PASTA_SNAPSHOT, USAR_MMAP, VAGAS_GRUPOS, COLUNAS_CATEGORICAS, COLUNA_CHAVE, COLUNA_TEM_EDITAIS
+)
+from utils.cache import memoize
+from utils.cube import build_cube, total
+from utils.filter_index import build_filter_index
+from utils.normalization import editais_flag, status_aa
+from utils.partition import AreaPartition
+from utils.programs import build_program_keys, build_program_index
+from utils.schema import CAMPOS_OBRIGATORIOS, missing_fields
+from utils.search import build_search_index
+from utils.snapshot import (
+    assinatura_arquivo, versao_dados, carregar_snapshot, atualizar_snapshot, carregar_arrow, salvar_arrow
+)
+from utils.workbook import read_workbook
+
+
+def enable_copy_on_write():
+    """
+    Ativa o copy-on-write do pandas no processo
+
+    Chamada pelos pontos de entrada (dashboard_aa.py, páginas e scripts de
+    exportação) antes de carregar os dados: fatias e cópias rasas dos
+    DataFrames compartilhados entre sessões dividem os dados com o cache,
+    e qualquer alteração feita por uma página copia antes de escrever, sem
+    chegar ao objeto compartilhado. A opção é global, por isso não é
+    ligada na importação dos módulos.
+    """
+    pd.set_option('mode.copy_on_write', True)
 
 
-def find_column(df, pattern):
+def load_dataset(caminho=ARQUIVO_DADOS, workers=None):
     """
-    Encontra coluna no DataFrame que corresponde ao padrão (case-insensitive, ignorando espaços)
+    Carrega todas as áreas usando o snapshot colunar em disco
+    
+    Não depende do runtime do Streamlit, por isso é usada também pelos
+    scripts de exportação. Só o primeiro leitor após uma alteração no
+    workbook paga o custo do openpyxl, e apenas para as abas alteradas;
+    os demais leem o snapshot Parquet.
     
     Args:
-        df: DataFrame
-        pattern: padrão a procurar (ex: 'TIPODEIES', 'EDITAISAA')
+        caminho: caminho do arquivo Excel
+        workers: processos da leitura das abas alteradas (ver read_workbook)
         
     Returns:
-        str: nome da coluna ou None se não encontrar
+        tuple: (areas_data, df_todas_areas, lista_areas), com areas_data
+            como AreaPartition sobre df_todas_areas (cada linha existe uma vez)
     """
-    pattern_normalized = pattern.upper().replace(' ', '')
-    for col in df.columns:
-        if col.upper().replace(' ', '') == pattern_normalized:
-            return col
-    return None
+    snapshot = carregar_snapshot(caminho, PASTA_SNAPSHOT)
+    if snapshot is None:
+        snapshot = atualizar_snapshot(caminho, PASTA_SNAPSHOT, functools.partial(read_workbook, workers=workers))
+    
+    abas, lista_areas, _ = snapshot
+    
+    # Um único DataFrame com as áreas em sequência; as abas lidas são descartadas
+    areas_data = AreaPartition.from_frames(abas)
+    
+    return areas_data, areas_data.frame, lista_areas
+
+
+def load_dataset_mmap(caminho=ARQUIVO_DADOS, workers=None):
+    """
+    Carrega todas as áreas mapeando o arquivo Arrow do snapshot
+    
+    Se o arquivo Arrow ainda não existir para a versão atual do workbook,
+    ele é gerado a partir do snapshot Parquet (ou do próprio Excel).
+    
+    Args:
+        caminho: caminho do arquivo Excel
+        workers: processos da leitura das abas alteradas (ver read_workbook)
+        
+    Returns:
+        tuple: (areas_data, df_todas_areas, lista_areas)
+    """
+    dados = carregar_arrow(caminho, PASTA_SNAPSHOT)
+    if dados is None:
+        areas_data, _, _ = load_dataset(caminho, workers)
+        if salvar_arrow(caminho, PASTA_SNAPSHOT, areas_data):
+            dados = carregar_arrow(caminho, PASTA_SNAPSHOT)
+    if dados is None:
+        # Pasta do snapshot sem permissão de escrita: seguir sem mapeamento
+        return load_dataset(caminho, workers)
+    return dados
+
+
+def memory_usage_mb(df):
+    """Memória ocupada pelo DataFrame, incluindo os textos, em MB"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def compact_dataset(areas_data, df_todas_areas, lista_areas):
+    """
+    Converte o dataset carregado para tipos compactos
+    
+    As dimensões (COLUNAS_CATEGORICAS) viram category, com as categorias
+    calculadas sobre todas as áreas juntas; as colunas SIM/NÃO já chegam
+    como boolean da ingestão (utils/normalization.py). Filtros, isin e
+    groupby passam a operar sobre códigos inteiros em vez de textos. A
+    chave dos programas (COLUNA_CHAVE, ver utils/programs.py) é calculada
+    aqui, uma única vez.
+    
+    Args:
+        areas_data: AreaPartition sobre df_todas_areas
+        df_todas_areas: DataFrame agregado (áreas contíguas, na ordem de lista_areas)
+        lista_areas: lista de nomes das áreas
+        
+    Returns:
+        tuple: (areas_data, df_todas_areas, lista_areas) com os tipos
+            compactos; areas_data continua particionando df_todas_areas
+    """
+    antes = memory_usage_mb(df_todas_areas)
+    
+    df_todas_areas = prepare_dataframe(df_todas_areas)
+    df_todas_areas[COLUNA_CHAVE] = build_program_keys(df_todas_areas)
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df_todas_areas.columns:
+            # Categorias só de texto (há células numéricas digitadas por engano)
+            valores = df_todas_areas[coluna]
+            df_todas_areas[coluna] = valores.where(valores.isna(), valores.astype(str)).astype('category')
+    # Com copy-on-write as colunas substituídas ainda prenderiam os blocos
+    # lidos do snapshot; a cópia final deixa só os dados compactos (os
+    # textos Arrow do modo USAR_MMAP não são duplicados)
+    df_todas_areas = df_todas_areas.copy()
+    
+    print(f"[OK] Dataset em memória: {antes:.1f} MB -> {memory_usage_mb(df_todas_areas):.1f} MB")
+    
+    # As áreas continuam fatias do agregado, com as mesmas categorias;
+    # COLUNA_CHAVE entra em todas
+    return areas_data.realign(df_todas_areas), df_todas_areas, lista_areas
+
+
+# A assinatura do arquivo entra na chave do cache: salvar o workbook gera
+# uma nova entrada (que reaproveita as abas inalteradas do snapshot) e
+# max_entries=1 descarta a versão anterior
+@st.cache_resource(max_entries=1)
+def _load_all_areas(assinatura, usar_mmap):
+    # cache_resource devolve sempre o mesmo objeto, sem serializar/copiar:
+    # o dataset existe uma vez por processo, qualquer que seja o número de sessões.
+    # Leitura serial: o servidor é multithread e executa as páginas como __main__
+    carregar = load_dataset_mmap if usar_mmap else load_dataset
+    return compact_dataset(*carregar(workers=1))
+
 
-@st.cache_data
 def load_all_areas():
     """
     Carrega todas as áreas do arquivo dados_brutos.xlsx com normalização de valores
     
+    As dimensões chegam como category e as colunas SIM/NÃO como boolean
+    (ver compact_dataset). O dataset é carregado uma vez por processo e
+    compartilhado por todas as sessões (com USAR_MMAP, os textos ficam no
+    arquivo mapeado), num único DataFrame com as áreas em faixas contíguas
+    (ver utils/partition.py). Cada chamada recebe uma cópia rasa do
+    DataFrame, e cada área é uma fatia nova a cada acesso: com
+    copy-on-write nada disso duplica os dados, e atribuições ou alterações
+    feitas pela página ficam na cópia.
+    
     Returns:
         tuple: (areas_data, df_todas_areas, lista_areas)
-            - areas_data: dict com DataFrames por área
+            - areas_data: AreaPartition (área -> fatia de df_todas_areas)
             - df_todas_areas: DataFrame agregado
             - lista_areas: lista de nomes das áreas
     """
-    excel_file = pd.ExcelFile('dados_brutos.xlsx')
-    areas_data = {}
+    areas_data, df_todas_areas, lista_areas = _load_all_areas(assinatura_arquivo(ARQUIVO_DADOS), USAR_MMAP)
+    return areas_data, df_todas_areas.copy(deep=False), list(lista_areas)
+
+
+@st.cache_data(max_entries=1)
+def _dataset_version(assinatura):
+    return versao_dados(ARQUIVO_DADOS, PASTA_SNAPSHOT)
+
+
+def dataset_version():
+    """
+    Versão do dataset carregado, para chaves de cache (ver utils/cache.py)
     
-    # Carregar cada aba/área
-    for sheet_name in excel_file.sheet_names:
-        df_area = pd.read_excel(excel_file, sheet_name=sheet_name)
-        df_area['Área'] = sheet_name  # Adicionar coluna identificando a área
-        
-        # Normalizar valores das colunas (mantendo nomes originais)
-        # Para 'Tipo de IES' ou 'TIPO DE IES' - encontrar e normalizar qualquer variação
-        for col_name in df_area.columns:
-            if col_name.upper().replace(' ', '') == 'TIPODEIES':
-                df_area[col_name] = df_area[col_name].fillna('').astype(str).str.strip().str.upper()
-            # Para 'Editais AA'
-            elif col_name.upper().replace(' ', '') == 'EDITAISAA':
-                df_area[col_name] = df_area[col_name].fillna('').astype(str).str.strip().str.upper()
-            # Para NOTA/Nota/NOTAS
-            elif col_name.upper() == 'NOTA' or col_name.upper() == 'NOTAS':
-                df_area[col_name] = df_area[col_name].astype(str).str.strip()
+    Vem do hash de conteúdo registrado na ingestão (versao_dados) e é
+    calculada uma vez por assinatura do arquivo; tocar o workbook sem
+    alterá-lo mantém a mesma versão.
+    
+    Returns:
+        str: identificador curto da versão
+    """
+    return _dataset_version(assinatura_arquivo(ARQUIVO_DADOS))
+
+
+@st.cache_data(max_entries=1)
+def _load_cube(assinatura):
+    _, df_todas_areas, _ = load_all_areas()
+    return build_cube(df_todas_areas)
+
+
+def load_cube():
+    """
+    Carrega o cubo pré-agregado do dataset (ver utils/cube.py)
+    
+    Montado uma vez por versão do workbook, a partir de load_all_areas.
+    Use slice_cube com get_filter_spec(...).selection() para aplicar a área e os
+    filtros globais da página.
+    
+    Returns:
+        DataFrame do cubo
+    """
+    return _load_cube(assinatura_arquivo(ARQUIVO_DADOS))
+
+
+@st.cache_resource(max_entries=1)
+def _load_filter_indexes(assinatura):
+    # Somente leitura: compartilhado por todas as sessões, sem cópia
+    areas_data, df_todas_areas, _ = load_all_areas()
+    indices = {area: build_filter_index(df_area) for area, df_area in areas_data.items()}
+    indices['Todas as Áreas'] = build_filter_index(df_todas_areas)
+    for area, indice in indices.items():
+        # Identifica as seleções desta área/versão no cache de utils/cache.py
+        indice['chave'] = (dataset_version(), area)
+    return indices
+
+
+def load_filter_index(area_selecionada):
+    """
+    Retorna o índice de bitmaps dos filtros globais da área (ver utils/filter_index.py)
+    
+    As linhas do índice são as do DataFrame devolvido por get_area_frame
+    (ou get_data_for_area) para a mesma área. O índice traz a 'chave'
+    (versão, área) usada por render_global_filters para memorizar as
+    seleções no cache do processo.
+    
+    Args:
+        area_selecionada: nome da área ou 'Todas as Áreas'
         
-        areas_data[sheet_name] = df_area
+    Returns:
+        dict: índice de build_filter_index
+    """
+    return _load_filter_indexes(assinatura_arquivo(ARQUIVO_DADOS))[area_selecionada]
+
+
+@st.cache_resource(max_entries=1)
+def _load_search_indexes(assinatura):
+    # Somente leitura: compartilhado por todas as sessões, sem cópia
+    areas_data, df_todas_areas, _ = load_all_areas()
+    indices = {area: build_search_index(df_area) for area, df_area in areas_data.items()}
+    indices['Todas as Áreas'] = build_search_index(df_todas_areas)
+    return indices
+
+
+def load_search_index(area_selecionada):
+    """
+    Retorna o índice de busca por trigramas da área (ver utils/search.py)
     
-    # Criar DataFrame agregado com todas as áreas
-    df_todas_areas = pd.concat(areas_data.values(), ignore_index=True)
+    As posições do índice são as linhas do DataFrame de get_area_frame
+    para a mesma área, como no índice de load_filter_index; as posições de
+    select_rows servem para restringir a busca aos filtros.
     
-    return areas_data, df_todas_areas, list(excel_file.sheet_names)
+    Args:
+        area_selecionada: nome da área ou 'Todas as Áreas'
+        
+    Returns:
+        dict: índice de build_search_index
+    """
+    return _load_search_indexes(assinatura_arquivo(ARQUIVO_DADOS))[area_selecionada]
+
+
+@st.cache_resource(max_entries=1)
+def _load_program_indexes(assinatura):
+    # Somente leitura: compartilhado por todas as sessões, sem cópia
+    areas_data, df_todas_areas, _ = load_all_areas()
+    indices = {area: build_program_index(df_area) for area, df_area in areas_data.items()}
+    indices['Todas as Áreas'] = build_program_index(df_todas_areas)
+    return indices
+
+
+def load_program_index(area_selecionada):
+    """
+    Retorna o índice chave -> posição dos programas da área (ver utils/programs.py)
     
-    # Criar DataFrame agregado com todas as áreas
-    df_todas_areas = pd.concat(areas_data.values(), ignore_index=True)
+    As posições são as linhas do DataFrame de get_area_frame para a mesma
+    área; use lookup_programs para obter as linhas de uma lista de chaves.
     
-    return areas_data, df_todas_areas, list(excel_file.sheet_names)
+    Args:
+        area_selecionada: nome da área ou 'Todas as Áreas'
+        
+    Returns:
+        dict: {chave: posição}
+    """
+    return _load_program_indexes(assinatura_arquivo(ARQUIVO_DADOS))[area_selecionada]
 
 
 def get_data_for_area(area_selecionada, areas_data, df_todas_areas):
     """
     Retorna dados da área selecionada
     
+    A cópia é rasa: com copy-on-write ela divide os dados com o cache
+    compartilhado entre sessões até que uma coluna seja alterada.
+    
     Args:
         area_selecionada: nome da área ou 'Todas as Áreas'
         areas_data: dict com DataFrames por área
@@ -79,9 +307,32 @@ def get_data_for_area(area_selecionada, areas_data, df_todas_areas):
         DataFrame da área selecionada
     """
     if area_selecionada == 'Todas as Áreas':
-        return df_todas_areas.copy()
+        return df_todas_areas.copy(deep=False)
     else:
-        return areas_data[area_selecionada].copy()
+        return areas_data[area_selecionada].copy(deep=False)
+
+
+def get_area_frame(area_selecionada):
+    """
+    Retorna os dados preparados da área (get_data_for_area + prepare_dataframe)
+    
+    O DataFrame é montado uma vez por versão do dataset e área e fica no
+    cache LRU do processo (utils/cache.py), compartilhado pelas páginas e
+    sessões; navegar entre páginas não refaz as cópias.
+    
+    Args:
+        area_selecionada: nome da área ou 'Todas as Áreas'
+        
+    Returns:
+        DataFrame (cópia rasa: com copy-on-write, atribuições e alterações
+            no lugar ficam na cópia da página)
+    """
+    def preparar():
+        areas_data, df_todas_areas, _ = load_all_areas()
+        return prepare_dataframe(get_data_for_area(area_selecionada, areas_data, df_todas_areas))
+    
+    chave = ('area', dataset_version(), area_selecionada)
+    return memoize(chave, preparar).copy(deep=False)
 
 
 def get_filtered_data(df, area_selecionada, areas_data, df_todas_areas):
@@ -98,9 +349,9 @@ def get_filtered_data(df, area_selecionada, areas_data, df_todas_areas):
         DataFrame filtrado
     """
     if area_selecionada == 'Todas as Áreas':
-        return df_todas_areas.copy()
+        return df_todas_areas.copy(deep=False)
     else:
-        return areas_data[area_selecionada].copy()
+        return areas_data[area_selecionada].copy(deep=False)
 
 
 def prepare_dataframe(df):
@@ -111,22 +362,16 @@ def prepare_dataframe(df):
         df: DataFrame a ser preparado
         
     Returns:
-        DataFrame preparado
+        DataFrame preparado (cópia rasa: os dados de df não são alterados)
     """
-    df = df.copy()
+    df = df.copy(deep=False)
     
-    # Procurar a coluna de Editais AA (pode ser 'Editais AA' ou 'EDITAIS_AA' ou outra variação)
-    editais_col = None
-    for col in df.columns:
-        if col.upper().replace(' ', '') == 'EDITAISAA':
-            editais_col = col
-            break
-    
-    if editais_col is not None:
-        # Classificar programas com/sem AA
-        df['Status AA'] = df[editais_col].apply(
-            lambda x: 'Com Editais AA' if str(x).upper() == 'SIM' else 'Sem Editais AA'
-        )
+    if 'Editais AA' in df.columns and 'Status AA' not in df.columns:
+        # DataFrame que não passou pela ingestão: classificar programas
+        # com/sem AA pela flag canônica
+        if COLUNA_TEM_EDITAIS not in df.columns:
+            df[COLUNA_TEM_EDITAIS] = editais_flag(df['Editais AA'])
+        df['Status AA'] = status_aa(df[COLUNA_TEM_EDITAIS])
     
     return df
 
@@ -143,7 +388,7 @@ def get_available_columns(df, column_type='all'):
         list: lista de nomes de colunas
     """
     if column_type == 'categorical':
-        return df.select_dtypes(include=['object']).columns.tolist()
+        return df.select_dtypes(include=['object', 'category']).columns.tolist()
     elif column_type == 'numerical':
         return df.select_dtypes(include=['number']).columns.tolist()
     else:
@@ -160,104 +405,71 @@ def validate_dataframe(df):
     Returns:
         tuple: (is_valid, list_of_missing_columns)
     """
-    required_columns = [
-        'Nome do Programa',
-        'Sigla da IES',
-        'UF',
-        'Região',
-        'NOTA',
-        'Editais AA'
-    ]
-    
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = missing_fields(df, CAMPOS_OBRIGATORIOS)
     is_valid = len(missing_columns) == 0
     
     return is_valid, missing_columns
 
 
-def get_summary_stats(df):
+def get_summary_stats(cubo):
     """
     Calcula estatísticas resumidas dos dados
     
     Args:
-        df: DataFrame com dados
+        cubo: cubo pré-agregado (ou a fatia da seleção atual)
         
     Returns:
         dict: dicionário com estatísticas
     """
+    medidas = total(cubo)
     stats = {
-        'total_programas': len(df),
-        'com_aa': 0,
-        'sem_aa': 0,
+        'total_programas': int(medidas['Programas']),
+        'com_aa': int(medidas['Com AA']),
+        'sem_aa': int(medidas['Programas'] - medidas['Com AA']),
         'percentual_aa': 0.0,
-        'total_vagas': 0,
-        'total_vagas_aa': 0,
-        'areas_unicas': 0,
-        'regioes_unicas': 0,
-        'ufs_unicas': 0
+        'total_vagas': int(medidas['Qnt Vagas Totais']),
+        'total_vagas_aa': int(medidas['Vagas Totais AA']),
+        'areas_unicas': cubo['Área'].nunique(),
+        'regioes_unicas': cubo['Região'].nunique(),
+        'ufs_unicas': cubo['UF'].nunique()
     }
     
-    if len(df) > 0:
-        # Programas com/sem AA - procurar coluna de Editais AA
-        editais_col = None
-        for col in df.columns:
-            if col.upper().replace(' ', '') == 'EDITAISAA':
-                editais_col = col
-                break
-        
-        if editais_col is not None:
-            stats['com_aa'] = df[editais_col].str.upper().eq('SIM').sum()
-            stats['sem_aa'] = stats['total_programas'] - stats['com_aa']
-            stats['percentual_aa'] = (stats['com_aa'] / stats['total_programas'] * 100) if stats['total_programas'] > 0 else 0
-        
-        # Vagas
-        if 'Qnt. Vagas Totais' in df.columns:
-            stats['total_vagas'] = int(pd.to_numeric(df['Qnt. Vagas Totais'], errors='coerce').fillna(0).sum())
-        
-        if 'Vagas Totais AA' in df.columns:
-            stats['total_vagas_aa'] = int(pd.to_numeric(df['Vagas Totais AA'], errors='coerce').fillna(0).sum())
-        
-        # Diversidade
-        if 'Área' in df.columns:
-            stats['areas_unicas'] = df['Área'].nunique()
-        
-        if 'Região' in df.columns:
-            stats['regioes_unicas'] = df['Região'].nunique()
-        
-        if 'UF' in df.columns:
-            stats['ufs_unicas'] = df['UF'].nunique()
+    if stats['total_programas'] > 0:
+        stats['percentual_aa'] = stats['com_aa'] / stats['total_programas'] * 100
     
     return stats
 
 
-def initialize_session_state():
+def count_values(serie):
     """
-    Inicializa variáveis de estado da sessão para persistência de dados
-    """
-    if 'data_loaded' not in st.session_state:
-        st.session_state.data_loaded = False
-    
-    if 'areas_data' not in st.session_state:
-        st.session_state.areas_data = {}
+    Conta os valores de uma coluna, como value_counts
     
-    if 'df_todas_areas' not in st.session_state:
-        st.session_state.df_todas_areas = pd.DataFrame()
+    Em colunas category o value_counts lista também as categorias sem
+    nenhum programa na seleção; aqui elas são descartadas.
     
-    if 'lista_areas' not in st.session_state:
-        st.session_state.lista_areas = []
-    
-    if 'area_selecionada' not in st.session_state:
-        st.session_state.area_selecionada = 'Todas as Áreas'
+    Args:
+        serie: Series a contar
+        
+    Returns:
+        Series com as contagens, em ordem decrescente
+    """
+    contagens = serie.value_counts()
+    return contagens[contagens > 0]
 
 
-def load_data_into_session():
-    """
-    Carrega dados na sessão (deve ser chamado uma vez no início)
+def get_group_vacancies(df, nome_grupo):
     """
-    if not st.session_state.data_loaded:
-        areas_data, df_todas_areas, lista_areas = load_all_areas()
+    Soma as vagas de um grupo social (reserva agregada + por grupo/exclusiva)
+    
+    Args:
+        df: DataFrame com dados
+        nome_grupo: nome do grupo (chave de GRUPOS_SOCIAIS)
         
-        st.session_state.areas_data = areas_data
-        st.session_state.df_todas_areas = df_todas_areas
-        st.session_state.lista_areas = lista_areas
-        st.session_state.data_loaded = True
+    Returns:
+        int: total de vagas do grupo (0 se a área não informa vagas por grupo)
+    """
+    total = 0
+    for coluna in VAGAS_GRUPOS[nome_grupo]:
+        if coluna in df.columns:
+            total += int(df[coluna].sum())
+    return total
@@ -0,0 +1,168 @@
+"""
+Índice de bitmaps para os filtros globais
+
+Para cada dimensão filtrável o índice guarda um bitmap de linhas (bits
+empacotados, 1 bit por programa) por valor distinto. Um filtro é a união
+(OR) dos bitmaps dos valores selecionados de cada dimensão, e as dimensões
+se combinam por interseção (AND); só a seleção final vira DataFrame.
+
+Junto com os bitmaps, o índice guarda a tabela de co-ocorrência: as
+combinações distintas dos valores das dimensões, com o número de programas
+de cada uma. As opções válidas de um filtro dada a seleção das outras
+dimensões, e quantos programas cada opção traria, saem dessa tabela em
+tempo proporcional ao número de combinações, sem percorrer as linhas.
+"""
+import numpy as np
+import pandas as pd
+
+# Dimensões indexadas (as ausentes do DataFrame ficam fora do índice)
+DIMENSOES_FILTRO = ['Área', 'Região', 'UF', 'NOTA', 'Tipo de IES', 'Modalidade de Ensino', 'Status AA', 'Sigla da IES']
+
+
+def build_filter_index(df, dimensoes=DIMENSOES_FILTRO):
+    """
+    Monta o índice de bitmaps de um DataFrame
+
+    Args:
+        df: DataFrame a indexar (as posições das linhas são as do índice)
+        dimensoes: colunas a indexar
+
+    Returns:
+        dict com 'linhas' (número de linhas), 'dimensoes':
+            {dimensão: {'valores': lista ordenada dos valores presentes,
+            'posicao': {valor: i}, 'bitmaps': ndarray uint8 (valores x bytes)}}
+            e 'coocorrencia': {'codigos': {dimensão: ndarray com a posição do
+            valor em cada combinação (-1 = vazio)}, 'programas': ndarray}
+    """
+    n = len(df)
+    indice = {'linhas': n, 'dimensoes': {}}
+    todos_codigos = {}
+    for dimensao in dimensoes:
+        if dimensao not in df.columns:
+            continue
+        codigos, valores = pd.factorize(df[dimensao], sort=True)
+        valores = np.asarray(valores).tolist()
+        bitmaps = np.empty((len(valores), (n + 7) // 8), dtype=np.uint8)
+        for i in range(len(valores)):
+            bitmaps[i] = np.packbits(codigos == i)
+        indice['dimensoes'][dimensao] = {
+            'valores': valores,
+            'posicao': {valor: i for i, valor in enumerate(valores)},
+            'bitmaps': bitmaps
+        }
+        todos_codigos[dimensao] = codigos.astype(np.int32)
+    indice['coocorrencia'] = _build_cooccurrence(todos_codigos, n)
+    return indice
+
+
+def _build_cooccurrence(todos_codigos, n):
+    # Combinações distintas dos códigos das dimensões e programas de cada uma
+    if not todos_codigos:
+        return {'codigos': {}, 'programas': np.array([n], dtype=np.int64)}
+    matriz = np.column_stack(list(todos_codigos.values()))
+    combinacoes, programas = np.unique(matriz, axis=0, return_counts=True)
+    return {
+        'codigos': {dimensao: np.ascontiguousarray(combinacoes[:, i]) for i, dimensao in enumerate(todos_codigos)},
+        'programas': programas.astype(np.int64)
+    }
+
+
+def option_counts(indice, dimensao, selecao=None):
+    """
+    Programas de cada valor de uma dimensão, dada a seleção das outras
+
+    A seleção da própria dimensão é ignorada: as contagens dizem quantos
+    programas cada valor traria se fosse escolhido junto com os filtros das
+    demais dimensões. Valores sem programas ficam de fora.
+
+    Args:
+        indice: índice de build_filter_index
+        dimensao: nome da dimensão
+        selecao: dict opcional {dimensão: valores}; listas vazias não filtram
+
+    Returns:
+        dict: {valor: programas}, em ordem crescente de valor (vazio se a
+            dimensão não estiver no índice)
+    """
+    if dimensao not in indice['dimensoes']:
+        return {}
+    coocorrencia = indice['coocorrencia']
+    manter = np.ones(len(coocorrencia['programas']), dtype=bool)
+    for outra, valores in (selecao or {}).items():
+        if outra == dimensao or not valores or outra not in indice['dimensoes']:
+            continue
+        posicao = indice['dimensoes'][outra]['posicao']
+        codigos = [posicao[valor] for valor in valores if valor in posicao]
+        manter &= np.isin(coocorrencia['codigos'][outra], codigos)
+
+    codigos = coocorrencia['codigos'][dimensao]
+    manter &= codigos >= 0
+    valores = indice['dimensoes'][dimensao]['valores']
+    contagem = np.bincount(codigos[manter], weights=coocorrencia['programas'][manter], minlength=len(valores))
+    return {valor: int(programas) for valor, programas in zip(valores, contagem) if programas > 0}
+
+
+def filter_options(indice, dimensao, selecao=None):
+    """
+    Valores de uma dimensão com programas, em ordem crescente
+
+    Args:
+        indice: índice de build_filter_index
+        dimensao: nome da dimensão
+        selecao: dict opcional {dimensão: valores}; se informado, só entram
+            os valores que têm programas junto com a seleção das outras
+            dimensões (ver option_counts)
+
+    Returns:
+        list: valores (vazia se a dimensão não estiver no índice)
+    """
+    if not selecao:
+        return indice['dimensoes'].get(dimensao, {}).get('valores', [])
+    return list(option_counts(indice, dimensao, selecao))
+
+
+def selection_bitmap(indice, selecao):
+    """
+    Bitmap empacotado das linhas que atendem à seleção
+
+    Args:
+        indice: índice de build_filter_index
+        selecao: dict {dimensão: lista de valores}; listas vazias não filtram
+
+    Returns:
+        ndarray uint8 (1 bit por linha), ou None se nenhuma dimensão filtrar
+    """
+    resultado = None
+    for dimensao, valores in selecao.items():
+        if not valores or dimensao not in indice['dimensoes']:
+            continue
+        entrada = indice['dimensoes'][dimensao]
+        linhas = [entrada['posicao'][valor] for valor in valores if valor in entrada['posicao']]
+        if linhas:
+            uniao = np.bitwise_or.reduce(entrada['bitmaps'][linhas], axis=0)
+        else:
+            uniao = np.zeros((indice['linhas'] + 7) // 8, dtype=np.uint8)
+        resultado = uniao if resultado is None else resultado & uniao
+    return resultado
+
+
+def select_rows(indice, selecao):
+    """
+    Posições das linhas que atendem à seleção
+
+    Valores selecionados que não existem no índice não casam com nenhuma
+    linha, como no isin; dimensões fora do índice (colunas ausentes do
+    DataFrame) são ignoradas.
+
+    Args:
+        indice: índice de build_filter_index
+        selecao: dict {dimensão: lista de valores}; listas vazias não filtram
+
+    Returns:
+        ndarray com as posições selecionadas, ou None se nenhuma dimensão
+            filtrar
+    """
+    bitmap = selection_bitmap(indice, selecao)
+    if bitmap is None:
+        return None
+    return np.flatnonzero(np.unpackbits(bitmap, count=indice['linhas']))
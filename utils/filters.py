@@ -1,48 +1,368 @@
 """
 Sistema de filtros compartilhado para todas as páginas
 """
+import dataclasses
+from urllib.parse import parse_qs, urlencode
+
 import streamlit as st
 import pandas as pd
 from config import GRUPOS_SOCIAIS, ORDEM_NOTAS
+from utils.cache import memoize, fingerprint
+from utils.filter_index import build_filter_index, filter_options, option_counts, select_rows, selection_bitmap
+
+TODAS_AREAS = 'Todas as Áreas'
+
+# Opção do filtro de status -> valores de 'Status AA'
+STATUS_AA_FILTRO = {
+    'Todos': [],
+    'Com AA': ['Com Editais AA'],
+    'Sem AA': ['Sem Editais AA']
+}
+
+# Campos de lista do FilterSpec: (dimensão, parâmetro na URL)
+CAMPOS_FILTRO = {
+    'areas': ('Área', 'areas'),
+    'regioes': ('Região', 'regiao'),
+    'ufs': ('UF', 'uf'),
+    'ies': ('Sigla da IES', 'ies'),
+    'notas': ('NOTA', 'nota'),
+    'tipos_ies': ('Tipo de IES', 'tipo_ies'),
+    'modalidades': ('Modalidade de Ensino', 'modalidade')
+}
+
+# Chaves dos widgets de cada campo: filtros globais da sidebar e filtros do Comparador
+CHAVES_SIDEBAR = {
+    'regioes': 'regiao_filter',
+    'ufs': 'uf_filter',
+    'notas': 'nota_filter',
+    'tipos_ies': 'tipo_ies_filter',
+    'modalidades': 'modalidade_filter'
+}
+CHAVES_COMPARADOR = {campo: f'comparador_{campo}' for campo in ['areas', 'regioes', 'ufs', 'ies', 'notas']}
+
+
+@dataclasses.dataclass(frozen=True)
+class FilterSpec:
+    """
+    Área e filtros de uma visão, de forma declarativa
+    
+    Imutável e hashable (serve como chave de cache): as listas viram tuplas
+    ordenadas de textos, então a mesma seleção em outra ordem gera o mesmo
+    spec. Converte-se de/para os parâmetros da URL (st.query_params) e de/para
+    texto de query string, usado pelos scripts de exportação.
+    
+    Attributes:
+        area: área do seletor ou TODAS_AREAS
+        areas: áreas escolhidas dentro de 'Todas as Áreas' (Comparador)
+        regioes, ufs, ies, notas, tipos_ies, modalidades: valores aceitos
+            de cada dimensão (vazio = sem filtro)
+        status_aa: opção de STATUS_AA_FILTRO
+    """
+    area: str = TODAS_AREAS
+    areas: tuple = ()
+    regioes: tuple = ()
+    ufs: tuple = ()
+    ies: tuple = ()
+    notas: tuple = ()
+    tipos_ies: tuple = ()
+    modalidades: tuple = ()
+    status_aa: str = 'Todos'
+    
+    def __post_init__(self):
+        for campo in CAMPOS_FILTRO:
+            valores = getattr(self, campo) or ()
+            if isinstance(valores, str):
+                valores = (valores,)
+            object.__setattr__(self, campo, tuple(sorted({str(valor) for valor in valores})))
+        if self.status_aa not in STATUS_AA_FILTRO:
+            raise ValueError(f"Status de AA inválido: {self.status_aa!r}")
+    
+    @property
+    def active_filters(self):
+        """Quantidade de filtros em uso (a área do seletor não conta)"""
+        return sum(1 for campo in CAMPOS_FILTRO if getattr(self, campo)) + (self.status_aa != 'Todos')
+    
+    def selection(self):
+        """
+        Seleção por dimensão, para select_rows e slice_cube
+        
+        Returns:
+            dict: {dimensão: lista de valores}; listas vazias não filtram
+        """
+        selecao = {dimensao: list(getattr(self, campo)) for campo, (dimensao, _) in CAMPOS_FILTRO.items()}
+        if self.area != TODAS_AREAS:
+            selecao['Área'] = [self.area]
+        selecao['Status AA'] = STATUS_AA_FILTRO[self.status_aa]
+        return selecao
+    
+    def to_query_params(self):
+        """
+        Parâmetros de URL da visão (só os diferentes do padrão)
+        
+        Returns:
+            dict: {parâmetro: texto ou lista de textos}, para st.query_params
+        """
+        parametros = {}
+        if self.area != TODAS_AREAS:
+            parametros['area'] = self.area
+        for campo, (_, nome) in CAMPOS_FILTRO.items():
+            if getattr(self, campo):
+                parametros[nome] = list(getattr(self, campo))
+        if self.status_aa != 'Todos':
+            parametros['status'] = self.status_aa
+        return parametros
+    
+    @classmethod
+    def from_query_params(cls, parametros):
+        """
+        Monta o spec a partir dos parâmetros de URL
+        
+        Parâmetros desconhecidos são ignorados e um status inválido vira
+        'Todos'.
+        
+        Args:
+            parametros: st.query_params ou dict {parâmetro: texto ou lista}
+            
+        Returns:
+            FilterSpec
+        """
+        def valores(nome):
+            if hasattr(parametros, 'get_all'):
+                return parametros.get_all(nome)
+            valor = parametros.get(nome, [])
+            return [valor] if isinstance(valor, str) else list(valor)
+        
+        area = (valores('area') or [TODAS_AREAS])[-1]
+        status = (valores('status') or ['Todos'])[-1]
+        return cls(
+            area=area,
+            status_aa=status if status in STATUS_AA_FILTRO else 'Todos',
+            **{campo: valores(nome) for campo, (_, nome) in CAMPOS_FILTRO.items()}
+        )
+    
+    def to_query_string(self):
+        """Query string da visão ('area=Artes&regiao=Sul&regiao=Sudeste')"""
+        return urlencode(self.to_query_params(), doseq=True)
+    
+    @classmethod
+    def from_query_string(cls, texto):
+        """
+        Monta o spec a partir de uma query string (aceita o '?' inicial ou a URL inteira)
+        
+        Args:
+            texto: query string
+            
+        Returns:
+            FilterSpec
+        """
+        texto = (texto or '').split('?', 1)[-1]
+        return cls.from_query_params(parse_qs(texto))
+    
+    @classmethod
+    def from_session_state(cls, area_selecionada):
+        """
+        Monta o spec a partir dos widgets da sidebar (render_global_filters)
+        
+        Args:
+            area_selecionada: nome da área ou TODAS_AREAS
+            
+        Returns:
+            FilterSpec
+        """
+        return cls(
+            area=area_selecionada,
+            status_aa=st.session_state.get('status_aa_filter') or 'Todos',
+            **{campo: st.session_state.get(chave, []) for campo, chave in CHAVES_SIDEBAR.items()}
+        )
+
+
+def _seed_from_url():
+    # Na primeira execução da sessão, leva os filtros da URL para os widgets
+    if st.session_state.get('_filtros_da_url'):
+        return
+    st.session_state['_filtros_da_url'] = True
+    spec = FilterSpec.from_query_params(st.query_params)
+    st.session_state['area_filter'] = spec.area
+    for chaves in (CHAVES_SIDEBAR, CHAVES_COMPARADOR):
+        for campo, chave in chaves.items():
+            if getattr(spec, campo):
+                st.session_state[chave] = list(getattr(spec, campo))
+    st.session_state['status_aa_filter'] = spec.status_aa
+
+
+def _keep_valid(chave, opcoes):
+    # Descarta do estado do widget valores que não são opções (URL antiga, outra área)
+    if chave in st.session_state:
+        st.session_state[chave] = [valor for valor in st.session_state[chave] if valor in opcoes]
+
+
+def _with_selected(chave, opcoes):
+    # Opções do widget mais os valores já escolhidos que ficaram sem programas
+    # com os outros filtros: continuam selecionados, com contagem (0), e voltam
+    # a ter programas quando o outro filtro é desfeito
+    selecionados = st.session_state.get(chave, [])
+    return opcoes + [valor for valor in selecionados if valor not in opcoes]
+
+
+def _label_with_count(contagens):
+    # Rótulo das opções com o número de programas: 'SUDESTE (412)'
+    return lambda valor: f"{valor} ({contagens.get(valor, 0)})"
+
+
+def _render_sidebar_filter(rotulo, indice, campo, selecao, ordem=None):
+    # Multiselect da sidebar com as opções que têm programas dados os outros filtros
+    dimensao = CAMPOS_FILTRO[campo][0]
+    contagens = option_counts(indice, dimensao, selecao)
+    opcoes = list(contagens) if ordem is None else [valor for valor in ordem if valor in contagens]
+    opcoes = _with_selected(CHAVES_SIDEBAR[campo], opcoes)
+    return st.sidebar.multiselect(
+        rotulo,
+        options=opcoes,
+        format_func=_label_with_count(contagens),
+        key=CHAVES_SIDEBAR[campo]
+    )
+
+
+def sync_query_params(spec):
+    """
+    Atualiza a URL com o spec da visão atual, para que o link a reproduza
+    
+    Args:
+        spec: FilterSpec
+    """
+    if FilterSpec.from_query_params(st.query_params) != spec:
+        st.query_params.from_dict(spec.to_query_params())
 
 
-def find_column(df, pattern):
+def get_filter_spec(area_selecionada):
     """
-    Encontra coluna no DataFrame que corresponde ao padrão (case-insensitive, ignorando espaços)
+    Retorna o FilterSpec da área e dos filtros globais atuais
+    
+    Lê os widgets de render_global_filters no session_state, por isso deve
+    ser chamada depois dele.
+    
+    Args:
+        area_selecionada: nome da área ou TODAS_AREAS
+        
+    Returns:
+        FilterSpec
+    """
+    return FilterSpec.from_session_state(area_selecionada)
+
+
+def apply_filter_spec(df, spec, indice=None):
+    """
+    Aplica um FilterSpec a um DataFrame
+    
+    Usada pelos filtros das páginas e pelas exportações (sem widgets). Com
+    o índice de load_filter_index, as posições e o DataFrame filtrado ficam
+    no cache LRU do processo, pela versão do dataset e pelo spec.
     
     Args:
-        df: DataFrame
-        pattern: padrão a procurar (ex: 'TIPODEIES', 'EDITAISAA')
+        df: DataFrame com dados
+        spec: FilterSpec
+        indice: índice de build_filter_index para as linhas de df (se None,
+            é montado na hora e nada é memorizado)
         
     Returns:
-        str: nome da coluna ou None se não encontrar
+        DataFrame filtrado (cópia rasa se for do cache ou sem filtros)
     """
-    pattern_normalized = pattern.upper().replace(' ', '')
-    for col in df.columns:
-        if col.upper().replace(' ', '') == pattern_normalized:
-            return col
-    return None
+    if spec.active_filters == 0:
+        return df.copy(deep=False)
+    if indice is None:
+        indice = build_filter_index(df)
+    if 'chave' not in indice:
+        return _select(df, indice, spec)[1]
+    _, df_filtrado = memoize(('selecao', *indice['chave'], spec), lambda: _select(df, indice, spec))
+    return df_filtrado.copy(deep=False)
+
+
+def filter_fingerprint(spec, indice):
+    """
+    Impressão digital das linhas selecionadas por um FilterSpec
+    
+    Combina a versão do dataset e a área do índice ('chave') com o bitmap
+    das linhas selecionadas: specs diferentes que selecionam as mesmas
+    linhas têm a mesma impressão. Custa uma operação de bitmap e o hash de
+    uma fração de byte por programa; serve de chave para funções com
+    memoize_function (utils/cache.py).
+    
+    Args:
+        spec: FilterSpec
+        indice: índice de load_filter_index (com 'chave')
+        
+    Returns:
+        str: impressão digital
+    """
+    bitmap = selection_bitmap(indice, spec.selection())
+    return fingerprint(indice['chave'], b'' if bitmap is None else bitmap)
+
+
+def render_cascade_filter(rotulo, indice, campo, valores):
+    """
+    Renderiza um filtro em cascata no corpo da página (Comparador)
+    
+    As opções são os valores com programas junto com os filtros já
+    escolhidos em valores, cada uma com a sua contagem (tabela de
+    co-ocorrência do índice); valores já selecionados que deixaram de ter
+    programas continuam na seleção, com contagem zero.
+    
+    Args:
+        rotulo: texto do widget
+        indice: índice de build_filter_index dos dados da página
+        campo: campo do FilterSpec (chave de CHAVES_COMPARADOR)
+        valores: dict {campo: seleção} dos filtros anteriores; recebe a
+            seleção deste filtro
+        
+    Returns:
+        list: valores selecionados
+    """
+    dimensao = CAMPOS_FILTRO[campo][0]
+    contagens = option_counts(indice, dimensao, FilterSpec(**valores).selection())
+    _keep_valid(CHAVES_COMPARADOR[campo], filter_options(indice, dimensao))
+    opcoes = _with_selected(CHAVES_COMPARADOR[campo], list(contagens))
+    valores[campo] = st.multiselect(
+        rotulo,
+        opcoes,
+        format_func=_label_with_count(contagens),
+        key=CHAVES_COMPARADOR[campo]
+    )
+    return valores[campo]
+
+
+def _select(df, indice, spec):
+    # Posições selecionadas e o DataFrame correspondente, materializado uma vez
+    posicoes = select_rows(indice, spec.selection())
+    return posicoes, df.take(posicoes)
 
 
 def render_area_selector(lista_areas):
     """
     Render seletor de área na sidebar
     
+    Na primeira execução da sessão, a área e os filtros vêm da URL
+    (FilterSpec.from_query_params), se houver.
+    
     Args:
         lista_areas: lista de nomes das áreas
         
     Returns:
         str: área selecionada
     """
+    _seed_from_url()
+    opcoes = [TODAS_AREAS] + lista_areas
+    if st.session_state.get('area_filter') not in opcoes:
+        st.session_state['area_filter'] = TODAS_AREAS
+    
     st.sidebar.header("🎯 Seleção de Área")
     area_selecionada = st.sidebar.selectbox(
         'Selecione a área de análise:',
-        options=['Todas as Áreas'] + lista_areas,
-        index=0
+        options=opcoes,
+        key='area_filter'
     )
     
     # Mostrar info
-    if area_selecionada == 'Todas as Áreas':
+    if area_selecionada == TODAS_AREAS:
         st.sidebar.info(f"📊 Analisando **todas as {len(lista_areas)} áreas**")
     else:
         st.sidebar.success(f"📌 Área: **{area_selecionada}**")
@@ -50,117 +370,93 @@ def render_area_selector(lista_areas):
     return area_selecionada
 
 
-def render_global_filters(df):
+def render_global_filters(df, indice=None):
     """
     Renderiza filtros globais na sidebar
     
+    As opções dos widgets e a seleção de linhas vêm do índice de bitmaps
+    (utils/filter_index.py); o DataFrame filtrado é montado uma única vez,
+    no final. Cada filtro mostra os valores que têm programas junto com os
+    demais filtros, com a contagem ao lado; um valor já selecionado que
+    deixa de ter programas quando outro filtro muda continua selecionado,
+    com contagem zero, em vez de sumir do estado e da URL. Com o índice de
+    load_filter_index, as posições e o DataFrame filtrado ficam no cache LRU
+    do processo, pela versão do dataset e pelo FilterSpec: outra página ou
+    sessão com os mesmos filtros não refaz a seleção. A URL é atualizada com
+    o spec (sync_query_params).
+    
     Args:
         df: DataFrame com dados
+        indice: índice de build_filter_index para as linhas de df (use
+            load_filter_index); se None, é montado na hora e nada é memorizado
         
     Returns:
         tuple: (df_filtrado, filtros_ativos)
     """
+    if indice is None:
+        indice = build_filter_index(df)
+    
+    # Seleção atual dos widgets, sem valores que não existem nos dados da
+    # área (URL antiga, troca de área); as opções de cada filtro dependem dela
+    area_selecionada = st.session_state.get('area_filter', TODAS_AREAS)
+    for campo, chave in CHAVES_SIDEBAR.items():
+        _keep_valid(chave, filter_options(indice, CAMPOS_FILTRO[campo][0]))
+    selecao = FilterSpec.from_session_state(area_selecionada).selection()
+    
     st.sidebar.markdown("---")
     st.sidebar.header("🔍 Filtros")
     
-    filtros_ativos = 0
-    df_filtrado = df.copy()
+    valores = {}
     
     # Filtros Geográficos
     st.sidebar.markdown("### 📍 Localização")
     
     if 'Região' in df.columns:
-        regioes_disponiveis = sorted(df['Região'].dropna().unique().tolist())
-        regioes_selecionadas = st.sidebar.multiselect(
-            "Região:",
-            options=regioes_disponiveis,
-            default=[],
-            key='regiao_filter'
-        )
-        if regioes_selecionadas:
-            df_filtrado = df_filtrado[df_filtrado['Região'].isin(regioes_selecionadas)]
-            filtros_ativos += 1
+        valores['regioes'] = _render_sidebar_filter("Região:", indice, 'regioes', selecao)
     
     if 'UF' in df.columns:
-        ufs_disponiveis = sorted([str(uf) for uf in df['UF'].dropna().unique().tolist()])
-        ufs_selecionadas = st.sidebar.multiselect(
-            "UF:",
-            options=ufs_disponiveis,
-            default=[],
-            key='uf_filter'
-        )
-        if ufs_selecionadas:
-            df_filtrado = df_filtrado[df_filtrado['UF'].isin(ufs_selecionadas)]
-            filtros_ativos += 1
+        valores['ufs'] = _render_sidebar_filter("UF:", indice, 'ufs', selecao)
     
     # Filtros de Avaliação
     st.sidebar.markdown("### ⭐ Avaliação")
     
     if 'NOTA' in df.columns:
-        notas_existentes = [n for n in ORDEM_NOTAS if n in df['NOTA'].unique()]
-        notas_selecionadas = st.sidebar.multiselect(
-            "Nota CAPES:",
-            options=notas_existentes,
-            default=[],
-            key='nota_filter'
-        )
-        if notas_selecionadas:
-            df_filtrado = df_filtrado[df_filtrado['NOTA'].isin(notas_selecionadas)]
-            filtros_ativos += 1
+        valores['notas'] = _render_sidebar_filter("Nota CAPES:", indice, 'notas', selecao, ordem=ORDEM_NOTAS)
     
     # Filtros Institucionais
     st.sidebar.markdown("### 🏛️ Instituição")
     
-    # Encontrar coluna de Tipo de IES com suporte a múltiplas variações
-    tipo_ies_col = find_column(df, 'TIPODEIES')
-    
-    if tipo_ies_col is not None:
-        tipos_ies = sorted(df[tipo_ies_col].dropna().unique().tolist())
-        tipos_selecionados = st.sidebar.multiselect(
-            "Tipo de IES:",
-            options=tipos_ies,
-            default=[],
-            key='tipo_ies_filter'
-        )
-        if tipos_selecionados:
-            df_filtrado = df_filtrado[df_filtrado[tipo_ies_col].isin(tipos_selecionados)]
-            filtros_ativos += 1
+    if 'Tipo de IES' in df.columns:
+        valores['tipos_ies'] = _render_sidebar_filter("Tipo de IES:", indice, 'tipos_ies', selecao)
     
     if 'Modalidade de Ensino' in df.columns:
-        modalidades = sorted(df['Modalidade de Ensino'].dropna().unique().tolist())
-        modalidades_selecionadas = st.sidebar.multiselect(
-            "Modalidade de Ensino:",
-            options=modalidades,
-            default=[],
-            key='modalidade_filter'
-        )
-        if modalidades_selecionadas:
-            df_filtrado = df_filtrado[df_filtrado['Modalidade de Ensino'].isin(modalidades_selecionadas)]
-            filtros_ativos += 1
+        valores['modalidades'] = _render_sidebar_filter("Modalidade de Ensino:", indice, 'modalidades', selecao)
     
     # Filtros de AA
     st.sidebar.markdown("### 🎯 Ações Afirmativas")
     
-    status_aa_filtro = st.sidebar.radio(
+    contagens_status = option_counts(indice, 'Status AA', selecao)
+    programas_status = {'Todos': sum(contagens_status.values())}
+    for opcao, status in STATUS_AA_FILTRO.items():
+        if status:
+            programas_status[opcao] = sum(contagens_status.get(valor, 0) for valor in status)
+    valores['status_aa'] = st.sidebar.radio(
         "Status:",
-        options=['Todos', 'Com AA', 'Sem AA'],
-        index=0,
+        options=list(STATUS_AA_FILTRO),
+        format_func=_label_with_count(programas_status),
         key='status_aa_filter'
     )
-    if status_aa_filtro == 'Com AA':
-        df_filtrado = df_filtrado[df_filtrado['Status AA'] == 'Com Editais AA']
-        filtros_ativos += 1
-    elif status_aa_filtro == 'Sem AA':
-        df_filtrado = df_filtrado[df_filtrado['Status AA'] == 'Sem Editais AA']
-        filtros_ativos += 1
+    
+    spec = FilterSpec(area=area_selecionada, **valores)
+    sync_query_params(spec)
+    
+    filtros_ativos = spec.active_filters
+    df_filtrado = apply_filter_spec(df, spec, indice)
     
     # Botão limpar filtros
     st.sidebar.markdown("---")
     if st.sidebar.button("🔄 Limpar Todos os Filtros", use_container_width=True):
-        keys_to_clear = [
-            'regiao_filter', 'uf_filter', 'nota_filter',
-            'tipo_ies_filter', 'modalidade_filter', 'status_aa_filter'
-        ]
+        keys_to_clear = list(CHAVES_SIDEBAR.values()) + ['status_aa_filter']
         for key in keys_to_clear:
             if key in st.session_state:
                 del st.session_state[key]
@@ -0,0 +1,257 @@
+"""
+Geometria das UFs para o mapa coroplético, sem acesso à rede
+
+O contorno das UFs fica em arquivos GeoJSON na PASTA_GEOMETRIA, um por
+nível de precisão de NIVEIS_GEOMETRIA (ufs_baixa.geojson...), gerados uma
+vez por gerar_geometria_ufs.py a partir de uma malha de UFs (ex.: a malha
+do IBGE). A simplificação preserva a topologia: as fronteiras entre UFs
+são quebradas em arcos, cada arco é simplificado uma vez só e reaproveitado
+pelas duas UFs que o compartilham, de modo que não surgem buracos nem
+sobreposições entre vizinhas. Cada feature tem id igual à sigla da UF,
+a chave das agregações por UF.
+
+O dashboard usa o nível mais leve (menos pontos e casas decimais no JSON
+enviado ao navegador) e a exportação em PNG, o completo. Cada arquivo é
+lido uma vez por versão (tamanho e data de modificação).
+"""
+import functools
+import math
+from pathlib import Path
+
+import geojson
+
+from config import PASTA_GEOMETRIA, NIVEIS_GEOMETRIA
+
+# Código IBGE da UF -> sigla (malhas que identificam as UFs pelo código)
+CODIGOS_IBGE_UFS = {
+    11: 'RO', 12: 'AC', 13: 'AM', 14: 'RR', 15: 'PA', 16: 'AP', 17: 'TO',
+    21: 'MA', 22: 'PI', 23: 'CE', 24: 'RN', 25: 'PB', 26: 'PE', 27: 'AL', 28: 'SE', 29: 'BA',
+    31: 'MG', 32: 'ES', 33: 'RJ', 35: 'SP',
+    41: 'PR', 42: 'SC', 43: 'RS',
+    50: 'MS', 51: 'MT', 52: 'GO', 53: 'DF'
+}
+
+# Casas decimais usadas para reconhecer o mesmo vértice em UFs vizinhas
+CASAS_VERTICES = 7
+
+
+def geometry_path(nivel):
+    """
+    Caminho do GeoJSON de um nível de precisão
+
+    Args:
+        nivel: chave de NIVEIS_GEOMETRIA
+
+    Returns:
+        Path
+    """
+    return Path(PASTA_GEOMETRIA) / f'ufs_{nivel}.geojson'
+
+
+def _polygons(geometria):
+    # Polígonos (listas de anéis) de um Polygon ou MultiPolygon
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    if geometria['type'] == 'MultiPolygon':
+        return list(geometria['coordinates'])
+    return []
+
+
+def _ring_area(anel):
+    # Área (em graus²) de um anel pela fórmula do laço
+    return abs(sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(anel, anel[1:]))) / 2
+
+
+def _douglas_peucker(pontos, tolerancia):
+    # Simplifica uma linha mantendo as pontas (versão iterativa)
+    if len(pontos) < 3 or tolerancia <= 0:
+        return list(pontos)
+    manter = [False] * len(pontos)
+    manter[0] = manter[-1] = True
+    pilha = [(0, len(pontos) - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        (x1, y1), (x2, y2) = pontos[inicio], pontos[fim]
+        dx, dy = x2 - x1, y2 - y1
+        comprimento = math.hypot(dx, dy)
+        maior, indice = -1.0, None
+        for i in range(inicio + 1, fim):
+            x, y = pontos[i]
+            if comprimento == 0:
+                distancia = math.hypot(x - x1, y - y1)
+            else:
+                distancia = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / comprimento
+            if distancia > maior:
+                maior, indice = distancia, i
+        if indice is not None and maior > tolerancia:
+            manter[indice] = True
+            pilha.extend([(inicio, indice), (indice, fim)])
+    return [ponto for ponto, mantido in zip(pontos, manter) if mantido]
+
+
+def simplify_topology(colecao, tolerancia, casas):
+    """
+    Simplifica os polígonos de uma FeatureCollection preservando a topologia
+
+    Vértices com mais de dois vizinhos (onde três UFs ou UF e litoral se
+    encontram) dividem os anéis em arcos; cada arco é simplificado por
+    Douglas-Peucker uma única vez, e as UFs que o compartilham recebem os
+    mesmos pontos. Anéis que se reduzem a menos de três pontos são
+    descartados (ilhas pequenas), mas cada feature mantém ao menos o seu
+    maior polígono.
+
+    Args:
+        colecao: FeatureCollection (dict GeoJSON) com Polygon/MultiPolygon
+        tolerancia: distância máxima (graus) entre a linha original e a
+            simplificada; 0 só arredonda
+        casas: casas decimais das coordenadas
+
+    Returns:
+        geojson.FeatureCollection com as mesmas features (id e properties)
+    """
+    # Anéis como listas de vértices (sem repetir o primeiro no fim)
+    aneis = []
+    for feature in colecao['features']:
+        poligonos = []
+        for poligono in _polygons(feature['geometry']):
+            poligonos.append([
+                [(round(x, CASAS_VERTICES), round(y, CASAS_VERTICES)) for x, y, *_ in anel[:-1]]
+                for anel in poligono
+            ])
+        aneis.append(poligonos)
+
+    vizinhos = {}
+    for poligonos in aneis:
+        for poligono in poligonos:
+            for anel in poligono:
+                for i, ponto in enumerate(anel):
+                    vizinhos.setdefault(ponto, set()).update((anel[i - 1], anel[(i + 1) % len(anel)]))
+    juncoes = {ponto for ponto, pontos in vizinhos.items() if len(pontos) > 2}
+
+    arcos = {}
+
+    def simplificar_arco(arco):
+        chave = tuple(arco)
+        if chave not in arcos:
+            simplificado = [
+                (round(x, casas), round(y, casas)) for x, y in _douglas_peucker(arco, tolerancia)
+            ]
+            arcos[chave] = simplificado
+            arcos[chave[::-1]] = simplificado[::-1]
+        return arcos[chave]
+
+    def simplificar_anel(anel):
+        cortes = [i for i, ponto in enumerate(anel) if ponto in juncoes]
+        if not cortes:
+            # Anel sem junções (ilha ou enclave, como o DF e o buraco de GO):
+            # um arco fechado a partir do menor vértice, o mesmo nos dois lados
+            inicio = anel.index(min(anel))
+            pontos = simplificar_arco(anel[inicio:] + anel[:inicio + 1])
+        else:
+            girado = anel[cortes[0]:] + anel[:cortes[0]] + [anel[cortes[0]]]
+            posicoes = [i - cortes[0] for i in cortes] + [len(anel)]
+            pontos = []
+            for inicio, fim in zip(posicoes, posicoes[1:]):
+                arco = simplificar_arco(girado[inicio:fim + 1])
+                pontos.extend(arco[1:] if pontos else arco)
+        # Pontos repetidos em sequência (arredondamento) saem
+        limpos = [ponto for i, ponto in enumerate(pontos) if i == 0 or ponto != pontos[i - 1]]
+        return [list(ponto) for ponto in limpos] if len(limpos) >= 4 else None
+
+    features = []
+    for feature, poligonos in zip(colecao['features'], aneis):
+        novos = []
+        for poligono in poligonos:
+            externo = simplificar_anel(poligono[0])
+            if externo is not None:
+                internos = [anel for anel in map(simplificar_anel, poligono[1:]) if anel is not None]
+                novos.append([externo, *internos])
+        if not novos and poligonos:
+            maior = max(poligonos, key=lambda poligono: _ring_area(poligono[0] + poligono[0][:1]))
+            externo = [[round(x, casas), round(y, casas)] for x, y in maior[0] + maior[0][:1]]
+            novos = [[externo]]
+        geometria = geojson.Polygon(novos[0]) if len(novos) == 1 else geojson.MultiPolygon(novos)
+        features.append(geojson.Feature(
+            id=feature.get('id'), geometry=geometria, properties=feature.get('properties') or {}
+        ))
+    return geojson.FeatureCollection(features)
+
+
+def geometry_version(nivel):
+    """
+    Assinatura do arquivo de geometria de um nível (muda quando é regravado)
+
+    Args:
+        nivel: chave de NIVEIS_GEOMETRIA
+
+    Returns:
+        tuple (tamanho, mtime_ns) ou None se o arquivo não existir
+    """
+    caminho = geometry_path(nivel)
+    if nivel not in NIVEIS_GEOMETRIA or not caminho.is_file():
+        return None
+    estado = caminho.stat()
+    return estado.st_size, estado.st_mtime_ns
+
+
+# A assinatura do arquivo entra na chave dos caches: só leituras bem-sucedidas
+# ficam guardadas, e gerar ou regravar os arquivos com o servidor no ar vale
+# já na próxima chamada (a entrada antiga sai pelo maxsize)
+@functools.lru_cache(maxsize=len(NIVEIS_GEOMETRIA))
+def _read_geometry(nivel, versao):
+    with open(geometry_path(nivel), encoding='utf-8') as arquivo:
+        return geojson.load(arquivo)
+
+
+def load_uf_geometry(nivel):
+    """
+    Lê o GeoJSON das UFs de um nível de precisão (uma vez por versão do arquivo)
+
+    Args:
+        nivel: chave de NIVEIS_GEOMETRIA
+
+    Returns:
+        geojson.FeatureCollection ou None se o arquivo não existir
+    """
+    versao = geometry_version(nivel)
+    if versao is None:
+        return None
+    return _read_geometry(nivel, versao)
+
+
+@functools.lru_cache(maxsize=len(NIVEIS_GEOMETRIA))
+def _outlines(nivel, versao):
+    contornos = []
+    for feature in _read_geometry(nivel, versao)['features']:
+        longitudes, latitudes, area = [], [], 0.0
+        for poligono in _polygons(feature['geometry']):
+            externo = poligono[0]
+            area += _ring_area(externo)
+            if longitudes:
+                longitudes.append(None)
+                latitudes.append(None)
+            longitudes.extend(x for x, y in externo)
+            latitudes.extend(y for x, y in externo)
+        contornos.append((area, str(feature['id']), tuple(longitudes), tuple(latitudes)))
+    contornos.sort(key=lambda contorno: contorno[0], reverse=True)
+    return tuple(contorno[1:] for contorno in contornos)
+
+
+def uf_outlines(nivel):
+    """
+    Contornos externos de cada UF, prontos para um traço com fill='toself'
+
+    Os polígonos de uma UF vêm separados por None; as UFs estão da maior
+    para a menor, para que as menores (ex.: DF, dentro de GO) sejam
+    desenhadas por cima.
+
+    Args:
+        nivel: chave de NIVEIS_GEOMETRIA
+
+    Returns:
+        tuple de (sigla, longitudes, latitudes) ou None se não houver geometria
+    """
+    versao = geometry_version(nivel)
+    if versao is None:
+        return None
+    return _outlines(nivel, versao)
@@ -0,0 +1,150 @@
+"""
+Valores canônicos das colunas SIM/NÃO e de códigos, calculados na ingestão
+
+As células foram digitadas à mão ('SIM ', 'sim', 'NÃO', 'SIM\\n'...). Na
+ingestão (utils/workbook.py) cada coluna é limpa uma vez, sobre os seus
+valores distintos, e vira o tipo que o resto do código consome:
+
+- colunas SIM/NÃO (COLUNAS_SIM_NAO) -> boolean, NA quando vazias/inválidas
+- 'Editais AA' -> COLUNA_TEM_EDITAIS (boolean) e 'Status AA' (category)
+- 'Tipo de IES' -> COLUNA_CLASSE_IES (category Pública/Privada/Inválido)
+
+Os valores canônicos vão para o snapshot; páginas, gráficos e exportações
+usam as flags e as máscaras de validade (valid_mask) direto, sem refazer
+strip/upper a cada rerun.
+"""
+import numpy as np
+import pandas as pd
+
+from config import (
+    COLUNAS_SIM_NAO, COLUNA_TEM_EDITAIS, COLUNA_CLASSE_IES, CLASSES_IES, CLASSE_IES_INVALIDA, STATUS_AA
+)
+
+# Texto limpo -> valor canônico
+VALORES_SIM_NAO = {'SIM': True, 'NAO': False, 'NÃO': False}
+
+
+def _map_unique(serie, funcao):
+    # Aplica funcao uma vez por valor distinto e espalha o resultado pelas linhas
+    codigos, unicos = pd.factorize(serie.astype(object), use_na_sentinel=True)
+    mapeados = pd.Series([funcao(valor) for valor in unicos], dtype=object)
+    valores = mapeados.reindex(codigos).to_numpy()
+    return pd.Series(valores, index=serie.index, dtype=object)
+
+
+def clean_code(serie):
+    """
+    Padroniza uma coluna de códigos: sem espaços nas pontas e em maiúsculas
+
+    Args:
+        serie: Series com os textos da planilha
+
+    Returns:
+        Series de textos ('' para células vazias)
+    """
+    return _map_unique(serie, lambda valor: str(valor).strip().upper()).fillna('')
+
+
+def parse_yes_no(serie):
+    """
+    Converte uma coluna SIM/NÃO em booleano anulável
+
+    Args:
+        serie: Series com os textos da planilha (ou já boolean)
+
+    Returns:
+        Series boolean: True para SIM, False para NÃO/NAO, NA para vazios e
+            valores inválidos
+    """
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return serie.astype('boolean')
+    valores = _map_unique(serie, lambda valor: VALORES_SIM_NAO.get(''.join(str(valor).upper().split())))
+    return valores.astype('boolean')
+
+
+def editais_flag(serie):
+    """
+    Flag de 'Editais AA': só SIM/NÃO exatos (após clean_code) são válidos
+
+    Args:
+        serie: Series 'Editais AA'
+
+    Returns:
+        Series boolean: True para SIM, False para NÃO/NAO, NA para os demais
+    """
+    return clean_code(serie).map(VALORES_SIM_NAO).astype('boolean')
+
+
+def classify_ies(serie):
+    """
+    Classifica o tipo da IES em Pública, Privada ou Inválido
+
+    Args:
+        serie: Series 'Tipo de IES' já padronizada (clean_code)
+
+    Returns:
+        Series category com as categorias de CLASSES_IES e CLASSE_IES_INVALIDA
+    """
+    categorias = [*CLASSES_IES.values(), CLASSE_IES_INVALIDA]
+    return pd.Series(pd.Categorical(
+        serie.map(CLASSES_IES).fillna(CLASSE_IES_INVALIDA), categories=categorias
+    ), index=serie.index)
+
+
+def status_aa(tem_editais):
+    """
+    'Status AA' a partir da flag de editais (vazios contam como sem editais)
+
+    Args:
+        tem_editais: Series boolean COLUNA_TEM_EDITAIS
+
+    Returns:
+        Series category com as categorias de STATUS_AA
+    """
+    com_aa = tem_editais.fillna(False).to_numpy(dtype=bool)
+    return pd.Series(pd.Categorical.from_codes((~com_aa).astype('int8'), categories=STATUS_AA), index=tem_editais.index)
+
+
+def normalize_values(df):
+    """
+    Calcula os valores canônicos de uma aba
+
+    Args:
+        df: DataFrame de uma aba com os nomes canônicos de colunas (alterado no lugar)
+
+    Returns:
+        DataFrame: o mesmo df, com as colunas SIM/NÃO como boolean e as
+            colunas COLUNA_TEM_EDITAIS, 'Status AA' e COLUNA_CLASSE_IES
+    """
+    for coluna in COLUNAS_SIM_NAO:
+        if coluna in df.columns:
+            df[coluna] = parse_yes_no(df[coluna])
+
+    if 'Editais AA' in df.columns:
+        df['Editais AA'] = clean_code(df['Editais AA'])
+        df[COLUNA_TEM_EDITAIS] = editais_flag(df['Editais AA'])
+        df['Status AA'] = status_aa(df[COLUNA_TEM_EDITAIS])
+
+    if 'Tipo de IES' in df.columns:
+        df['Tipo de IES'] = clean_code(df['Tipo de IES'])
+        df[COLUNA_CLASSE_IES] = classify_ies(df['Tipo de IES'])
+    return df
+
+
+def valid_mask(df, coluna):
+    """
+    Indica as linhas com valor válido numa coluna canônica
+
+    Args:
+        df: DataFrame carregado
+        coluna: COLUNA_CLASSE_IES ou uma coluna boolean (COLUNA_TEM_EDITAIS,
+            COLUNAS_SIM_NAO)
+
+    Returns:
+        ndarray bool (tudo False se a coluna não existir)
+    """
+    if coluna not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    if coluna == COLUNA_CLASSE_IES:
+        return (df[coluna] != CLASSE_IES_INVALIDA).to_numpy(dtype=bool)
+    return df[coluna].notna().to_numpy(dtype=bool)
@@ -0,0 +1,117 @@
+"""
+Áreas como faixas contíguas de um único DataFrame
+
+O dataset fica num só DataFrame com as linhas de cada área em sequência,
+na ordem das abas. Cada área é uma faixa (início, fim) de linhas mais as
+colunas que a sua aba tem; areas_data[area] é uma fatia dessa faixa, sem
+cópia (com copy-on-write, ativado pelos pontos de entrada com
+enable_copy_on_write de utils/data_loader.py, alterações na fatia não
+chegam ao DataFrame inteiro). Percorrer as áreas em ordem é uma
+varredura contínua do DataFrame, e cada linha existe uma vez só.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+class AreaPartition(Mapping):
+    """
+    Mapeamento área -> DataFrame sobre faixas de um DataFrame único
+
+    Args:
+        df: DataFrame com as áreas em faixas contíguas (índice 0..n-1)
+        faixas: dict {área: (início, fim, colunas)}, na ordem das áreas
+    """
+
+    def __init__(self, df, faixas):
+        self._df = df
+        self._faixas = faixas
+
+    @classmethod
+    def from_frames(cls, areas_data):
+        """
+        Junta os DataFrames das áreas num único DataFrame particionado
+
+        Args:
+            areas_data: dict com DataFrames por área, na ordem das abas
+
+        Returns:
+            AreaPartition
+        """
+        faixas = {}
+        inicio = 0
+        for area, df_area in areas_data.items():
+            faixas[area] = (inicio, inicio + len(df_area), list(df_area.columns))
+            inicio += len(df_area)
+        if areas_data:
+            df = pd.concat(areas_data.values(), ignore_index=True)
+        else:
+            df = pd.DataFrame()
+        return cls(df, faixas)
+
+    @property
+    def frame(self):
+        """DataFrame com todas as áreas (cópia rasa)"""
+        return self._df.copy(deep=False)
+
+    def bounds(self, area):
+        """Faixa (início, fim) das linhas da área no DataFrame inteiro"""
+        inicio, fim, _ = self._faixas[area]
+        return inicio, fim
+
+    def columns(self, area):
+        """Colunas que a aba da área tem"""
+        return list(self._faixas[area][2])
+
+    def rows(self, areas):
+        """
+        Posições das linhas das áreas no DataFrame inteiro
+
+        Args:
+            areas: nomes das áreas
+
+        Returns:
+            ndarray de posições, em ordem crescente se as áreas estiverem
+                na ordem da partição
+        """
+        faixas = [np.arange(*self.bounds(area)) for area in areas]
+        return np.concatenate(faixas) if faixas else np.empty(0, dtype=np.intp)
+
+    def realign(self, df, areas=None, vazias=True):
+        """
+        Particiona um DataFrame derivado deste (filtrado ou com colunas novas)
+
+        O índice de df deve conter as posições das linhas no DataFrame
+        particionado, em ordem crescente, como o de df.take(posicoes) ou de
+        uma máscara booleana. As colunas de df que não existiam aqui passam
+        a fazer parte de todas as áreas.
+
+        Args:
+            df: DataFrame derivado
+            areas: áreas a manter, na ordem desejada (None = todas)
+            vazias: se False, áreas sem nenhuma linha em df ficam de fora
+
+        Returns:
+            AreaPartition sobre df com índice 0..len(df)-1
+        """
+        posicoes = df.index.to_numpy()
+        novas = [coluna for coluna in df.columns if coluna not in self._df.columns]
+        faixas = {}
+        for area in (self._faixas if areas is None else areas):
+            inicio, fim, colunas = self._faixas[area]
+            inicio, fim = np.searchsorted(posicoes, [inicio, fim])
+            if vazias or fim > inicio:
+                incluidas = set(colunas) | set(novas)
+                faixas[area] = (int(inicio), int(fim), [coluna for coluna in df.columns if coluna in incluidas])
+        return AreaPartition(df.reset_index(drop=True), faixas)
+
+    def __getitem__(self, area):
+        inicio, fim, colunas = self._faixas[area]
+        return self._df.iloc[inicio:fim][colunas].reset_index(drop=True)
+
+    def __iter__(self):
+        return iter(self._faixas)
+
+    def __len__(self):
+        return len(self._faixas)
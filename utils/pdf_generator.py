@@ -109,7 +109,8 @@ def criar_tabela_distribuicao(df, coluna, titulo):
     if coluna not in df.columns:
         return None
     
-    distribuicao = df[coluna].value_counts().reset_index()
+    distribuicao = df[coluna].value_counts()
+    distribuicao = distribuicao[distribuicao > 0].reset_index()  # categorias sem programas
     distribuicao.columns = [coluna, 'Quantidade']
     distribuicao['Percentual'] = (distribuicao['Quantidade'] / distribuicao['Quantidade'].sum() * 100).round(1)
     distribuicao['Percentual'] = distribuicao['Percentual'].astype(str) + '%'
@@ -0,0 +1,102 @@
+"""
+Chave estável dos programas e índice de chave -> linha
+
+A chave identifica um programa por (Área, Sigla da IES, Nome do Programa),
+e não só pelo nome, que se repete entre IES. É um hash curto dos três
+textos; quando a mesma combinação aparece mais de uma vez na área (vários
+cursos com o mesmo nome na mesma IES), as repetições recebem o sufixo
+'-2', '-3'... na ordem da planilha. A chave não depende da posição da
+linha, então continua válida entre recargas, áreas e sessões.
+"""
+import hashlib
+
+import pandas as pd
+
+from config import COLUNA_CHAVE
+
+# Colunas que compõem a chave (as ausentes contam como vazias)
+CAMPOS_CHAVE = ['Área', 'Sigla da IES', 'Nome do Programa']
+
+
+def build_program_keys(df):
+    """
+    Calcula a chave de cada programa
+
+    Args:
+        df: DataFrame com as colunas de CAMPOS_CHAVE
+
+    Returns:
+        Series de textos (mesmo índice de df)
+    """
+    partes = []
+    for campo in CAMPOS_CHAVE:
+        if campo in df.columns:
+            valores = df[campo].astype(object)
+            partes.append(valores.where(valores.notna(), '').astype(str).str.strip())
+        else:
+            partes.append(pd.Series('', index=df.index))
+    texto = partes[0].str.cat(partes[1:], sep='\x1f')
+
+    chaves = texto.map(lambda t: hashlib.blake2b(t.encode('utf-8'), digest_size=6).hexdigest())
+    repeticao = texto.groupby(texto, sort=False).cumcount()
+    repetidas = repeticao > 0
+    chaves[repetidas] = chaves[repetidas] + '-' + (repeticao[repetidas] + 1).astype(str)
+    return chaves.rename(COLUNA_CHAVE)
+
+
+def build_program_index(df):
+    """
+    Monta o índice de chave -> posição da linha
+
+    Args:
+        df: DataFrame com a coluna COLUNA_CHAVE
+
+    Returns:
+        dict: {chave: posição}
+    """
+    return dict(zip(df[COLUNA_CHAVE], range(len(df))))
+
+
+def lookup_programs(df, indice, chaves):
+    """
+    Linhas dos programas pedidos, na ordem das chaves
+
+    Args:
+        df: DataFrame indexado por indice
+        indice: dict de build_program_index
+        chaves: chaves dos programas (as desconhecidas são ignoradas)
+
+    Returns:
+        DataFrame com uma linha por chave encontrada
+    """
+    return df.take([indice[chave] for chave in chaves if chave in indice])
+
+
+def program_labels(df):
+    """
+    Rótulo de exibição de cada programa: 'NOME — SIGLA (UF)'
+
+    Quando dois programas ficam com o mesmo rótulo, o código do programa é
+    acrescentado para diferenciá-los; se ainda assim se repetirem (o mesmo
+    programa em mais de uma área), a área e, por fim, a chave.
+
+    Args:
+        df: DataFrame com os programas
+
+    Returns:
+        Series de textos (mesmo índice de df)
+    """
+    def coluna(nome):
+        if nome not in df.columns:
+            return pd.Series('', index=df.index)
+        valores = df[nome].astype(object)
+        return valores.where(valores.notna(), '').astype(str)
+
+    rotulos = coluna('Nome do Programa') + ' — ' + coluna('Sigla da IES') + ' (' + coluna('UF') + ')'
+    for extra in ['Código do Programa', 'Área', COLUNA_CHAVE]:
+        repetidos = rotulos.duplicated(keep=False)
+        if not repetidos.any():
+            break
+        if extra in df.columns:
+            rotulos[repetidos] = rotulos[repetidos] + ' · ' + coluna(extra)[repetidos]
+    return rotulos
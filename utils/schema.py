@@ -0,0 +1,138 @@
+"""
+Registro canônico das colunas dos dados brutos
+
+As planilhas de cada área foram preenchidas à mão e o mesmo campo aparece
+com grafias diferentes ('NOTA'/'Nota'/'NOTAS', 'TIPO DE IES', 'AA Trans.',
+'E-mail Área'...). Os nomes são resolvidos uma única vez, na ingestão: cada
+aba tem as colunas renomeadas para o nome canônico, e o resto do código usa
+sempre esses nomes.
+"""
+import re
+import unicodedata
+
+from config import GRUPOS_SOCIAIS, COLUNAS_VAGAS, VAGAS_GRUPOS
+
+# Campos conhecidos, pelo nome canônico
+CAMPOS = [
+    'Nome do Programa', 'Código do Programa', 'Nome da IES', 'Sigla da IES',
+    'UF', 'Cidade', 'Região', 'NOTA', 'Modalidade de Ensino', 'Tipo de IES',
+    'ME', 'DO', 'MP', 'DP', 'Início', 'Site',
+    'Coordenador(a)', 'Coordenador(a) Adjunto(a) PA', 'Coordenador(a) Adjunto(a) PP',
+    'Email da Área', 'Email Institucional',
+    'AA Ficha de Avaliação', 'AA Documento de Área',
+    'Editais AA', 'Ano do Edital', 'Ano da Turma',
+    'AA Agregada', 'AA Por Grupo',
+    *COLUNAS_VAGAS.values(),
+    *GRUPOS_SOCIAIS.values(),
+    *[coluna for colunas in VAGAS_GRUPOS.values() for coluna in colunas],
+    'Link Edital Mestrado', 'Link Edital Doutorado',
+    'Presença de Política Institucional AA', 'Resolução', 'Link Política Institucional AA',
+    'Corpo Docente e Lattes', 'Observações'
+]
+
+# Grafias que não se reduzem ao nome canônico só ignorando caixa, acentos,
+# espaços e pontuação
+VARIANTES = {
+    'NOTA': ['NOTAS'],
+    'Outros grupos': ['outros'],
+    'Email da Área': ['Email Area'],
+    'Corpo Docente e Lattes': ['Corpo Docente Lattes']
+}
+
+# Campos sem os quais uma aba não entra nas análises
+CAMPOS_OBRIGATORIOS = ['Nome do Programa', 'Sigla da IES', 'UF', 'Região', 'NOTA', 'Editais AA']
+
+
+def normalize_key(nome):
+    """
+    Reduz um nome de coluna à forma usada na comparação
+
+    Args:
+        nome: nome da coluna
+
+    Returns:
+        str: nome sem acentos, em maiúsculas e só com letras e dígitos
+    """
+    sem_acentos = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Z0-9]', '', sem_acentos.upper())
+
+
+def _build_index():
+    indice = {}
+    for campo in CAMPOS:
+        for nome in [campo, *VARIANTES.get(campo, [])]:
+            chave = normalize_key(nome)
+            if indice.setdefault(chave, campo) != campo:
+                raise ValueError(f"Variante '{nome}' ambígua entre '{indice[chave]}' e '{campo}'")
+    return indice
+
+
+# Chave normalizada -> nome canônico, montado uma vez na importação
+_INDICE = _build_index()
+
+
+def canonical_name(nome):
+    """
+    Retorna o nome canônico de uma coluna (O(1))
+
+    Args:
+        nome: nome físico ou lógico da coluna
+
+    Returns:
+        str: nome canônico, ou o próprio nome se o campo não for registrado
+    """
+    return _INDICE.get(normalize_key(nome), nome)
+
+
+def canonicalize_columns(df):
+    """
+    Renomeia as colunas de uma aba para os nomes canônicos
+
+    Se duas colunas da mesma aba caírem no mesmo campo, só a primeira é
+    renomeada; a outra mantém o nome original.
+
+    Args:
+        df: DataFrame lido da aba
+
+    Returns:
+        DataFrame com as colunas renomeadas
+    """
+    renomear = {}
+    usados = set(df.columns)
+    for coluna in df.columns:
+        if not isinstance(coluna, str):
+            continue
+        canonico = canonical_name(coluna)
+        if canonico != coluna and canonico not in usados:
+            renomear[coluna] = canonico
+            usados.add(canonico)
+    return df.rename(columns=renomear) if renomear else df
+
+
+def column(df, campo):
+    """
+    Retorna a coluna do DataFrame que corresponde ao campo
+
+    Args:
+        df: DataFrame já canonicalizado
+        campo: nome do campo (canônico ou qualquer variante registrada)
+
+    Returns:
+        str: nome da coluna ou None se o campo não existir no DataFrame
+    """
+    nome = canonical_name(campo)
+    return nome if nome in df.columns else None
+
+
+def missing_fields(df, campos=CAMPOS_OBRIGATORIOS):
+    """
+    Lista os campos ausentes do DataFrame
+
+    Args:
+        df: DataFrame já canonicalizado
+        campos: campos exigidos
+
+    Returns:
+        list: campos (nomes canônicos) que não estão no DataFrame
+    """
+    return [canonical_name(campo) for campo in campos if column(df, campo) is None]
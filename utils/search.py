@@ -0,0 +1,123 @@
+"""
+Busca aproximada de programas por trigramas
+
+Cada programa vira um texto com o nome, a sigla da IES e a UF, normalizado
+sem acentos e em minúsculas ('Química' e 'QUIMICA' casam). O índice
+invertido guarda, para cada trigrama, as posições dos programas que o
+contêm; uma busca soma as listas dos trigramas da consulta e ordena os
+candidatos pela proporção da consulta encontrada e pela semelhança com o
+texto inteiro. Erros de digitação e palavras incompletas ainda casam, e o
+custo depende só dos programas que têm algum trigrama em comum.
+"""
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Colunas que entram no texto de busca (as ausentes são ignoradas)
+CAMPOS_BUSCA = ['Nome do Programa', 'Sigla da IES', 'UF']
+
+
+def normalize_text(texto):
+    """
+    Normaliza um texto para a busca: sem acentos, minúsculo, só letras e números
+
+    Args:
+        texto: texto original
+
+    Returns:
+        str: palavras separadas por um espaço
+    """
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in sem_acentos.lower()).split())
+
+
+def _trigrams(texto):
+    # Trigramas das palavras com dois espaços antes e um depois: consultas
+    # de uma ou duas letras ('sp', 'rj') também geram trigramas
+    trigramas = set()
+    for palavra in texto.split():
+        palavra = f'  {palavra} '
+        trigramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return trigramas
+
+
+def build_search_index(df, campos=CAMPOS_BUSCA):
+    """
+    Monta o índice de trigramas dos programas de um DataFrame
+
+    Args:
+        df: DataFrame a indexar (as posições das linhas são as do índice)
+        campos: colunas que compõem o texto de cada programa
+
+    Returns:
+        dict com 'linhas', 'tamanhos' (trigramas de cada programa) e
+            'postagens' {trigrama: ndarray com as posições dos programas}
+    """
+    partes = []
+    for campo in campos:
+        if campo in df.columns:
+            valores = df[campo].astype(object)
+            # Cada valor distinto é normalizado uma vez
+            normalizados = {valor: normalize_text(valor) for valor in pd.unique(valores.dropna())}
+            partes.append(valores.map(normalizados).fillna('').to_numpy())
+
+    n = len(df)
+    tamanhos = np.zeros(n, dtype=np.int32)
+    postagens = defaultdict(list)
+    for i in range(n):
+        trigramas = _trigrams(' '.join(parte[i] for parte in partes))
+        tamanhos[i] = len(trigramas)
+        for trigrama in trigramas:
+            postagens[trigrama].append(i)
+
+    return {
+        'linhas': n,
+        'tamanhos': tamanhos,
+        'postagens': {trigrama: np.array(posicoes, dtype=np.int32) for trigrama, posicoes in postagens.items()}
+    }
+
+
+def search(indice, consulta, limite=20, linhas=None, minimo=0.5):
+    """
+    Programas mais parecidos com a consulta, do mais para o menos parecido
+
+    A pontuação é a média entre a fração dos trigramas da consulta
+    presentes no programa e o coeficiente de Dice entre os dois conjuntos
+    (que favorece textos curtos e completos).
+
+    Args:
+        indice: índice de build_search_index
+        consulta: texto digitado
+        limite: máximo de resultados
+        linhas: posições permitidas (ex.: select_rows dos filtros); None = todas
+        minimo: fração mínima dos trigramas da consulta que o programa
+            precisa conter; com metade, terminações comuns ('mica', 'cao')
+            sozinhas não bastam, e erros de uma letra ainda casam
+
+    Returns:
+        tuple: (posicoes, pontuacoes) como ndarrays, com no máximo limite itens
+    """
+    vazio = (np.empty(0, dtype=np.int64), np.empty(0))
+    trigramas = _trigrams(normalize_text(consulta))
+    listas = [indice['postagens'][trigrama] for trigrama in trigramas if trigrama in indice['postagens']]
+    if not listas:
+        return vazio
+
+    comuns = np.bincount(np.concatenate(listas), minlength=indice['linhas'])
+    candidatos = np.flatnonzero(comuns)
+    if linhas is not None:
+        candidatos = np.intersect1d(candidatos, linhas, assume_unique=True)
+    cobertura = comuns[candidatos] / len(trigramas)
+    dice = 2 * comuns[candidatos] / (len(trigramas) + indice['tamanhos'][candidatos])
+    pontuacoes = (cobertura + dice) / 2
+
+    manter = cobertura >= minimo
+    candidatos, pontuacoes = candidatos[manter], pontuacoes[manter]
+    if len(candidatos) > limite:
+        melhores = np.argpartition(-pontuacoes, limite - 1)[:limite]
+        candidatos, pontuacoes = candidatos[melhores], pontuacoes[melhores]
+    ordem = np.lexsort((candidatos, -pontuacoes))
+    return candidatos[ordem], pontuacoes[ordem]
@@ -0,0 +1,47 @@
+"""
+Abas e seções que só executam o conteúdo visível
+
+Por padrão o Streamlit roda o corpo de todas as abas e expanders a cada
+rerun, mesmo os que o usuário não está vendo. As funções daqui criam os
+contêineres com estado (key + on_change='rerun'): trocar de aba ou abrir
+uma seção dispara um rerun, e o atributo .open diz se o conteúdo está à
+vista. As páginas usam o padrão
+
+    aba_a, aba_b = lazy_tabs(['A', 'B'], 'pagina_abas')
+    with aba_a:
+        if aba_a.open:
+            ...
+
+e memorizam as agregações da aba (memoize_function + filter_fingerprint),
+de modo que voltar a uma aba já vista com os mesmos filtros não recalcula.
+"""
+import streamlit as st
+
+
+def lazy_tabs(rotulos, chave):
+    """
+    Cria abas em que só a selecionada fica aberta (.open)
+
+    Args:
+        rotulos: títulos das abas
+        chave: chave do estado da aba selecionada (única no app)
+
+    Returns:
+        list: contêineres das abas, na ordem dos rótulos
+    """
+    return st.tabs(rotulos, key=chave, on_change='rerun')
+
+
+def lazy_section(titulo, chave, aberta=False):
+    """
+    Cria uma seção recolhível cujo conteúdo só roda quando aberta (.open)
+
+    Args:
+        titulo: título da seção
+        chave: chave do estado aberto/fechado (única no app)
+        aberta: se a seção começa aberta
+
+    Returns:
+        contêiner do expander
+    """
+    return st.expander(titulo, expanded=aberta, key=chave, on_change='rerun')
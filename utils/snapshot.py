@@ -0,0 +1,528 @@
+"""
+Snapshot colunar (Parquet) dos dados brutos
+
+O primeiro processo que encontra o dados_brutos.xlsx alterado atualiza o
+snapshot, relendo só as abas cujo conteúdo mudou; os demais carregam os
+DataFrames já normalizados direto dos arquivos Parquet, sem passar pelo
+openpyxl.
+
+No modo de memória compartilhada (USAR_MMAP) o snapshot ganha também um
+arquivo Arrow IPC único, mapeado somente leitura por todos os workers.
+"""
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+
+from utils.partition import AreaPartition
+
+# Incrementar sempre que a normalização do loader mudar o formato dos dados
+VERSAO_FORMATO = 6
+
+NOME_MANIFESTO = 'manifesto.json'
+PASTA_PARTES = 'partes'
+CHAVE_METADADOS = 'alteridade.areas'
+
+
+def assinatura_arquivo(caminho):
+    """
+    Retorna a assinatura barata do arquivo (tamanho e mtime)
+
+    Args:
+        caminho: caminho do arquivo
+
+    Returns:
+        tuple: (tamanho_em_bytes, mtime_ns)
+    """
+    info = os.stat(caminho)
+    return info.st_size, info.st_mtime_ns
+
+
+def hash_conteudo(caminho, tamanho_bloco=1 << 20):
+    """
+    Calcula o SHA-256 do conteúdo do arquivo
+
+    Args:
+        caminho: caminho do arquivo
+        tamanho_bloco: bytes lidos por iteração
+
+    Returns:
+        str: hash hexadecimal
+    """
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+_NS_PLANILHA = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_RELACAO = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PACOTE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_RE_SHEET_DATA = re.compile(rb'<sheetData\b.*?(?:</sheetData>|/>)', re.DOTALL)
+_RE_STRING_COMPARTILHADA = re.compile(rb'(<c\b[^>]*\bt="s"[^>]*>)<v>(\d+)</v>')
+_RE_ESTILO = re.compile(rb'(<c\b[^>]*?\bs=")(\d+)(")')
+_RE_SI = re.compile(rb'<si>(.*?)</si>', re.DOTALL)
+
+
+def partes_abas(arquivo_zip):
+    """
+    Mapeia cada aba do workbook para a sua parte XML dentro do pacote
+
+    Args:
+        arquivo_zip: zipfile.ZipFile aberto do .xlsx
+
+    Returns:
+        dict: nome da aba -> caminho da parte XML, na ordem do workbook
+    """
+    relacoes = ElementTree.fromstring(arquivo_zip.read('xl/_rels/workbook.xml.rels'))
+    alvos = {
+        rel.get('Id'): rel.get('Target')
+        for rel in relacoes.iter(f'{_NS_PACOTE}Relationship')
+    }
+    workbook = ElementTree.fromstring(arquivo_zip.read('xl/workbook.xml'))
+    partes = {}
+    for aba in workbook.iter(f'{_NS_PLANILHA}sheet'):
+        alvo = alvos[aba.get(f'{_NS_RELACAO}id')]
+        partes[aba.get('name')] = alvo.lstrip('/') if alvo.startswith('/') else f'xl/{alvo}'
+    return partes
+
+
+def _formatos_estilos(arquivo_zip):
+    # Índice de estilo da célula -> formato numérico, que decide se um número vira data
+    try:
+        estilos = ElementTree.fromstring(arquivo_zip.read('xl/styles.xml'))
+    except KeyError:
+        return []
+    codigos = {
+        fmt.get('numFmtId'): fmt.get('formatCode')
+        for fmt in estilos.iter(f'{_NS_PLANILHA}numFmt')
+    }
+    cell_xfs = estilos.find(f'{_NS_PLANILHA}cellXfs')
+    if cell_xfs is None:
+        return []
+    formatos = []
+    for xf in cell_xfs.findall(f'{_NS_PLANILHA}xf'):
+        id_formato = xf.get('numFmtId', '0')
+        formatos.append(codigos.get(id_formato, id_formato).encode('utf-8'))
+    return formatos
+
+
+def hashes_abas(caminho):
+    """
+    Calcula um hash do conteúdo de cada aba do workbook
+
+    O hash cobre só os dados da aba (sheetData), com as referências à
+    tabela de strings compartilhadas e aos estilos resolvidas para o texto
+    e o formato numérico. Assim, editar uma aba não altera o hash das
+    outras, mesmo que o Excel renumere strings ou estilos ao salvar, e
+    mudanças só visuais (aba ativa, largura de coluna) são ignoradas.
+
+    Args:
+        caminho: caminho do arquivo Excel
+
+    Returns:
+        dict: nome da aba -> hash hexadecimal, na ordem do workbook
+    """
+    with zipfile.ZipFile(caminho) as arquivo_zip:
+        partes = partes_abas(arquivo_zip)
+        formatos = _formatos_estilos(arquivo_zip)
+        try:
+            strings = _RE_SI.findall(arquivo_zip.read('xl/sharedStrings.xml'))
+        except KeyError:
+            strings = []
+
+        def resolver_string(m):
+            return m.group(1) + b'<is>' + strings[int(m.group(2))] + b'</is>'
+
+        def resolver_estilo(m):
+            indice = int(m.group(2))
+            formato = formatos[indice] if indice < len(formatos) else m.group(2)
+            return m.group(1) + formato + m.group(3)
+
+        hashes = {}
+        for nome, parte in partes.items():
+            xml = arquivo_zip.read(parte)
+            dados = _RE_SHEET_DATA.search(xml)
+            dados = dados.group(0) if dados else b''
+            dados = _RE_STRING_COMPARTILHADA.sub(resolver_string, dados)
+            dados = _RE_ESTILO.sub(resolver_estilo, dados)
+            sha = hashlib.sha256(nome.encode('utf-8'))
+            sha.update(b'\0')
+            sha.update(dados)
+            hashes[nome] = sha.hexdigest()
+    return hashes
+
+
+def _codificar_valor(valor):
+    if pd.isna(valor):
+        return None
+    if isinstance(valor, datetime.datetime):
+        return json.dumps({'dt': valor.isoformat()})
+    if isinstance(valor, datetime.time):
+        return json.dumps({'t': valor.isoformat()})
+    if isinstance(valor, (np.integer, np.floating, np.bool_)):
+        valor = valor.item()
+    return json.dumps(valor, ensure_ascii=False)
+
+
+def _decodificar_valor(valor):
+    if not isinstance(valor, str):
+        return np.nan
+    valor = json.loads(valor)
+    if isinstance(valor, dict):
+        if 'dt' in valor:
+            return datetime.datetime.fromisoformat(valor['dt'])
+        return datetime.time.fromisoformat(valor['t'])
+    return valor
+
+
+def colunas_mistas(df):
+    """
+    Lista as colunas object com mais de um tipo de valor
+
+    Planilhas editadas à mão misturam números, datas e textos na mesma
+    coluna (ex.: '.' no meio das vagas), o que o Parquet não aceita.
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        list: nomes das colunas mistas
+    """
+    return [
+        col for col in df.columns
+        if df[col].dtype == object
+        and pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty')
+    ]
+
+
+def _codificar_mistas(df, colunas):
+    # Cada valor vira JSON com o tipo preservado, para voltar idêntico na leitura
+    df = df.copy()
+    for col in colunas:
+        df[col] = df[col].map(_codificar_valor).astype(object)
+    return df
+
+
+def _decodificar_mistas(df, colunas):
+    for col in colunas:
+        df[col] = df[col].map(_decodificar_valor).astype(object)
+    return df
+
+
+def _ler_manifesto(pasta):
+    caminho = Path(pasta) / NOME_MANIFESTO
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if manifesto.get('versao_formato') != VERSAO_FORMATO:
+        return None
+    return manifesto
+
+
+def _gravar_manifesto(pasta, manifesto):
+    # Gravação atômica: leitores concorrentes nunca veem um manifesto pela metade
+    caminho = Path(pasta) / NOME_MANIFESTO
+    temporario = caminho.with_name(f'{NOME_MANIFESTO}.{uuid.uuid4().hex}.tmp')
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def _ler_areas(pasta, manifesto):
+    pasta_partes = Path(pasta) / PASTA_PARTES
+    areas_data = {}
+    for area in manifesto['areas']:
+        df = pd.read_parquet(pasta_partes / area['arquivo'])
+        # O Arrow devolve None nos textos ausentes; o read_excel usa NaN
+        textos = df.columns[df.dtypes == object]
+        df[textos] = df[textos].where(df[textos].notna(), np.nan)
+        areas_data[area['nome']] = _decodificar_mistas(df, area['colunas_mistas'])
+    return areas_data
+
+
+def _manifesto_valido(caminho_dados, pasta):
+    # A validação usa primeiro tamanho/mtime; o hash do conteúdo só é
+    # calculado quando a assinatura diverge (ex.: arquivo copiado ou tocado)
+    manifesto = _ler_manifesto(pasta)
+    if manifesto is None:
+        return None
+
+    tamanho, mtime = assinatura_arquivo(caminho_dados)
+    if (tamanho, mtime) != (manifesto['tamanho'], manifesto['mtime_ns']):
+        if tamanho != manifesto['tamanho'] or hash_conteudo(caminho_dados) != manifesto['sha256']:
+            return None
+        # Mesmo conteúdo com outro mtime: atualizar a assinatura para as próximas leituras
+        manifesto['mtime_ns'] = mtime
+        try:
+            _gravar_manifesto(pasta, manifesto)
+        except OSError:
+            pass
+
+    return manifesto
+
+
+def carregar_snapshot(caminho_dados, pasta):
+    """
+    Carrega o snapshot se ele corresponder ao arquivo de dados atual
+
+    Args:
+        caminho_dados: caminho do dados_brutos.xlsx
+        pasta: pasta do snapshot
+
+    Returns:
+        tuple: (areas_data, lista_areas, versao) ou None se o snapshot estiver ausente/desatualizado
+    """
+    manifesto = _manifesto_valido(caminho_dados, pasta)
+    if manifesto is None:
+        return None
+
+    try:
+        areas_data = _ler_areas(pasta, manifesto)
+    except (OSError, ValueError):
+        return None
+
+    return areas_data, [area['nome'] for area in manifesto['areas']], manifesto['sha256']
+
+
+def versao_dados(caminho_dados, pasta):
+    """
+    Identificador curto da versão dos dados normalizados
+
+    Combina o hash do conteúdo do workbook (o do manifesto, quando o
+    snapshot está válido, sem reler o arquivo) com VERSAO_FORMATO: muda
+    quando o conteúdo ou a normalização mudam, mas não quando o arquivo é
+    só tocado ou copiado.
+
+    Args:
+        caminho_dados: caminho do dados_brutos.xlsx
+        pasta: pasta do snapshot
+
+    Returns:
+        str: identificador da versão
+    """
+    manifesto = _manifesto_valido(caminho_dados, pasta)
+    sha256 = manifesto['sha256'] if manifesto is not None else hash_conteudo(caminho_dados)
+    return f'{sha256[:16]}-f{VERSAO_FORMATO}'
+
+
+def atualizar_snapshot(caminho_dados, pasta, ler_abas):
+    """
+    Atualiza o snapshot relendo do Excel só as abas que mudaram
+
+    Cada aba vira uma partição Parquet nomeada pelo hash do seu conteúdo
+    (ver hashes_abas). Partições de abas inalteradas são reaproveitadas do
+    snapshot anterior; o manifesto é trocado por último, de forma atômica,
+    e as partições que deixaram de ser usadas são removidas.
+
+    Args:
+        caminho_dados: caminho do dados_brutos.xlsx
+        pasta: pasta do snapshot
+        ler_abas: função (caminho_dados, nomes_abas) -> dict com DataFrames
+            normalizados das abas pedidas
+
+    Returns:
+        tuple: (areas_data, lista_areas, versao) relidos do snapshot, ou os
+            próprios dados em memória se a pasta não puder ser gravada
+    """
+    tamanho, mtime = assinatura_arquivo(caminho_dados)
+    sha256 = hash_conteudo(caminho_dados)
+    hashes = hashes_abas(caminho_dados)
+
+    pasta = Path(pasta)
+    pasta_partes = pasta / PASTA_PARTES
+    anteriores = {}
+    manifesto_anterior = _ler_manifesto(pasta)
+    if manifesto_anterior is not None:
+        anteriores = {area['hash']: area for area in manifesto_anterior['areas']}
+
+    reaproveitadas = [
+        nome for nome, hash_aba in hashes.items()
+        if hash_aba in anteriores and (pasta_partes / anteriores[hash_aba]['arquivo']).exists()
+    ]
+    alteradas = [nome for nome in hashes if nome not in reaproveitadas]
+    novas = ler_abas(caminho_dados, alteradas) if alteradas else {}
+
+    manifesto = {
+        'versao_formato': VERSAO_FORMATO,
+        'arquivo': os.path.basename(caminho_dados),
+        'tamanho': tamanho,
+        'mtime_ns': mtime,
+        'sha256': sha256,
+        'areas': []
+    }
+
+    try:
+        pasta_partes.mkdir(parents=True, exist_ok=True)
+        for nome, hash_aba in hashes.items():
+            if nome in novas:
+                df = novas[nome]
+                arquivo = f'area_{hash_aba[:24]}.parquet'
+                mistas = colunas_mistas(df)
+                temporario = pasta_partes / f'{arquivo}.{uuid.uuid4().hex}.tmp'
+                _codificar_mistas(df, mistas).to_parquet(temporario, index=False)
+                os.replace(temporario, pasta_partes / arquivo)
+                area = {'nome': nome, 'hash': hash_aba, 'arquivo': arquivo, 'linhas': len(df), 'colunas_mistas': mistas}
+            else:
+                area = dict(anteriores[hash_aba], nome=nome)
+            manifesto['areas'].append(area)
+        _gravar_manifesto(pasta, manifesto)
+    except OSError:
+        if alteradas != list(hashes):
+            # Sem como gravar e sem todas as abas em memória: ler o restante do Excel
+            novas.update(ler_abas(caminho_dados, reaproveitadas))
+        areas_data = {nome: novas[nome] for nome in hashes}
+        return areas_data, list(areas_data.keys()), sha256
+
+    _remover_nao_referenciados(pasta, manifesto)
+
+    # Reler do disco garante que a primeira carga e as seguintes sejam idênticas
+    return _ler_areas(pasta, manifesto), list(hashes.keys()), sha256
+
+
+def _remover_nao_referenciados(pasta, manifesto):
+    # Partições e arquivos Arrow de versões anteriores do workbook (e pastas
+    # de formatos antigos do snapshot)
+    pasta = Path(pasta)
+    em_uso = {area['arquivo'] for area in manifesto['areas']}
+    for item in (pasta / PASTA_PARTES).iterdir():
+        if item.name not in em_uso and not item.name.endswith('.tmp'):
+            item.unlink(missing_ok=True)
+    for item in pasta.iterdir():
+        if item.is_dir() and item.name != PASTA_PARTES:
+            shutil.rmtree(item, ignore_errors=True)
+        elif item.suffix == '.arrow' and item.name != manifesto.get('arquivo_arrow'):
+            try:
+                item.unlink()
+            except OSError:
+                # No Windows um arquivo ainda mapeado por outro worker não pode ser removido
+                pass
+
+
+def salvar_arrow(caminho_dados, pasta, areas_data):
+    """
+    Grava todas as áreas num único arquivo Arrow IPC ao lado do snapshot
+
+    As áreas ficam em faixas contíguas de linhas; o deslocamento e as
+    colunas de cada área vão nos metadados do schema. Colunas mistas são
+    codificadas como no Parquet e os textos usam large_string, o tipo que
+    o pandas mapeia sem conversão.
+
+    Args:
+        caminho_dados: caminho do dados_brutos.xlsx
+        pasta: pasta do snapshot (o manifesto já deve estar gravado)
+        areas_data: AreaPartition com as áreas lidas do snapshot
+
+    Returns:
+        bool: True se o arquivo foi gravado
+    """
+    manifesto = _manifesto_valido(caminho_dados, pasta)
+    if manifesto is None:
+        return False
+
+    df = areas_data.frame
+    mistas = colunas_mistas(df)
+    tabela = pa.Table.from_pandas(_codificar_mistas(df, mistas), preserve_index=False)
+    tabela = tabela.cast(pa.schema([
+        campo.with_type(pa.large_string()) if pa.types.is_string(campo.type) else campo
+        for campo in tabela.schema
+    ]))
+
+    areas = []
+    for nome in areas_data:
+        inicio, fim = areas_data.bounds(nome)
+        areas.append({'nome': nome, 'inicio': inicio, 'linhas': fim - inicio, 'colunas': areas_data.columns(nome)})
+    metadados = {'areas': areas, 'colunas_mistas': mistas}
+    tabela = tabela.replace_schema_metadata({
+        CHAVE_METADADOS: json.dumps(metadados, ensure_ascii=False)
+    })
+
+    # Nome único por gravação: um arquivo já mapeado por outro worker nunca
+    # é sobrescrito por uma versão diferente
+    nome_arquivo = f"dados_{manifesto['sha256'][:16]}_{uuid.uuid4().hex[:8]}.arrow"
+    caminho = Path(pasta) / nome_arquivo
+    temporario = caminho.with_name(f'{nome_arquivo}.tmp')
+    try:
+        with pa.OSFile(str(temporario), 'wb') as arquivo:
+            with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        os.replace(temporario, caminho)
+    except OSError:
+        Path(temporario).unlink(missing_ok=True)
+        return False
+
+    manifesto['arquivo_arrow'] = nome_arquivo
+    try:
+        _gravar_manifesto(pasta, manifesto)
+    except OSError:
+        return False
+    return True
+
+
+def _mapear_tipo(tipo):
+    if pa.types.is_large_string(tipo):
+        # Texto com semântica NaN, igual às colunas object do read_excel
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    if pa.types.is_boolean(tipo):
+        # Flags SIM/NÃO (utils/normalization.py): boolean anulável, como no Parquet
+        return pd.BooleanDtype()
+    return None
+
+
+def carregar_arrow(caminho_dados, pasta):
+    """
+    Mapeia em memória (somente leitura) o arquivo Arrow do snapshot
+
+    Os textos, que são quase todo o volume, continuam apontando para as
+    páginas do arquivo mapeado, compartilhadas pelo sistema operacional
+    entre todos os processos do servidor. Só as colunas numéricas e as
+    mistas são materializadas em cada processo.
+
+    Args:
+        caminho_dados: caminho do dados_brutos.xlsx
+        pasta: pasta do snapshot
+
+    Returns:
+        tuple: (areas_data, df_todas_areas, lista_areas), com areas_data
+            como AreaPartition, ou None se o arquivo Arrow estiver
+            ausente/desatualizado
+    """
+    manifesto = _manifesto_valido(caminho_dados, pasta)
+    if manifesto is None or 'arquivo_arrow' not in manifesto:
+        return None
+
+    caminho = Path(pasta) / manifesto['arquivo_arrow']
+    try:
+        tabela = pa.ipc.open_file(pa.memory_map(str(caminho), 'r')).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    metadados = json.loads(tabela.schema.metadata[CHAVE_METADADOS.encode()])
+    df_todas_areas = tabela.to_pandas(types_mapper=_mapear_tipo, split_blocks=True)
+    for col in df_todas_areas.columns:
+        if pa.types.is_null(tabela.schema.field(col).type):
+            df_todas_areas[col] = pd.Series(np.nan, index=df_todas_areas.index, dtype=object)
+    df_todas_areas = _decodificar_mistas(df_todas_areas, metadados['colunas_mistas'])
+
+    # Faixas contíguas: as colunas de texto de cada área são views do mesmo mapeamento
+    areas_data = AreaPartition(df_todas_areas, {
+        area['nome']: (area['inicio'], area['inicio'] + area['linhas'], area['colunas'])
+        for area in metadados['areas']
+    })
+
+    return areas_data, df_todas_areas, [area['nome'] for area in metadados['areas']]
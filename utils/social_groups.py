@@ -0,0 +1,158 @@
+"""
+Máscara de bits dos grupos sociais contemplados por programa
+
+Cada programa recebe, na ingestão, um inteiro com um bit por grupo de
+GRUPOS_SOCIAIS (na ordem do dicionário). Quantidade de grupos, listas de
+grupos e distribuições saem dessa coluna com operações vetorizadas, sem
+percorrer as linhas com iterrows.
+"""
+import numpy as np
+import pandas as pd
+
+from config import GRUPOS_SOCIAIS, COLUNA_GRUPOS
+from utils.normalization import parse_yes_no
+
+NOMES_GRUPOS = list(GRUPOS_SOCIAIS)
+
+# Bit de cada grupo na máscara
+BITS_GRUPOS = {nome: 1 << i for i, nome in enumerate(NOMES_GRUPOS)}
+
+TIPO_MASCARA = np.uint16
+if len(NOMES_GRUPOS) > np.iinfo(TIPO_MASCARA).bits:
+    raise ValueError(f"A máscara de {TIPO_MASCARA.__name__} não comporta {len(NOMES_GRUPOS)} grupos sociais")
+
+
+def is_yes(serie):
+    """
+    Indica as células marcadas como SIM
+
+    As colunas carregadas já são boolean (utils/normalization.py); textos
+    da planilha ('SIM', 'sim ', 'S IM'...) passam pela mesma conversão.
+
+    Args:
+        serie: Series da coluna do grupo
+
+    Returns:
+        ndarray bool
+    """
+    return parse_yes_no(serie).fillna(False).to_numpy(dtype=bool)
+
+
+def build_group_mask(df):
+    """
+    Calcula a máscara de grupos de cada programa
+
+    Args:
+        df: DataFrame com as colunas de GRUPOS_SOCIAIS (as ausentes contam como NÃO)
+
+    Returns:
+        ndarray uint16 com um bit ligado por grupo contemplado
+    """
+    mascara = np.zeros(len(df), dtype=TIPO_MASCARA)
+    for nome, coluna in GRUPOS_SOCIAIS.items():
+        if coluna in df.columns:
+            mascara[is_yes(df[coluna])] |= BITS_GRUPOS[nome]
+    return mascara
+
+
+def group_count(mascara):
+    """
+    Quantidade de grupos contemplados (popcount da máscara)
+
+    Args:
+        mascara: Series ou ndarray de máscaras
+
+    Returns:
+        Series (com o mesmo índice) ou ndarray de inteiros
+    """
+    valores = np.ascontiguousarray(mascara, dtype=TIPO_MASCARA)
+    if hasattr(np, 'bitwise_count'):
+        contagem = np.bitwise_count(valores).astype(np.int64)
+    else:
+        # NumPy < 2.0: soma dos bits de cada máscara
+        bits = np.iinfo(TIPO_MASCARA).bits
+        contagem = np.unpackbits(valores.view(np.uint8)).reshape(-1, bits).sum(axis=1, dtype=np.int64)
+    if isinstance(mascara, pd.Series):
+        return pd.Series(contagem, index=mascara.index, name='Quantidade de Grupos')
+    return contagem
+
+
+def group_names(mascara):
+    """
+    Nomes dos grupos de uma máscara
+
+    Args:
+        mascara: máscara de um programa
+
+    Returns:
+        list: nomes dos grupos, na ordem de GRUPOS_SOCIAIS
+    """
+    return [nome for nome in NOMES_GRUPOS if int(mascara) & BITS_GRUPOS[nome]]
+
+
+def group_labels(mascara, vazio=''):
+    """
+    Lista de grupos de cada programa, como texto ('PcD, Trans')
+
+    O texto é montado uma vez por máscara distinta (no máximo
+    2^len(GRUPOS_SOCIAIS)) e depois mapeado.
+
+    Args:
+        mascara: Series de máscaras
+        vazio: texto para programas sem nenhum grupo
+
+    Returns:
+        Series de textos
+    """
+    textos = {m: ', '.join(group_names(m)) or vazio for m in pd.unique(mascara)}
+    return mascara.map(textos)
+
+
+def programs_with_groups(df, colunas=('Nome do Programa',)):
+    """
+    Programas que contemplam ao menos um grupo, com a quantidade e a lista
+
+    Args:
+        df: DataFrame com a coluna COLUNA_GRUPOS
+        colunas: colunas de identificação a manter (as ausentes são ignoradas)
+
+    Returns:
+        DataFrame com as colunas pedidas, 'Quantidade de Grupos' e 'Grupos',
+            do programa com mais grupos para o com menos
+    """
+    mascara = df[COLUNA_GRUPOS]
+    tem_grupo = mascara.to_numpy() != 0
+    resultado = df.loc[tem_grupo, [col for col in colunas if col in df.columns]].copy()
+    resultado['Quantidade de Grupos'] = group_count(mascara[tem_grupo])
+    resultado['Grupos'] = group_labels(mascara[tem_grupo])
+    return resultado.sort_values('Quantidade de Grupos', ascending=False)
+
+
+def group_count_distribution(df):
+    """
+    Quantos programas contemplam 1, 2, 3... grupos
+
+    Args:
+        df: DataFrame com a coluna COLUNA_GRUPOS
+
+    Returns:
+        Series indexada pela quantidade de grupos (sem o zero), em ordem crescente
+    """
+    contagem = np.bincount(group_count(df[COLUNA_GRUPOS].to_numpy()), minlength=len(NOMES_GRUPOS) + 1)
+    distribuicao = pd.Series(contagem, name='Quantidade de Programas').rename_axis('Quantidade de Grupos')
+    return distribuicao.iloc[1:][lambda s: s > 0]
+
+
+def groups_by_area(df):
+    """
+    Quantidade de grupos por programa, resumida por área
+
+    Args:
+        df: DataFrame com as colunas 'Área' e COLUNA_GRUPOS
+
+    Returns:
+        DataFrame indexado por área com 'mean', 'sum' e 'count' da
+            quantidade de grupos por programa
+    """
+    quantidade = group_count(df[COLUNA_GRUPOS])
+    return quantidade.groupby(df['Área'], observed=True).agg(['mean', 'sum', 'count'])
@@ -0,0 +1,87 @@
+"""
+Colunas de vagas como inteiros, convertidas uma vez na ingestão
+
+As células de vagas foram preenchidas à mão e trazem textos no meio dos
+números ('sem informações', '18+', '2 Supl', '.'). Na ingestão cada
+coluna de vagas (totais e por grupo) vira TIPO_VAGAS, com zero para
+células vazias, textos não numéricos e colunas que a aba não tem. Os
+textos descartados ficam registrados por programa em
+COLUNA_VAGAS_INVALIDAS, como JSON {coluna: texto original}, e alimentam o
+relatório de qualidade (quality_report). Depois da carga o resto do
+código faz só aritmética sobre as colunas.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from config import COLUNAS_VAGAS, VAGAS_GRUPOS, COLUNA_VAGAS_INVALIDAS
+
+TIPO_VAGAS = np.int32
+
+# Todas as colunas de vagas: totais e reservas de cada grupo social
+COLUNAS_VAGAS_NUMERICAS = [
+    *COLUNAS_VAGAS.values(),
+    *[coluna for colunas in VAGAS_GRUPOS.values() for coluna in colunas]
+]
+
+
+def coerce_vacancies(df):
+    """
+    Converte as colunas de vagas para inteiros e registra os textos descartados
+
+    Valores fracionários são arredondados. Colunas ausentes são criadas
+    com zeros, para que todas as áreas tenham o mesmo tipo.
+
+    Args:
+        df: DataFrame de uma aba (alterado no lugar)
+
+    Returns:
+        DataFrame: o mesmo df, com as colunas convertidas e COLUNA_VAGAS_INVALIDAS
+    """
+    invalidas = {}
+    for coluna in COLUNAS_VAGAS_NUMERICAS:
+        if coluna not in df.columns:
+            df[coluna] = np.zeros(len(df), dtype=TIPO_VAGAS)
+            continue
+        valores = df[coluna]
+        numeros = pd.to_numeric(valores, errors='coerce')
+        if valores.dtype == object:
+            preenchidas = valores.notna() & (valores.astype(str).str.strip() != '')
+            for i in np.flatnonzero((numeros.isna() & preenchidas).to_numpy()):
+                invalidas.setdefault(i, {})[coluna] = str(valores.iat[i]).strip()
+        df[coluna] = numeros.fillna(0).round().astype(TIPO_VAGAS)
+
+    registros = np.full(len(df), '', dtype=object)
+    for i, falhas in invalidas.items():
+        registros[i] = json.dumps(falhas, ensure_ascii=False)
+    df[COLUNA_VAGAS_INVALIDAS] = registros
+    return df
+
+
+def quality_report(df):
+    """
+    Relatório dos valores de vagas que não puderam ser convertidos
+
+    Args:
+        df: DataFrame carregado (com COLUNA_VAGAS_INVALIDAS)
+
+    Returns:
+        DataFrame com 'Área', 'Nome do Programa', 'Sigla da IES', 'Coluna'
+            e 'Valor original', uma linha por célula descartada
+    """
+    colunas = ['Área', 'Nome do Programa', 'Sigla da IES', 'Coluna', 'Valor original']
+    if COLUNA_VAGAS_INVALIDAS not in df.columns:
+        return pd.DataFrame(columns=colunas)
+
+    com_falhas = df[df[COLUNA_VAGAS_INVALIDAS].fillna('') != '']
+    identificacao = [
+        com_falhas[coluna].tolist() if coluna in com_falhas.columns else [None] * len(com_falhas)
+        for coluna in colunas[:3]
+    ]
+    linhas = [
+        (*programa, coluna, valor)
+        for *programa, registro in zip(*identificacao, com_falhas[COLUNA_VAGAS_INVALIDAS])
+        for coluna, valor in json.loads(registro).items()
+    ]
+    return pd.DataFrame(linhas, columns=colunas)
@@ -0,0 +1,329 @@
+"""
+Leitura e normalização das abas do workbook de dados brutos
+
+Não depende do Streamlit: os processos do pool de leitura importam só
+este módulo.
+"""
+import multiprocessing
+import os
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+from config import WORKERS_LEITURA, COLUNA_GRUPOS
+from utils.normalization import normalize_values
+from utils.schema import canonicalize_columns
+from utils.social_groups import build_group_mask
+from utils.vacancies import coerce_vacancies
+from utils.snapshot import partes_abas
+
+# Textos tratados como ausência pelo read_excel (na_values padrão do pandas)
+VALORES_AUSENTES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+})
+
+# Textos que o read_excel converte em bool numa coluna só de True/False
+TEXTOS_BOOL = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+
+# Tipos (pd.api.types.infer_dtype) de colunas que podem ser numéricas
+TIPOS_NUMERICOS = {
+    'integer', 'floating', 'mixed-integer-float', 'decimal', 'boolean', 'string', 'mixed-integer', 'mixed', 'empty'
+}
+
+
+def normalize_area(df_area, sheet_name):
+    """
+    Normaliza uma aba: nomes canônicos de colunas, valores canônicos das
+    colunas SIM/NÃO e de códigos (utils/normalization.py), vagas como
+    inteiros (utils/vacancies.py) e a máscara de grupos sociais (COLUNA_GRUPOS)
+
+    Args:
+        df_area: DataFrame lido da aba
+        sheet_name: nome da aba/área
+
+    Returns:
+        DataFrame normalizado
+    """
+    df_area = canonicalize_columns(df_area)
+    df_area['Área'] = sheet_name  # Adicionar coluna identificando a área
+
+    normalize_values(df_area)
+    if 'NOTA' in df_area.columns:
+        df_area['NOTA'] = df_area['NOTA'].astype(str).str.strip()
+    coerce_vacancies(df_area)
+    df_area[COLUNA_GRUPOS] = build_group_mask(df_area)
+
+    return df_area
+
+
+def _header_names(cabecalho):
+    """
+    Gera os nomes das colunas a partir da linha de cabeçalho
+
+    Mesmas regras do parser do pandas: células vazias viram 'Unnamed: i' e
+    nomes repetidos recebem sufixo '.1', '.2'... (os nomeados primeiro).
+
+    Args:
+        cabecalho: lista de valores da primeira linha
+
+    Returns:
+        list: nomes das colunas
+    """
+    nomes = []
+    sem_nome = []
+    for i, valor in enumerate(cabecalho):
+        if i == 0 and isinstance(valor, str) and valor.startswith('\ufeff'):
+            valor = valor[1:]
+        if valor == '':
+            sem_nome.append(i)
+            valor = f'Unnamed: {i}'
+        nomes.append(valor)
+
+    contagens = defaultdict(int)
+    for i in [i for i in range(len(nomes)) if i not in sem_nome] + sem_nome:
+        nome = original = nomes[i]
+        vezes = contagens[nome]
+        while vezes > 0:
+            contagens[original] = vezes + 1
+            nome = f'{original}.{vezes}'
+            vezes = vezes + 1 if nome in nomes else contagens[nome]
+        nomes[i] = nome
+        contagens[nome] = vezes + 1
+    return nomes
+
+
+def _bool_values(valores, vazias):
+    # Cópia com os textos de TEXTOS_BOOL trocados por bool e as vazias como
+    # NaN; None se algum valor preenchido não for True/False
+    booleanos = valores.copy()
+    for i in np.flatnonzero(~vazias):
+        valor = valores[i]
+        if isinstance(valor, str):
+            valor = TEXTOS_BOOL.get(valor, valor)
+        if not isinstance(valor, bool):
+            return None
+        booleanos[i] = valor
+    return booleanos
+
+
+def _typed_column(valores):
+    """
+    Converte os valores brutos de uma coluna no array tipado final
+
+    Segue as regras do parser do read_excel, só com APIs públicas do
+    pandas: os textos padrão de ausência (VALORES_AUSENTES) viram NaN,
+    números (inclusive em texto) viram int/float e colunas só de
+    True/False viram bool (object, com NaN, se tiverem células vazias e
+    algum True/False em texto).
+
+    Args:
+        valores: ndarray object com os valores da coluna
+
+    Returns:
+        ndarray: coluna convertida
+    """
+    ausentes = np.fromiter(
+        (isinstance(valor, str) and valor in VALORES_AUSENTES for valor in valores),
+        dtype=bool, count=len(valores)
+    )
+    if ausentes.any():
+        valores[ausentes] = np.nan
+    vazias = pd.isna(valores)
+
+    tipo = pd.api.types.infer_dtype(valores, skipna=True)
+    booleanos = None
+    if tipo in ('boolean', 'string', 'mixed'):
+        booleanos = _bool_values(valores, vazias)
+        if booleanos is not None and not vazias.any():
+            return booleanos.astype(bool)
+    if tipo in TIPOS_NUMERICOS:
+        numeros = pd.to_numeric(valores, errors='coerce')
+        if not (pd.isna(numeros) & ~vazias).any():
+            return np.asarray(numeros)
+    # Textos True/False com células vazias: bool e NaN numa coluna object
+    if booleanos is not None:
+        return booleanos
+    return valores
+
+
+def read_sheet(sheet):
+    """
+    Lê uma aba em streaming, montando as colunas diretamente
+
+    Equivale a pd.read_excel(..., sheet_name=aba) com os parâmetros padrão,
+    mas percorre as linhas do openpyxl em modo read_only e acumula os
+    valores por coluna, sem a lista de linhas e as cópias intermediárias
+    do parser. Cada coluna é convertida e liberada em seguida, então o
+    pico de memória fica próximo do tamanho do DataFrame final.
+
+    Args:
+        sheet: worksheet do openpyxl aberto com read_only=True
+
+    Returns:
+        DataFrame da aba
+    """
+    sheet.reset_dimensions()
+
+    colunas = []
+    n_linhas = 0
+    ultima_com_dados = -1
+    for linha in sheet.iter_rows():
+        valores = []
+        for celula in linha:
+            valor = celula.value
+            if valor is None:
+                valor = ''
+            elif celula.data_type == TYPE_NUMERIC:
+                inteiro = int(valor)
+                valor = inteiro if inteiro == valor else float(valor)
+            elif celula.data_type == TYPE_ERROR:
+                valor = np.nan
+            valores.append(valor)
+        # Células vazias no fim da linha não contam para a largura
+        while valores and valores[-1] == '':
+            valores.pop()
+        if valores:
+            ultima_com_dados = n_linhas
+
+        while len(colunas) < len(valores):
+            colunas.append([''] * n_linhas)
+        for coluna, valor in zip(colunas, valores):
+            coluna.append(valor)
+        for coluna in colunas[len(valores):]:
+            coluna.append('')
+        n_linhas += 1
+
+    if ultima_com_dados < 0:
+        return pd.DataFrame()
+
+    nomes = _header_names([coluna[0] for coluna in colunas])
+    n_dados = ultima_com_dados  # linhas de dados após o cabeçalho
+    dados = {}
+    for i, nome in enumerate(nomes):
+        valores = np.empty(n_dados, dtype=object)
+        valores[:] = colunas[i][1:ultima_com_dados + 1]
+        colunas[i] = None
+        dados[nome] = _typed_column(valores) if n_dados else valores
+
+    return pd.DataFrame(dados, columns=nomes, index=pd.RangeIndex(n_dados), copy=False)
+
+
+def _read_sheets(caminho, abas):
+    # Executada em cada worker: abre o workbook uma vez e lê o seu lote de abas
+    workbook = load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    areas_data = {}
+
+    try:
+        for sheet_name in abas:
+            df_area = read_sheet(workbook[sheet_name])
+            areas_data[sheet_name] = normalize_area(df_area, sheet_name)
+    finally:
+        workbook.close()
+
+    return areas_data
+
+
+def _split_sheets(caminho, abas, n_lotes):
+    """
+    Divide as abas em lotes de custo parecido
+
+    O custo de cada aba é estimado pelo tamanho do seu XML; as maiores são
+    distribuídas primeiro, sempre para o lote mais leve.
+
+    Args:
+        caminho: caminho do arquivo Excel
+        abas: nomes das abas
+        n_lotes: número de lotes
+
+    Returns:
+        list: listas de nomes de abas
+    """
+    with zipfile.ZipFile(caminho) as arquivo_zip:
+        partes = partes_abas(arquivo_zip)
+        tamanhos = {nome: arquivo_zip.getinfo(partes[nome]).file_size for nome in abas}
+
+    lotes = [[] for _ in range(n_lotes)]
+    custos = [0] * n_lotes
+    for nome in sorted(abas, key=tamanhos.get, reverse=True):
+        i = custos.index(min(custos))
+        lotes[i].append(nome)
+        custos[i] += tamanhos[nome]
+    return [lote for lote in lotes if lote]
+
+
+def resolve_workers(workers, n_abas):
+    """
+    Define quantos processos usar na leitura
+
+    Args:
+        workers: número pedido (None = WORKERS_LEITURA, 0 = um por núcleo)
+        n_abas: número de abas a ler
+
+    Returns:
+        int: número de processos (1 = serial)
+    """
+    if workers is None:
+        workers = WORKERS_LEITURA
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_abas))
+
+
+def _pool_context():
+    # forkserver: os filhos nascem de um processo que já importou pandas e
+    # este módulo, e não do servidor do Streamlit (multithread, onde fork
+    # não é seguro). Onde não existe (Windows), spawn.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context('forkserver')
+        contexto.set_forkserver_preload([__name__])
+        return contexto
+    return multiprocessing.get_context('spawn')
+
+
+def read_workbook(caminho, abas=None, workers=None):
+    """
+    Lê e normaliza as abas do workbook, em paralelo quando possível
+
+    Cada processo do pool lê um lote de abas; os DataFrames normalizados
+    voltam para o processo principal na ordem pedida. Com um único worker,
+    ou se o pool não puder ser criado, a leitura é serial.
+
+    A leitura paralela é para scripts de linha de comando (exportadores,
+    benchmark_leitura.py), cujo __main__ é protegido por
+    if __name__ == "__main__": os processos novos reimportam o __main__.
+    O servidor do Streamlit, que executa as páginas como __main__, lê com
+    workers=1.
+
+    Args:
+        caminho: caminho do arquivo Excel
+        abas: nomes das abas a ler (None = todas)
+        workers: número de processos (None = WORKERS_LEITURA, 0 = um por núcleo)
+
+    Returns:
+        dict com DataFrames por área
+    """
+    if abas is None:
+        with zipfile.ZipFile(caminho) as arquivo_zip:
+            abas = list(partes_abas(arquivo_zip))
+
+    workers = resolve_workers(workers, len(abas))
+    if workers == 1:
+        return _read_sheets(caminho, abas)
+
+    lotes = _split_sheets(caminho, abas, workers)
+    lidas = {}
+    try:
+        with ProcessPoolExecutor(max_workers=len(lotes), mp_context=_pool_context()) as pool:
+            for resultado in pool.map(_read_sheets, [caminho] * len(lotes), lotes):
+                lidas.update(resultado)
+    except (OSError, BrokenProcessPool):
+        return _read_sheets(caminho, abas)
+
+    return {nome: lidas[nome] for nome in abas}